@@ -6,6 +6,7 @@ SECRETS_VOLUME = Path("/secrets")
 SOCKETS_VOLUME = Path("/sockets")
 INPUTS_VOLUME = Path("/inputs")
 PROCESSING_VOLUME = Path("/processing")
+PYTHON_RUNTIME_CACHE_VOLUME = Path("/python_runtime_cache")
 
 CONTAINER_TIMEOUT = 600
 
@@ -21,5 +22,6 @@ PROCESSING_VOLUME_NAME = "processing"
 RUNTIME_VOLUME_NAME = "runtime"
 SECRETS_VOLUME_NAME = "secrets"
 SOCKETS_VOLUME_NAME = "sockets"
+PYTHON_RUNTIME_CACHE_VOLUME_NAME = "python-runtime-cache"
 
 BOOTSTRAP_PYTHON_RUNTIME = "bootstrap_python_runtime.py"
@@ -298,6 +298,17 @@ class FlowExecutor(LocalFlowExecutor):
             ({"path": Path(tool)}, self.tools_paths_prefix / str(index), True)
             for index, tool in enumerate(self.get_tools_paths())
         ]
+
+        # The Python process runtime cache is shared between processes.
+        if cache_dir := SETTINGS.get("FLOW_PYTHON_RUNTIME_CACHE_DIR"):
+            Path(cache_dir).mkdir(parents=True, exist_ok=True)
+            mount_points.append(
+                (
+                    {"path": Path(cache_dir)},
+                    constants.PYTHON_RUNTIME_CACHE_VOLUME,
+                    False,
+                )
+            )
         return dict([self._new_volume(*mount_point) for mount_point in mount_points])
 
     def _map_docker_image(self, docker_image: str) -> str:
@@ -385,6 +396,10 @@ class FlowExecutor(LocalFlowExecutor):
         }
         with suppress(RuntimeError):
             environment["UPLOAD_DIR"] = get_upload_dir()
+        if SETTINGS.get("FLOW_PYTHON_RUNTIME_CACHE_DIR"):
+            environment["PYTHON_RUNTIME_CACHE_DIR"] = os.fspath(
+                constants.PYTHON_RUNTIME_CACHE_VOLUME
+            )
 
         autoremove = SETTINGS.get("FLOW_DOCKER_AUTOREMOVE", False)
 
@@ -4,10 +4,11 @@ import asyncio
 import functools
 import json
 import logging
+import os
 import socket
 import time
 import uuid
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 from contextlib import suppress
 from enum import Enum, unique
 from time import time as now
@@ -19,13 +20,28 @@ from typing import (
     Generic,
     List,
     Optional,
+    Set,
     Tuple,
     Type,
     TypeVar,
+    Union,
 )
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 logger = logging.getLogger(__name__)
 
+# The name of the binary framing advertised to the peer in every message.
+BINARY_FRAMING_NAME = "msgpack"
+# Binary framing is used when msgpack is installed and it is not disabled. It
+# is only used when sending to the peer that advertised its support for it.
+BINARY_FRAMING = msgpack is not None and os.environ.get(
+    "RESOLWE_BINARY_FRAMING", "1"
+) not in ("0", "false", "False")
+
 
 PeerIdentity = bytes
 MessageDataType = TypeVar("MessageDataType")
@@ -39,6 +55,8 @@ class MessageProcessingEventType(Enum):
     MESSAGE_PROCESSING_STARTED = "MPS"
     MESSAGE_PROCESSING_FINISHED = "MPF"
     PREPARATION_FINISHED = "PF"
+    LOCK_ACQUIRED = "LA"
+    HANDLER_FINISHED = "HF"
 
 
 class MessageProcessingCallback:
@@ -165,11 +183,57 @@ def async_retry(
     return decorator_retry
 
 
+def encode_data(
+    data: Any,
+    binary: bool = False,
+    encoder: Optional[Type[json.JSONEncoder]] = None,
+    default: Optional[Callable[[Any], Any]] = None,
+) -> bytes:
+    """Encode the data into bytes.
+
+    :param data: the data to encode.
+    :param binary: use binary (msgpack) encoding instead of JSON.
+    :param encoder: JSON encoder class, ignored with binary encoding.
+    :param default: function called on objects that can not be serialized.
+    """
+    if binary:
+        return msgpack.packb(data, default=default)
+    return json.dumps(data, cls=encoder, default=default).encode()
+
+
+def _json_compatible_map(pairs: List[Tuple[Any, Any]]) -> dict:
+    """Convert the keys in the decoded msgpack map to strings like JSON does."""
+    return {
+        key if isinstance(key, str) else json.dumps(key): value for key, value in pairs
+    }
+
+
+def decode_data(payload: Union[bytes, bytearray, memoryview]) -> Any:
+    """Decode the data encoded with ``encode_data``.
+
+    The encoding is detected from the first byte: JSON encoded messages are
+    always objects so they start with '{' while msgpack maps never do. The
+    keys in the msgpack maps are converted to strings so the decoded data is
+    the same regardless of the encoding.
+
+    :raises RuntimeError: when binary message is received and msgpack is not
+        installed.
+    """
+    if len(payload) > 0 and payload[0] != ord("{"):
+        if msgpack is None:
+            raise RuntimeError("Received binary message but msgpack is not installed.")
+        return msgpack.unpackb(
+            payload, strict_map_key=False, object_pairs_hook=_json_compatible_map
+        )
+    return json.loads(bytes(payload) if isinstance(payload, memoryview) else payload)
+
+
 def send_data(
     s: socket.SocketType,
     data: dict,
     size_bytes: int = 8,
     encoder: Optional[Type[json.JSONEncoder]] = None,
+    binary: bool = False,
 ):
     """Send data over socket.
 
@@ -177,29 +241,37 @@ def send_data(
     :param data: dict that must be serialzable to JSON.
     :param size_bytes: how first many bytes in message are dedicated to the
         message size (pre-padded with zeros).
+    :param binary: use binary encoding instead of JSON.
     :raises: exception on failure.
     """
-    message = json.dumps(data, cls=encoder).encode()
+    message = encode_data(data, binary, encoder=encoder)
     message_length = len(message).to_bytes(size_bytes, byteorder="big")
     s.sendall(message_length)
     s.sendall(message)
 
 
-def read_bytes(s: socket.SocketType, message_size: int) -> bytes:
+def read_bytes(s: socket.SocketType, message_size: int) -> bytearray:
     """Read message_size bytes from the given socket.
 
-    The method will block until enough bytes are available.
+    The method will block until enough bytes are available. The bytes are
+    received directly into the preallocated buffer.
 
     :param message_size: size (in bytes) of the message to read.
 
-    :returns: received message.
+    :returns: received message. It is shorter than message_size when the
+        socket is closed before enough bytes are received.
     """
-    message = b""
-    while len(message) < message_size:
-        received = s.recv(message_size - len(message))
-        message += received
-        if not received:
+    message = bytearray(message_size)
+    view = memoryview(message)
+    received = 0
+    while received < message_size:
+        received_now = s.recv_into(view[received:], message_size - received)
+        if not received_now:
+            view.release()
+            del message[received:]
             return message
+        received += received_now
+    view.release()
     return message
 
 
@@ -216,8 +288,7 @@ def receive_data(s: socket.SocketType, size_bytes: int = 8) -> Optional[Dict]:
 
     message = read_bytes(s, message_size)
     assert len(message) == message_size
-    data = json.loads(message.decode("utf-8"))
-    return data
+    return decode_data(message)
 
 
 async def async_send_data(
@@ -225,6 +296,7 @@ async def async_send_data(
     data: dict,
     identity: Optional[bytes] = None,
     size_bytes: int = 8,
+    binary: bool = False,
 ):
     """Send data over socket.
 
@@ -233,11 +305,12 @@ async def async_send_data(
     :param identity: ignored by socker writer.
     :param size_bytes: how first many bytes in message are dedicated to the
         message size (pre-padded with zeros).
+    :param binary: use binary encoding instead of JSON.
     :raises: exception on failure.
     """
-    message = json.dumps(data).encode("utf-8")
-    message_size = len(message).to_bytes(size_bytes, byteorder="big")
-    writer.write(message_size + message)
+    message = encode_data(data, binary)
+    writer.write(len(message).to_bytes(size_bytes, byteorder="big"))
+    writer.write(message)
     await writer.drain()
 
 
@@ -246,8 +319,8 @@ async def async_receive_data(
 ) -> Tuple[PeerIdentity, Any, Optional[bytes]]:
     """Receive data from the reader.
 
-    The data is expected to be bytes-encoded JSON representation of a Python
-    object. Received data is deserialized to a Python object.
+    The data is expected to be bytes-encoded JSON (or msgpack) representation
+    of a Python object. Received data is deserialized to a Python object.
 
     :raises asyncio.IncompleteReadError: when data could not be read from
         the socket.
@@ -259,7 +332,7 @@ async def async_receive_data(
     message_size = int.from_bytes(received, byteorder="big")
     received = await reader.readexactly(message_size)
     assert len(received) == message_size
-    return (b"", json.loads(received.decode("utf-8")), None)
+    return (b"", decode_data(received), None)
 
 
 class Message(Generic[MessageDataType]):
@@ -582,6 +655,17 @@ class BaseCommunicator:
         # duplicated requests.
         self._uuids_received: Dict[PeerIdentity, Dict[str, int]] = defaultdict(dict)
 
+        # Peers that advertised the support for binary framing.
+        self._binary_peers: Set[PeerIdentity] = set()
+
+    def _framing_peer(self, identity: PeerIdentity) -> PeerIdentity:
+        """Get the key identifying the peer when negotiating framing.
+
+        By default the communicator has a single peer. Communicators with
+        multiple peers must override this method.
+        """
+        return b""
+
     def __getattr__(self, name: str):
         """Call arbitrary 'command' with 'communicator.command(args)' syntax."""
 
@@ -636,6 +720,11 @@ class BaseCommunicator:
                     assert isinstance(received[0], bytes)
                     received[1]["client_id"] = received[2]
                     assert Message.is_valid(received[1])
+                    if (
+                        BINARY_FRAMING
+                        and received[1].get("framing") == BINARY_FRAMING_NAME
+                    ):
+                        self._binary_peers.add(self._framing_peer(received[0]))
                     result = received[0], Message.from_dict(received[1])
                     received_status = ReceiveStatus.OK
             else:
@@ -671,6 +760,9 @@ class BaseCommunicator:
 
         If message does not contains key "uuid" one is chosen at random.
 
+        The support for binary framing is advertised in every message and the
+        binary framing is used when the peer advertised it too.
+
         :param message: the message to send.
 
         :param identity: the identity of the peer to send message to.
@@ -689,11 +781,15 @@ class BaseCommunicator:
             occurs sending message.
         """
         retries = 0
+        binary = self._framing_peer(identity) in self._binary_peers
         while retries < send_retries:
             try:
                 message.sent_timestamp = now()
+                data = message.to_dict()
+                if BINARY_FRAMING:
+                    data["framing"] = BINARY_FRAMING_NAME
                 return await asyncio.wait_for(
-                    self.send_method(self.writer, message.to_dict(), identity),
+                    self.send_method(self.writer, data, identity, binary=binary),
                     timeout=send_timeout,
                 )
             except asyncio.TimeoutError:
@@ -956,6 +1052,149 @@ class SocketCommunicator(BaseCommunicator):
         )
 
 
+# The name of the command class used for the commands without explicit class.
+DEFAULT_COMMAND_CLASS = "default"
+
+# The command classes of the commands. The commands on the critical path of the
+# process lifecycle are processed before the chatty reports of the processes.
+COMMAND_CLASSES: Dict[str, str] = {
+    "bootstrap": "critical",
+    "finish": "critical",
+    "init_completed": "critical",
+    "liveness_probe": "critical",
+    "missing_data_locations": "critical",
+    "referenced_files": "critical",
+    "update_status": "critical",
+    "log": "bulk",
+    "process_log": "bulk",
+    "process_report": "bulk",
+    "progress": "bulk",
+}
+
+# The share of the free slots given to the waiting commands of every class.
+COMMAND_CLASS_WEIGHTS: Dict[str, int] = {
+    "critical": 8,
+    DEFAULT_COMMAND_CLASS: 4,
+    "bulk": 1,
+}
+
+
+class CommandScheduler:
+    """Admit the commands to processing in a fair order.
+
+    At most ``max_concurrent`` commands are processed at the same time. When
+    all slots are taken, the commands wait in a queue of their class. The
+    classes are served by smooth weighted round-robin, so a class with weight
+    8 gets 8 slots for every slot of a class with weight 1 while both have
+    waiting commands. Within a class the peers are served in turn, so a single
+    peer sending many commands can not delay the commands of other peers.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        command_classes: Optional[Dict[str, str]] = None,
+        weights: Optional[Dict[str, int]] = None,
+    ):
+        """Initialize.
+
+        :param max_concurrent: the number of commands processed at once.
+        :param command_classes: the mapping of the command names to classes,
+            the commands not in the mapping belong to the default class.
+        :param weights: the mapping of the classes to their positive weights.
+
+        :raises ValueError: when a class has no weight or the weight is not
+            positive.
+        """
+        self._free = max_concurrent
+        self._command_classes = (
+            COMMAND_CLASSES if command_classes is None else command_classes
+        )
+        self._weights = dict(COMMAND_CLASS_WEIGHTS if weights is None else weights)
+        self._weights.setdefault(DEFAULT_COMMAND_CLASS, 1)
+        for command_class in set(self._command_classes.values()) | set(self._weights):
+            if self._weights.get(command_class, 0) <= 0:
+                raise ValueError(
+                    f"Command class '{command_class}' must have a positive weight."
+                )
+        self._current_weights = {command_class: 0 for command_class in self._weights}
+        self._waiting: Dict[str, OrderedDict[PeerIdentity, Deque[asyncio.Future]]] = {
+            command_class: OrderedDict() for command_class in self._weights
+        }
+        # The number of the waiting commands per class. It is kept apart from
+        # the queues, so it can be read from other threads.
+        self._waiting_counts = {command_class: 0 for command_class in self._weights}
+
+    def command_class(self, command_name: str) -> str:
+        """Get the class of the given command."""
+        return self._command_classes.get(command_name, DEFAULT_COMMAND_CLASS)
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Get the number of the waiting commands per class.
+
+        The method is safe to call from other threads than the event loop.
+        """
+        return self._waiting_counts.copy()
+
+    async def acquire(self, peer_identity: PeerIdentity, command_name: str):
+        """Wait for the free slot to process the given command."""
+        if self._free > 0 and not any(self._waiting.values()):
+            self._free -= 1
+            return
+
+        command_class = self.command_class(command_name)
+        peers = self._waiting[command_class]
+        queue = peers.setdefault(peer_identity, deque())
+        future = asyncio.get_running_loop().create_future()
+        queue.append(future)
+        self._waiting_counts[command_class] += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                with suppress(ValueError):
+                    queue.remove(future)
+                    self._waiting_counts[command_class] -= 1
+                if not queue and peers.get(peer_identity) is queue:
+                    del peers[peer_identity]
+            else:
+                # The slot was given to the command before it was cancelled.
+                self.release()
+            raise
+
+    def release(self):
+        """Release the slot and admit the next waiting command."""
+        self._free += 1
+        while self._free > 0 and (future := self._next_waiting()) is not None:
+            if not future.done():
+                self._free -= 1
+                future.set_result(None)
+
+    def _next_waiting(self) -> Optional[asyncio.Future]:
+        """Remove the next command to admit from the queues and return it."""
+        classes = [
+            command_class for command_class, peers in self._waiting.items() if peers
+        ]
+        if not classes:
+            return None
+        for command_class in classes:
+            self._current_weights[command_class] += self._weights[command_class]
+        selected = max(classes, key=self._current_weights.__getitem__)
+        self._current_weights[selected] -= sum(
+            self._weights[command_class] for command_class in classes
+        )
+
+        peers = self._waiting[selected]
+        peer_identity, queue = next(iter(peers.items()))
+        future = queue.popleft()
+        self._waiting_counts[selected] -= 1
+        if queue:
+            peers.move_to_end(peer_identity)
+        else:
+            del peers[peer_identity]
+        return future
+
+
 class BaseProtocol:
     """Base protocol class."""
 
@@ -965,13 +1204,21 @@ class BaseProtocol:
         logger: logging.Logger,
         max_concurrent_commands: int = 10,
         event_callback: Optional[MessageProcessingCallback] = None,
+        command_classes: Optional[Dict[str, str]] = None,
+        command_class_weights: Optional[Dict[str, int]] = None,
     ):
-        """Initialize."""
+        """Initialize.
+
+        The command classes and their weights are passed to the
+        :class:`CommandScheduler`.
+        """
         self.communicator = communicator
         self.logger = logger
         self._should_stop = asyncio.Event()
         self._max_concurrent_commands = max_concurrent_commands
-        self._concurrent_semaphore = asyncio.Semaphore(self._max_concurrent_commands)
+        self.scheduler = CommandScheduler(
+            max_concurrent_commands, command_classes, command_class_weights
+        )
         self._event_callback = event_callback
 
     def _call_event(
@@ -989,10 +1236,11 @@ class BaseProtocol:
     ):
         """Process single command.
 
-        Use semaphore to make sure no more than max_concurrent_commands are
+        Use scheduler to make sure no more than max_concurrent_commands are
         processed at any given time.
         """
-        async with self._concurrent_semaphore:
+        await self.scheduler.acquire(peer_identity, received_message.type_data)
+        try:
             command_name = received_message.type_data
             self._call_event(
                 MessageProcessingEventType.MESSAGE_PROCESSING_STARTED,
@@ -1022,6 +1270,8 @@ class BaseProtocol:
                         "Protocol: error sending response to {received_message}."
                     )
                     await self._abort_with_error("Error sending response.")
+        finally:
+            self.scheduler.release()
 
     def post_processing_command(
         self,
@@ -1,17 +1,19 @@
 """Utils for working with zeromq."""
 
-import json
 from logging import Logger
 from typing import Any, Optional, Tuple
 
 import zmq
 import zmq.asyncio
 
-from .socket_utils import BaseCommunicator, PeerIdentity
+from .socket_utils import BaseCommunicator, PeerIdentity, decode_data, encode_data
 
 
 async def async_zmq_send_data(
-    writer: zmq.asyncio.Socket, data: dict, identity: Optional[PeerIdentity] = None
+    writer: zmq.asyncio.Socket,
+    data: dict,
+    identity: Optional[PeerIdentity] = None,
+    binary: bool = False,
 ):
     """Send data over socket.
 
@@ -22,14 +24,15 @@ async def async_zmq_send_data(
     :param writer: zeromq socket to send data to.
     :param data: JSON serializable object.
     :param identity: optional identity.
+    :param binary: use binary encoding instead of JSON.
     :raises: exception on failure.
     """
-    message = json.dumps(data, default=str).encode()
+    message = encode_data(data, binary, default=str)
     if writer.socket_type == zmq.ROUTER:
         assert identity is not None
-        await writer.send_multipart([identity, message])
+        await writer.send_multipart([identity, message], copy=False)
     else:
-        await writer.send(message)
+        await writer.send(message, copy=False)
 
 
 async def async_zmq_receive_data(
@@ -37,8 +40,8 @@ async def async_zmq_receive_data(
 ) -> Tuple[PeerIdentity, Any, Optional[bytes]]:
     """Receive data from the reader.
 
-    The data is expected to be bytes-encoded JSON representation of a Python object.
-    Received data is deserialized to a Python object and returned.
+    The data is expected to be bytes-encoded JSON (or msgpack) representation of
+    a Python object. Received data is deserialized to a Python object and returned.
 
     :returns: optional tuple where first element is the identity of the sender
     and the second one is the received message.
@@ -53,7 +56,7 @@ async def async_zmq_receive_data(
         received_identity, message = await reader.recv_multipart(copy=False)
         identity = received_identity.bytes
         user_id = str(message["User-Id"]).encode()
-    decoded = json.loads(message.bytes.decode())
+    decoded = decode_data(message.buffer)
     return (identity, decoded, user_id)
 
 
@@ -75,3 +78,11 @@ class ZMQCommunicator(BaseCommunicator):
             async_zmq_send_data,
             async_zmq_receive_data,
         )
+
+    def _framing_peer(self, identity: PeerIdentity) -> PeerIdentity:
+        """Get the key identifying the peer when negotiating framing.
+
+        The router socket communicates with many peers while other sockets
+        have a single peer.
+        """
+        return identity if self.reader.socket_type == zmq.ROUTER else b""
@@ -24,13 +24,10 @@ from resolwe.flow.managers import manager
 from resolwe.flow.models import DescriptorSchema, Process
 from resolwe.flow.models.base import VERSION_NUMBER_BITS
 from resolwe.flow.models.fields import convert_version_string_to_int
-from resolwe.flow.models.utils import validate_schema, validation_schema
+from resolwe.flow.models.utils import schema_registry, validate_schema
 from resolwe.flow.utils import dict_dot, iterate_schema
 from resolwe.permissions.utils import assign_contributor_permissions, copy_permissions
 
-PROCESSOR_SCHEMA = validation_schema("processor")
-DESCRIPTOR_SCHEMA = validation_schema("descriptor")
-
 SCHEMA_TYPE_DESCRIPTOR = "descriptor"
 SCHEMA_TYPE_PROCESS = "process"
 
@@ -55,10 +52,10 @@ class Command(BaseCommand):
             help="retire obsolete processes",
         )
 
-    def valid(self, instance, schema):
-        """Validate schema."""
+    def valid(self, instance, schema_name):
+        """Validate instance against the named validation schema."""
         try:
-            jsonschema.validate(instance, schema)
+            schema_registry.validate(instance, schema_name)
         except jsonschema.exceptions.ValidationError as ex:
             self.stderr.write(
                 "    VALIDATION ERROR: {}".format(
@@ -165,7 +162,7 @@ class Command(BaseCommand):
                         schema["type"] += ":"
             # TODO: Check if schemas validate with our JSON meta schema and Processor model docs.
 
-            if not self.valid(p, PROCESSOR_SCHEMA):
+            if not self.valid(p, "processor"):
                 continue
 
             if "entity" in p:
@@ -318,7 +315,7 @@ class Command(BaseCommand):
             if "schema" not in descriptor_schema:
                 descriptor_schema["schema"] = []
 
-            if not self.valid(descriptor_schema, DESCRIPTOR_SCHEMA):
+            if not self.valid(descriptor_schema, "descriptor"):
                 continue
 
             slug = descriptor_schema["slug"]
@@ -18,6 +18,8 @@ Workflow workload managers.
 .. automodule:: resolwe.flow.managers.listener
 .. automodule:: resolwe.flow.managers.consumer
     :members:
+.. automodule:: resolwe.flow.managers.metrics
+    :members:
 .. automodule:: resolwe.flow.managers.utils
     :members:
 
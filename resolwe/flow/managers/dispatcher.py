@@ -42,6 +42,7 @@ from resolwe.storage.models import (
 from resolwe.utils import BraceMessage as __
 
 from . import consumer, state
+from .metrics import dispatcher_metrics
 from .protocol import WorkerProtocol
 
 logger = logging.getLogger(__name__)
@@ -221,10 +222,12 @@ class Manager:
         data.save(update_fields=["scheduled"])
 
         workload_class = class_name.rsplit(".", maxsplit=1)[1]
+        dispatcher_metrics.scheduled(data, connector=workload_class)
         host, port, protocol = self._get_listener_settings(data, workload_class)
         argv[-1] += " {} {} {}".format(host, port, protocol)
 
-        return self.connectors[class_name].submit(data, argv)
+        with dispatcher_metrics.timer("submit", connector=workload_class):
+            return self.connectors[class_name].submit(data, argv)
 
     def _get_data_connector_name(self) -> str:
         """Return storage connector that will be used for new data object.
@@ -527,14 +530,16 @@ class Manager:
 
         # Prepare the executor's environment.
         try:
-            self._prepare_data_dir(data)
+            with dispatcher_metrics.timer("prepare_data_dir"):
+                self._prepare_data_dir(data)
 
             executor_module = ".{}".format(
                 getattr(settings, "FLOW_EXECUTOR", {})
                 .get("NAME", "resolwe.flow.executors.local")
                 .rpartition(".executors.")[-1]
             )
-            self._lock_inputs_local_storage_locations(data)
+            with dispatcher_metrics.timer("lock_inputs"):
+                self._lock_inputs_local_storage_locations(data)
 
             argv = [
                 "/bin/sh",
@@ -546,7 +551,8 @@ class Manager:
                 + executor_module
                 + " {}".format(data.pk),
             ]
-            self.executor.prepare_for_execution(data)
+            with dispatcher_metrics.timer("prepare_for_execution"):
+                self.executor.prepare_for_execution(data)
         except PermissionDenied as error:
             data.status = Data.STATUS_ERROR
             data.process_error.append("Permission denied for process: {}".format(error))
@@ -572,6 +578,7 @@ class Manager:
         logger.info(__("Running executor for data with id {}", data.pk))
         self.run(data, argv)
 
+    @dispatcher_metrics.timer("scan")
     def _data_scan(self, data_id: Optional[int] = None, **kwargs):
         """Scan for new Data objects and execute them.
 
@@ -675,6 +682,7 @@ class Manager:
                 ).distinct()
 
             for data in queryset:
+                dispatcher_metrics.count("examined")
                 try:
                     with transaction.atomic():
                         process_data_object(data)
@@ -517,13 +517,13 @@ class BasicCommands(ListenerPlugin):
         message.message_data = [entity_id, message.message_data, True]
         return handler(data_id, message, manager)
 
-    def handle_process_log(
-        self, data_id, message: Message[dict], manager: "Processor"
-    ) -> Response[str]:
-        """Handle an process log request."""
-        data = manager.data(data_id)
+    def _add_process_log(self, data: Data, log: dict) -> List[str]:
+        """Add the log entries to the data object.
+
+        :returns: the list of modified fields.
+        """
         changes = []
-        for key, values in message.message_data.items():
+        for key, values in log.items():
             data_key = f"process_{key}"
             changes.append(data_key)
             max_length = Data._meta.get_field(data_key).base_field.max_length
@@ -539,6 +539,14 @@ class BasicCommands(ListenerPlugin):
         if "process_error" in changes:
             data.status = Data.STATUS_ERROR
             changes.append("status")
+        return changes
+
+    def handle_process_log(
+        self, data_id, message: Message[dict], manager: "Processor"
+    ) -> Response[str]:
+        """Handle an process log request."""
+        data = manager.data(data_id)
+        changes = self._add_process_log(data, message.message_data)
         manager._save_data(data, changes)
         return message.respond_ok("OK")
 
@@ -552,3 +560,22 @@ class BasicCommands(ListenerPlugin):
         data = manager.data(data_id)
         manager._save_data(data, {"process_progress": message.message_data})
         return message.respond_ok("OK")
+
+    def handle_process_report(
+        self, data_id: int, message: Message[dict], manager: "Processor"
+    ) -> Response[str]:
+        """Handle a batched progress and log report.
+
+        The message data is a dictionary with optional keys 'progress' (the
+        latest progress) and 'log' (in the format of the process log request).
+        All the changes are saved to the data object at once.
+        """
+        data = manager.data(data_id)
+        changes = self._add_process_log(data, message.message_data.get("log", {}))
+        progress = message.message_data.get("progress")
+        if progress is not None:
+            data.process_progress = progress
+            changes.append("process_progress")
+        if changes:
+            manager._save_data(data, changes)
+        return message.respond_ok("OK")
@@ -1,6 +1,7 @@
 """Bootstrap the containers."""
 
 import copy
+import hashlib
 import json
 import logging
 import os
@@ -13,6 +14,7 @@ from typing import TYPE_CHECKING, Any, Dict, Tuple, Union
 
 from django.conf import settings
 from django.core.exceptions import PermissionDenied
+from django.db.models import F
 from django.forms.models import model_to_dict
 
 from resolwe.flow.engine import BaseEngine, InvalidEngineError, load_engines
@@ -25,9 +27,13 @@ from resolwe.test.utils import is_testing
 from resolwe.utils import BraceMessage as __
 
 from .plugin import ListenerPlugin, listener_plugin_manager
+from .redis_cache import redis_cache
 
 logger = logging.getLogger(__name__)
 
+# How long (in seconds) are the process bootstrap payloads kept in Redis.
+BOOTSTRAP_CACHE_EXPIRATION = 24 * 3600
+
 if TYPE_CHECKING:
     from resolwe.flow.managers.listener.listener import Processor
 
@@ -138,16 +144,40 @@ class BootstrapCommands(ListenerPlugin):
             }
             logger.debug("Process settings prepared.")
             self._bootstrap_cache["process"] = dict()
+            self._bootstrap_cache["settings_fingerprint"] = hashlib.sha256(
+                json.dumps(
+                    self._bootstrap_cache["settings"], sort_keys=True, default=str
+                ).encode()
+            ).hexdigest()
 
-    def bootstrap_prepare_process_cache(self, data: Data):
-        """Prepare cache for process with the given id."""
-        if data.process_id not in self._bootstrap_cache["process"]:
-            self._bootstrap_cache["process"][data.process_id] = model_to_dict(
-                data.process
-            )
-            self._bootstrap_cache["process"][data.process_id][
-                "resource_limits"
-            ] = data.process.get_resource_limits()
+    def bootstrap_prepare_process_cache(self, data: Data) -> Dict[str, Any]:
+        """Prepare and return cache for process of the given data object.
+
+        The serialized process is cached locally and in Redis, so it is shared
+        between listener replicas and survives listener restarts. The cache key
+        contains the modification time of the process and the fingerprint of
+        the settings, so the entry is invalidated when either changes.
+
+        The data object must be annotated with the 'process_modified' field.
+        """
+        identifiers = (
+            "bootstrap",
+            data.process_id,
+            data.process_modified.timestamp(),
+            self._bootstrap_cache["settings_fingerprint"],
+        )
+        cached = self._bootstrap_cache["process"].get(data.process_id)
+        if cached is None or cached[0] != identifiers:
+            payload = redis_cache.mget(Process, [identifiers])[0]
+            if payload is None:
+                payload = model_to_dict(data.process)
+                payload["resource_limits"] = data.process.get_resource_limits()
+                redis_cache.mset(
+                    Process, {identifiers: payload}, BOOTSTRAP_CACHE_EXPIRATION
+                )
+            cached = (identifiers, payload)
+            self._bootstrap_cache["process"][data.process_id] = cached
+        return cached[1]
 
     def handle_init_completed(
         self, data_id: int, message: Message[str], manager: "Processor"
@@ -169,7 +199,9 @@ class BootstrapCommands(ListenerPlugin):
         logger.debug(
             __("Bootstraping peer for id {} for settings {}.", data_id, settings_name)
         )
-        data = Data.objects.get(pk=data_id)
+        data = Data.objects.annotate(process_modified=F("process__modified")).get(
+            pk=data_id
+        )
         logger.debug(__("Read data for peer with id {}.", data_id))
 
         if is_testing():
@@ -178,7 +210,7 @@ class BootstrapCommands(ListenerPlugin):
         logger.debug(__("Prepared static cache for peer {}.", data_id))
 
         response: Dict[str, Any] = dict()
-        self.bootstrap_prepare_process_cache(data)
+        process_payload = self.bootstrap_prepare_process_cache(data)
         logger.debug(__("Prepared process cache for peer {}.", data_id))
 
         if settings_name == "executor":
@@ -190,9 +222,7 @@ class BootstrapCommands(ListenerPlugin):
                 "settings"
             ].copy()
             response[ExecutorFiles.PROCESS_META] = self._bootstrap_cache["process_meta"]
-            response[ExecutorFiles.PROCESS] = self._bootstrap_cache["process"][
-                data.process.id
-            ]
+            response[ExecutorFiles.PROCESS] = process_payload
 
         elif settings_name == "init":
             response[ExecutorFiles.DJANGO_SETTINGS] = {
@@ -58,7 +58,7 @@ from .basic_commands_plugin import BasicCommands  # noqa: F401
 from .bootstrap_plugin import BootstrapCommands  # noqa: F401
 from .plugin import listener_plugin_manager as plugin_manager
 from .python_process_plugin import PythonProcess  # noqa: F401
-from .redis_cache import RedisLockStatus, cache_manager, redis_server
+from .redis_cache import RedisLockStatus, cache_manager, get_async_redis_server
 
 # Unique redis object to use in listener.
 
@@ -545,6 +545,8 @@ class ListenerProtocol(BaseProtocol):
         protocol: str,
         zmq_socket: Optional[zmq.asyncio.Socket] = None,
         max_concurrent_commands: int = 10,
+        command_classes: Optional[Dict[str, str]] = None,
+        command_class_weights: Optional[Dict[str, int]] = None,
     ):
         """Initialize."""
         if zmq_socket is None:
@@ -565,7 +567,10 @@ class ListenerProtocol(BaseProtocol):
             logger,
             max_concurrent_commands,
             metrics_reporter,
+            command_classes,
+            command_class_weights,
         )
+        metrics_reporter.observe_scheduler(self.scheduler)
         self.communicator.heartbeat_handler = self.heartbeat_handler
         self._message_processor = Processor(self)
 
@@ -579,12 +584,10 @@ class ListenerProtocol(BaseProtocol):
             one_day = 24 * one_hour
             data_id = abs(int(peer_identity))
             redis_key = f"resolwe-worker-{data_id}"
-            redis_server.set(redis_key, int(time()))
-
             # Make sure the expiration time is longer than the highest timeout
             # (currently one week). Otherwise the entry will expire before the timeout
             # is reached.
-            redis_server.expire(redis_key, 8 * one_day)
+            await get_async_redis_server().set(redis_key, int(time()), ex=8 * one_day)
         except Exception:
             logger.exception("Exception in heartbeat handler.")
 
@@ -626,17 +629,19 @@ class ListenerProtocol(BaseProtocol):
         }
 
         current_timestamp = int(time())
-        for data_id, worker_status in await database_sync_to_async(
-            get_data, thread_sensitive=False
-        )():
-            redis_key = f"resolwe-worker-{data_id}"
-            last_seen = redis_server.get(redis_key)
+        workers = await database_sync_to_async(get_data, thread_sensitive=False)()
+        if not workers:
+            return
+        redis_server = get_async_redis_server()
+        redis_keys = [f"resolwe-worker-{data_id}" for data_id, _ in workers]
+        for (data_id, worker_status), redis_key, last_seen in zip(
+            workers, redis_keys, await redis_server.mget(redis_keys)
+        ):
             if last_seen is None:
-                redis_server.set(redis_key, current_timestamp)
                 # Make sure the expiration time is longer than the highest timeout
                 # (currently one week). Otherwise the entry will expire before the
                 # timeout is reached.
-                redis_server.expire(redis_key, 8 * one_day)
+                await redis_server.set(redis_key, current_timestamp, ex=8 * one_day)
             else:
                 last_seen = int(last_seen)
             without_heartbeat = current_timestamp - (last_seen or current_timestamp)
@@ -698,12 +703,21 @@ class ListenerProtocol(BaseProtocol):
         while True:
             await asyncio.sleep(refresh_interval)
             try:
-                cache_manager.extend_lock(
-                    Data, [(data_id, message_uuid)], valid_for=extend_for
+                await cache_manager.aextend_lock(
+                    Data, (data_id, message_uuid), valid_for=extend_for
                 )
             except Exception:
                 logger.exception("Error extending lock.")
 
+    def _process_command(
+        self, peer_identity: PeerIdentity, received_message: Message
+    ) -> Response:
+        """Process the command in the database thread and profile the handler."""
+        with metrics_reporter.profile_handler(received_message, peer_identity):
+            return self._message_processor.process_command(
+                peer_identity, received_message
+            )
+
     async def default_command_handler(
         self, received_message: Message, peer_identity: PeerIdentity
     ) -> Response:
@@ -751,9 +765,16 @@ class ListenerProtocol(BaseProtocol):
             # message can be processed twice. We can avoid processing the message twice
             # but then all processes that have messages in the listener queue will fail
             # if the listener chashes.
-            success, lock_status = cache_manager.lock(
-                Data, [(data_id, received_message.uuid)]
+            lock_started = time()
+            success, lock_status = (
+                await cache_manager.alock(Data, [(data_id, received_message.uuid)])
             )[0]
+            metrics_reporter.event(
+                MessageProcessingEventType.LOCK_ACQUIRED,
+                received_message,
+                peer_identity,
+                duration=time() - lock_started,
+            )
             if not success:
                 response = self._handle_lock_message_error(
                     lock_status, received_message
@@ -763,7 +784,7 @@ class ListenerProtocol(BaseProtocol):
                     self.extend_processing_lock(data_id, received_message.uuid)
                 )
                 response = await database_sync_to_async(
-                    self._message_processor.process_command, thread_sensitive=False
+                    self._process_command, thread_sensitive=False
                 )(peer_identity, received_message)
         finally:
             # Stop the extend lock task.
@@ -778,7 +799,7 @@ class ListenerProtocol(BaseProtocol):
                 unlock_status = RedisLockStatus.ERROR
             else:
                 unlock_status = RedisLockStatus.OK
-            cache_manager.unlock(
+            await cache_manager.aunlock(
                 Data, [(data_id, received_message.uuid)], status=unlock_status
             )
         self.logger.debug(__("Response time: {}", received_message.time_elapsed()))
@@ -859,6 +880,17 @@ class ExecutorListener:
             ),
         )
 
+        # The classes of the commands and the weights of the classes used when
+        # scheduling the commands. When not set, the defaults are used.
+        self.command_classes = kwargs.get(
+            "command_classes",
+            getattr(settings, "LISTENER_CONNECTION", {}).get("command_classes"),
+        )
+        self.command_class_weights = kwargs.get(
+            "command_class_weights",
+            getattr(settings, "LISTENER_CONNECTION", {}).get("command_class_weights"),
+        )
+
         # When zmq_socket kwarg is not None, use this one instead of creating
         # a new one.
         self.zmq_socket = kwargs.get("zmq_socket")
@@ -905,6 +937,8 @@ class ExecutorListener:
                 self.protocol,
                 self.zmq_socket,
                 self.max_concurrent_commands,
+                self.command_classes,
+                self.command_class_weights,
             )
         return self._listener_protocol
 
@@ -955,6 +989,7 @@ class ExecutorListener:
         logger.debug("Awaiting runner future.")
         await asyncio.gather(self._runner_future)
         self._listener_protocol = None
+        metrics_reporter.dump_profile()
         logger.debug("Listener exited context.")
 
     def terminate(self):
@@ -1,30 +1,35 @@
 """Report the listener metrics to the monitoring system."""
 
+import json
 import logging
 import socket
+import threading
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
 from time import time
-from typing import Any
+from typing import Any, Iterable, Optional
 
 from django.conf import settings
+from django.db import connection
 from opentelemetry import metrics
-from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
-from opentelemetry.sdk.metrics import MeterProvider
-from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
-from opentelemetry.sdk.resources import Resource
+from opentelemetry.metrics import CallbackOptions, Observation
 
 from resolwe.flow.executors.socket_utils import (
+    CommandScheduler,
     Message,
     MessageProcessingCallback,
     MessageProcessingEventType,
     PeerIdentity,
 )
+from resolwe.flow.managers.listener.redis_cache import redis_calls
+from resolwe.flow.managers.metrics import create_meter
 
 logger = logging.getLogger(__name__)
 
-# How often to export metrics (in milliseconds).
-METRICS_EXPORT_INTERVAL = 30000
-# TODO: Remove this when metrics are properly implemented.
-METRICS_INSECURE_EXPORT = True
+# How often to write the local profile of the commands (in seconds).
+PROFILE_DUMP_INTERVAL = 30
 
 
 class MetricsEventReporter(MessageProcessingCallback):
@@ -36,6 +41,24 @@ class MetricsEventReporter(MessageProcessingCallback):
 
     def __init__(self):
         """Initialize the metrics event reporter."""
+        self._scheduler: Optional[CommandScheduler] = None
+        self._hostname = socket.gethostname()
+
+        # Create the dictionaries with the appropriate timestamps.
+        self._processing_started: dict[bytes, float] = {}
+        self._message_received: dict[bytes, float] = {}
+
+        # The local profile maps the command names and measurement names to
+        # the number, sum and maximum of the measured values.
+        self._profile_path = getattr(settings, "FLOW_METRICS_PROFILE_PATH", None)
+        self._profile: dict[str, dict[str, list[float]]] = defaultdict(
+            lambda: defaultdict(lambda: [0, 0, 0])
+        )
+        self._profile_lock = threading.Lock()
+        self._profile_dumped = time()
+        if self._profile_path:
+            logger.info("Writing listener profile to %s.", self._profile_path)
+
         if not (endpoint := getattr(settings, "FLOW_METRICS_ENDPOINT", None)):
             logger.info("Metrics endpoint is not set, reporting disabled.")
             self._enabled = False
@@ -44,7 +67,6 @@ class MetricsEventReporter(MessageProcessingCallback):
             )
         else:
             logger.info("Reporting metrics to endpoint %s.", endpoint)
-            self._hostname = socket.gethostname()
             self._enabled = True
             self._init_metrics(endpoint)
 
@@ -53,29 +75,15 @@ class MetricsEventReporter(MessageProcessingCallback):
         self._processing_messages = 0
         self._queued_messages = 0
 
-        # Create the dictionaries with the appropriate timestamps.
-        self._processing_started: dict[bytes, float] = {}
-        self._message_received: dict[bytes, float] = {}
-
         # Initialize the opentelemetry metrics.
-        metric_exporter = OTLPMetricExporter(
-            endpoint=metric_endpoint,
-            insecure=METRICS_INSECURE_EXPORT,
-            max_export_batch_size=getattr(settings, "FLOW_METRICS_EXPORT_SIZE", 1000),
-        )
-        metric_reader = PeriodicExportingMetricReader(
-            metric_exporter, METRICS_EXPORT_INTERVAL
-        )
-        provider = MeterProvider(
-            metric_readers=[metric_reader],
-            resource=Resource.create({"service.name": "listener"}),
-        )
+        meter = create_meter(metric_endpoint, "listener")
 
-        # Sets the global default meter provider
-        metrics.set_meter_provider(provider)
-
-        # Creates a meter from the global meter provider
-        meter = metrics.get_meter("listener")
+        # The queue depths are read from the scheduler on every export.
+        meter.create_observable_gauge(
+            name=f"{self.metrics_prefix}_commands_waiting",
+            callbacks=[self._observe_queue_depths],
+            description="Number of commands waiting for processing per class.",
+        )
 
         # Create the metrics.
         self._messages_queued = meter.create_up_down_counter(
@@ -107,6 +115,50 @@ class MetricsEventReporter(MessageProcessingCallback):
             description="Time messages spent in the transfer.",
         )
 
+        # The per-command measurements, see the '_record' method.
+        self._command_instruments = {
+            "queue_wait": meter.create_histogram(
+                name=f"{self.metrics_prefix}_queue_wait_duration",
+                unit="miliseconds",
+                description="Time messages waited for processing.",
+            ).record,
+            "lock": meter.create_histogram(
+                name=f"{self.metrics_prefix}_lock_duration",
+                unit="miliseconds",
+                description="Time spent acquiring the message lock.",
+            ).record,
+            "handler": meter.create_histogram(
+                name=f"{self.metrics_prefix}_handler_duration",
+                unit="miliseconds",
+                description="Time spent in the command handler.",
+            ).record,
+            "queries": meter.create_counter(
+                name=f"{self.metrics_prefix}_database_queries",
+                description="Number of database queries made by the handlers.",
+            ).add,
+            "redis_calls": meter.create_counter(
+                name=f"{self.metrics_prefix}_redis_calls",
+                description="Number of Redis calls made by the handlers.",
+            ).add,
+        }
+
+    def observe_scheduler(self, scheduler: CommandScheduler):
+        """Report the queue depths of the given command scheduler."""
+        self._scheduler = scheduler
+
+    def _observe_queue_depths(self, options: CallbackOptions) -> Iterable[Observation]:
+        """Get the number of waiting commands per class.
+
+        The callback runs in the exporter thread, so only the counters of the
+        scheduler are read, not its queues.
+        """
+        if self._scheduler is None:
+            return []
+        return [
+            Observation(depth, {"class": command_class, "pod": self._hostname})
+            for command_class, depth in self._scheduler.queue_depths().items()
+        ]
+
     def _counter_changed(
         self, counter: metrics.UpDownCounter, value: int, attributes: dict
     ):
@@ -125,8 +177,8 @@ class MetricsEventReporter(MessageProcessingCallback):
         **kwargs,
     ):
         """Process the event from the message processing pipeline."""
-        # Do not proceed if metric reporting is disabled.
-        if not self._enabled:
+        # Do not proceed if metric reporting and profiling are disabled.
+        if not (self._enabled or self._profile_path):
             return
 
         if message.client_id is None:
@@ -138,20 +190,31 @@ class MetricsEventReporter(MessageProcessingCallback):
 
         match event_type:
             case MessageProcessingEventType.MESSAGE_RECEIVED:
-                self._queued_messages += 1
-                self._counter_changed(self._messages_queued, 1, attributes)
                 self._message_received[message.client_id] = time()
-                value = (
-                    self._message_received[message.client_id] - message.sent_timestamp
-                )
-                self._network_time_histogram.record(value * 1000, attributes)
+                if self._enabled:
+                    self._queued_messages += 1
+                    self._counter_changed(self._messages_queued, 1, attributes)
+                    value = (
+                        self._message_received[message.client_id]
+                        - message.sent_timestamp
+                    )
+                    self._network_time_histogram.record(value * 1000, attributes)
 
             case MessageProcessingEventType.MESSAGE_PROCESSING_STARTED:
-                self._processing_messages += 1
-                self._counter_changed(self._messages_processing, 1, attributes)
                 self._processing_started[message.client_id] = time()
+                if message.client_id in self._message_received:
+                    queue_wait = (
+                        self._processing_started[message.client_id]
+                        - self._message_received[message.client_id]
+                    )
+                    self._record("queue_wait", queue_wait * 1000, attributes)
+                if self._enabled:
+                    self._processing_messages += 1
+                    self._counter_changed(self._messages_processing, 1, attributes)
 
             case MessageProcessingEventType.PREPARATION_FINISHED:
+                if not self._enabled:
+                    return
                 # This type expects the 'started' unix timestamp in kwargs.
                 if "started" not in kwargs:
                     logger.error(
@@ -161,11 +224,23 @@ class MetricsEventReporter(MessageProcessingCallback):
                 preparation_time = time() - kwargs["started"]
                 self._preparation_time_histogram.record(preparation_time, attributes)
 
+            case MessageProcessingEventType.LOCK_ACQUIRED:
+                # This type expects the 'duration' in seconds in kwargs.
+                self._record("lock", kwargs["duration"] * 1000, attributes)
+
+            case MessageProcessingEventType.HANDLER_FINISHED:
+                # This type expects the 'duration' in seconds and the numbers
+                # of 'queries' and 'redis_calls' in kwargs.
+                self._record("handler", kwargs["duration"] * 1000, attributes)
+                self._record("queries", kwargs["queries"], attributes)
+                self._record("redis_calls", kwargs["redis_calls"], attributes)
+
             case MessageProcessingEventType.MESSAGE_PROCESSING_FINISHED:
-                self._processing_messages -= 1
-                self._queued_messages -= 1
-                self._counter_changed(self._messages_processing, -1, attributes)
-                self._counter_changed(self._messages_queued, -1, attributes)
+                if self._enabled:
+                    self._processing_messages -= 1
+                    self._queued_messages -= 1
+                    self._counter_changed(self._messages_processing, -1, attributes)
+                    self._counter_changed(self._messages_queued, -1, attributes)
 
                 if message.client_id not in self._processing_started:
                     logger.error(
@@ -182,6 +257,8 @@ class MetricsEventReporter(MessageProcessingCallback):
 
                 processing_started = self._processing_started.pop(message.client_id)
                 message_received = self._message_received.pop(message.client_id)
+                if not self._enabled:
+                    return
                 processing_finished = time()
                 response_time = processing_finished - message_received
                 processing_time = processing_finished - processing_started
@@ -190,5 +267,115 @@ class MetricsEventReporter(MessageProcessingCallback):
                     processing_time * 1000, attributes
                 )
 
+    @contextmanager
+    def profile_handler(self, message: Message, peer_identity: PeerIdentity):
+        """Measure the duration, database queries and Redis calls of the handler.
+
+        The context must be entered in the thread running the handler.
+        """
+        if not (self._enabled or self._profile_path):
+            yield
+            return
+
+        calls: Counter = Counter()
+
+        def count_query(execute, sql, params, many, context):
+            calls["queries"] += 1
+            return execute(sql, params, many, context)
+
+        # The Redis round trips are counted by the listener Redis clients.
+        token = redis_calls.set(calls)
+        started = time()
+        try:
+            with connection.execute_wrapper(count_query):
+                yield
+        finally:
+            redis_calls.reset(token)
+            self.event(
+                MessageProcessingEventType.HANDLER_FINISHED,
+                message,
+                peer_identity,
+                duration=time() - started,
+                queries=calls["queries"],
+                redis_calls=calls["redis"],
+            )
+
+    def _record(self, name: str, value: float, attributes: dict[str, Any]):
+        """Record the value of the per-command measurement.
+
+        The value is exported to the monitoring system and added to the local
+        profile when they are enabled.
+        """
+        if self._enabled:
+            self._command_instruments[name](value, attributes)
+        if self._profile_path:
+            with self._profile_lock:
+                count, total, maximum = self._profile[attributes["command"]][name]
+                self._profile[attributes["command"]][name] = [
+                    count + 1,
+                    total + value,
+                    max(maximum, value),
+                ]
+                profile = None
+                if time() - self._profile_dumped > PROFILE_DUMP_INTERVAL:
+                    # Decide under the lock, so only one caller dumps it.
+                    self._profile_dumped = time()
+                    profile = self._profile_summary()
+            if profile is not None:
+                # The method is called from the event loop, do not block it
+                # with the file system operations.
+                threading.Thread(
+                    target=self._write_profile, args=(profile,), daemon=True
+                ).start()
+
+    def _profile_summary(self) -> dict[str, dict[str, dict[str, float]]]:
+        """Summarize the profile of the commands.
+
+        The profile lock must be held by the caller.
+        """
+        return {
+            command: {
+                name: {
+                    "count": count,
+                    "total": total,
+                    "mean": total / count,
+                    "max": maximum,
+                }
+                for name, (count, total, maximum) in measurements.items()
+                if count
+            }
+            for command, measurements in self._profile.items()
+        }
+
+    def _write_profile(self, profile: dict[str, dict[str, dict[str, float]]]):
+        """Write the summarized profile to the JSON file.
+
+        The file is replaced atomically with a uniquely named temporary file,
+        so the concurrent writers never write to the same file.
+        """
+        path = Path(self._profile_path)
+        temporary_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            temporary_path.write_text(
+                json.dumps({"pod": self._hostname, "commands": profile}, indent=2)
+            )
+            temporary_path.replace(path)
+        except OSError:
+            logger.exception("Unable to write the listener profile to %s.", path)
+            temporary_path.unlink(missing_ok=True)
+
+    def dump_profile(self):
+        """Write the profile of the commands to the JSON file.
+
+        For every command and measurement the number of values, their sum,
+        mean and maximum are written. The durations are in milliseconds.
+        """
+        if not self._profile_path:
+            return
+        with self._profile_lock:
+            self._profile_dumped = time()
+            profile = self._profile_summary()
+        self._write_profile(profile)
+
 
 metrics_reporter = MetricsEventReporter()
@@ -1,5 +1,6 @@
 """Command handlers for python processes."""
 
+import hashlib
 import importlib
 import logging
 import os
@@ -13,6 +14,7 @@ from django.apps import apps
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.postgres.fields.jsonb import JSONField as JSONFieldb
+from django.db import transaction
 from django.db.models import ForeignKey, JSONField, ManyToManyField, Model, Q, Value
 from django.db.models.functions import Concat
 
@@ -58,6 +60,7 @@ class PythonProcess(ListenerPlugin):
         """Initialize plugin."""
         self._permission_manager = permission_manager
         self._hydrate_cache: Dict[int, str] = dict()
+        self._python_runtime: Optional[Tuple[str, str]] = None
         super().__init__()
 
     def handle_resolve_data_path(
@@ -265,22 +268,19 @@ class PythonProcess(ListenerPlugin):
         )
         return message.respond_ok(to_return)
 
-    def handle_update_model_fields(
+    def _update_model_fields(
         self,
         data_id: int,
-        message: Message[Tuple[str, str, int, Dict[str, Any]]],
+        app_name: str,
+        model_name: str,
+        model_pk: int,
+        mapping: Dict[str, Any],
         manager: "Processor",
-    ) -> Response[str]:
-        """Update the value for the given fields.
-
-        The received message format is
-        (app_name, model name, model primary key, names -> values).
-
-        Field name can be given in dot notation for JSON fields.
+    ):
+        """Update the value for the given fields of the given model.
 
         :raises RuntimeError: if user has no permissions to modify the object.
         """
-        app_name, model_name, model_pk, mapping = message.message_data
         full_model_name = f"{app_name}.{model_name}"
 
         model = apps.get_model(app_name, model_name)
@@ -331,6 +331,50 @@ class PythonProcess(ListenerPlugin):
                 update_fields.append(field_name)
                 setattr(model_instance, field_name, field_value)
         model_instance.save(update_fields=update_fields)
+
+    def handle_update_model_fields(
+        self,
+        data_id: int,
+        message: Message[Tuple[str, str, int, Dict[str, Any]]],
+        manager: "Processor",
+    ) -> Response[str]:
+        """Update the value for the given fields.
+
+        The received message format is
+        (app_name, model name, model primary key, names -> values).
+
+        Field name can be given in dot notation for JSON fields.
+
+        :raises RuntimeError: if user has no permissions to modify the object.
+        """
+        app_name, model_name, model_pk, mapping = message.message_data
+        self._update_model_fields(
+            data_id, app_name, model_name, model_pk, mapping, manager
+        )
+        return message.respond_ok("OK")
+
+    def handle_bulk_update_model_fields(
+        self,
+        data_id: int,
+        message: Message[List[Tuple[str, str, int, Dict[str, Any]]]],
+        manager: "Processor",
+    ) -> Response[str]:
+        """Update the value for the given fields on multiple objects.
+
+        The received message is a list of entries in the format
+        (app_name, model name, model primary key, names -> values).
+
+        The updates are applied in the given order inside a single
+        transaction: either all of them are applied or none.
+
+        :raises RuntimeError: if user has no permissions to modify one of the
+            objects.
+        """
+        with transaction.atomic():
+            for app_name, model_name, model_pk, mapping in message.message_data:
+                self._update_model_fields(
+                    data_id, app_name, model_name, model_pk, mapping, manager
+                )
         return message.respond_ok("OK")
 
     def handle_get_model_fields_details(
@@ -364,9 +408,9 @@ class PythonProcess(ListenerPlugin):
     def handle_get_model_fields(
         self,
         data_id: int,
-        message: Message[Tuple[str, str, int, List[str]]],
+        message: Message[Tuple[str, str, Union[int, List[int]], List[str]]],
         manager: "Processor",
-    ) -> Response[Dict[str, Any]]:
+    ) -> Response[Union[Dict[str, Any], List[Dict[str, Any]]]]:
         """Return the value of the given model for the given fields.
 
         The received message format is
@@ -374,21 +418,33 @@ class PythonProcess(ListenerPlugin):
 
         In case of JSON field the field name can contain underscores to get
         only the part of the JSON we are interested in.
+
+        When the list of primary keys is given the values for all the objects
+        are retrieved with a single query. The response is then a list of
+        dictionaries (one per readable object) that also contain the key 'id'.
         """
         app_name, model_name, model_pk, field_names = message.message_data
         full_model_name = f"{app_name}.{model_name}"
 
         model = apps.get_model(app_name, model_name)
+        if isinstance(model_pk, list):
+            queryset = model.objects.filter(pk__in=model_pk)
+        else:
+            queryset = model.objects.filter(pk=model_pk)
         filtered_objects = self._permission_manager.filter_objects(
             manager.contributor(data_id),
             full_model_name,
-            model.objects.filter(pk=model_pk),
+            queryset,
             data_id,
         )
-        values = filtered_objects.values(*field_names)
         # NOTE: non JSON serializable fields are NOT supported. If such field
         # is requested the exception will be handled one level above and
         # response with status error will be returned.
+        if isinstance(model_pk, list):
+            field_names = ["id"] + [name for name in field_names if name != "id"]
+            return message.respond_ok(list(filtered_objects.values(*field_names)))
+
+        values = filtered_objects.values(*field_names)
         if values.count() == 1:
             values = values.get()
         else:
@@ -431,14 +487,13 @@ class PythonProcess(ListenerPlugin):
         process_requirements["resources"] = limits
         return message.respond_ok(process_requirements)
 
-    def handle_get_python_runtime(
-        self, data_id: int, message: Message[str], manager: "Processor"
-    ) -> Response[str]:
-        """Return the Python Process runtime.
+    def _build_python_runtime(self) -> Tuple[str, str]:
+        """Zip the Python process runtime.
 
-        It is gzipped and returned as b64encoded string.
+        :returns: tuple (digest, runtime) where digest is the SHA256 hash of the
+            runtime source tree and runtime is b64encoded zip archive.
         """
-
+        hasher = hashlib.sha256()
         zipped = BytesIO()
         with ZipFile(file=zipped, mode="w", compression=ZIP_STORED) as zip_handle:
             for runtime_class_name in settings.FLOW_PROCESSES_RUNTIMES:
@@ -450,18 +505,42 @@ class PythonProcess(ListenerPlugin):
                 source_dir = Path(source_path).parent
 
                 base_destination = Path(*module_name.split(".")[:-1])
-                for source_entry in source_dir.rglob("*.py"):
+                for source_entry in sorted(source_dir.rglob("*.py")):
                     relative_path = source_entry.relative_to(source_dir)
                     destination = base_destination / relative_path
-                    zip_handle.write(source_entry, destination)
+                    content = source_entry.read_bytes()
+                    hasher.update(os.fsencode(destination))
+                    hasher.update(hashlib.sha256(content).digest())
+                    zip_handle.writestr(os.fspath(destination), content)
 
                 # Create missing __init__.py files with empty content.
                 for path in list(Path(*module_name.split(".")).parents)[1:-1]:
                     zip_destination = path / "__init__.py"
                     zip_handle.writestr(os.fspath(zip_destination), "")
+                    hasher.update(os.fsencode(zip_destination))
 
         zipped.seek(0)
-        return message.respond_ok(b64encode(zipped.read()).decode())
+        return hasher.hexdigest(), b64encode(zipped.read()).decode()
+
+    def handle_get_python_runtime(
+        self, data_id: int, message: Message[Optional[str]], manager: "Processor"
+    ) -> Response[Tuple[str, Optional[str]]]:
+        """Return the Python Process runtime.
+
+        The runtime is zipped and returned as b64encoded string together with
+        the digest of its content. It is built only once and cached for the
+        lifetime of the listener.
+
+        The message data may contain the digest of the runtime cached by the
+        executor. When it matches the digest of the current runtime, None is
+        sent instead of the runtime.
+        """
+        if self._python_runtime is None:
+            self._python_runtime = self._build_python_runtime()
+        digest, runtime = self._python_runtime
+        if message.message_data == digest:
+            return message.respond_ok((digest, None))
+        return message.respond_ok((digest, runtime))
 
     def handle_get_user_model_label(
         self, data_id: int, message: Message[str], manager: "Processor"
@@ -1,9 +1,13 @@
 """The redis cache for Django ORM."""
 
+import asyncio
 import logging
 import pickle
 import time
+import weakref
+from collections import Counter
 from contextlib import suppress
+from contextvars import ContextVar
 from datetime import datetime
 from enum import Enum
 from functools import partial
@@ -12,6 +16,7 @@ from os import getpid
 from typing import Any, Iterable, Optional, Sequence, Type, Union
 
 import redis
+import redis.asyncio
 from django.conf import settings
 from django.db import models
 
@@ -19,11 +24,64 @@ from resolwe.flow.managers.listener.plugin_interface import Plugin, PluginManage
 from resolwe.flow.models import Data
 from resolwe.utils import BraceMessage as __
 
-redis_server = redis.from_url(
-    getattr(settings, "REDIS_CONNECTION_STRING", "redis://localhost")
+REDIS_CONNECTION_STRING = getattr(
+    settings, "REDIS_CONNECTION_STRING", "redis://localhost"
 )
 logger = logging.getLogger(__name__)
 
+#: The counter of the Redis round trips made by the clients of this module in
+#: the current context. The round trips are only counted while it is set.
+redis_calls: ContextVar[Optional[Counter]] = ContextVar("redis_calls", default=None)
+
+
+class CountingConnectionMixin:
+    """Count the round trips to the Redis server in the ``redis_calls`` counter.
+
+    Every command and every pipeline is sent to the server with a single call
+    of ``send_packed_command``.
+    """
+
+    def send_packed_command(self, *args, **kwargs):
+        """Count the call and send the command."""
+        if (calls := redis_calls.get()) is not None:
+            calls["redis"] += 1
+        return super().send_packed_command(*args, **kwargs)
+
+
+def counting_client(client: Union[redis.Redis, redis.asyncio.Redis]):
+    """Count the round trips made by the given client.
+
+    The connection class chosen by the connection string is extended, so only
+    the connections of the given client are affected.
+    """
+    pool = client.connection_pool
+    pool.connection_class = type(
+        f"Counting{pool.connection_class.__name__}",
+        (CountingConnectionMixin, pool.connection_class),
+        {},
+    )
+    return client
+
+
+redis_server = counting_client(redis.from_url(REDIS_CONNECTION_STRING))
+
+# The asynchronous Redis clients, one per event loop. The connections in the
+# connection pool of the client can only be used by the loop they were created
+# in.
+_async_redis_servers: (
+    "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, redis.asyncio.Redis]"
+) = weakref.WeakKeyDictionary()
+
+
+def get_async_redis_server() -> redis.asyncio.Redis:
+    """Get the asynchronous Redis client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _async_redis_servers:
+        _async_redis_servers[loop] = counting_client(
+            redis.asyncio.from_url(REDIS_CONNECTION_STRING)
+        )
+    return _async_redis_servers[loop]
+
 
 class RedisLockStatus(Enum):
     """Redis lock status."""
@@ -49,24 +107,19 @@ Identifier = Sequence
 Cache = dict[Identifier, FieldValues]
 
 
-class RedisCache:
-    """Stores a dictionaries with striLahkongs for keys.
+def unpickle(data: Optional[bytes]) -> Optional[Any]:
+    """Unpickle the data.
 
-    They are stored as hashes in Redis with pickle dumps as values.
+    When data is None return None.
     """
+    return pickle.loads(data) if data is not None else None
 
-    # Max number of keys to retrieve from Redis in a single batch.
-    KEY_BATCH_SIZE = 10000
 
-    def __init__(self, *args, **kwargs):
-        """Set the cached field set."""
-        # The set of fields on the data object that can be safely cached inside
-        # Redis to avoid hitting the database (we are assuming Redis is faster).
-        # The list contains a set of commonly used fields that do not change
-        # from the outside (or do no harm if they do).
+class BaseRedisCache:
+    """The Redis keys of the cached objects and their locks."""
 
-        self._redis = redis_server
-        super().__init__(*args, **kwargs)
+    # Max number of keys to retrieve from Redis in a single batch.
+    KEY_BATCH_SIZE = 10000
 
     def _model_str(self, Model: Optional[Type[models.Model]]) -> str:
         """Get string representation for the given content type."""
@@ -120,19 +173,32 @@ class RedisCache:
         ]
         return ":".join([part for part in parts if part])
 
+    def _lock_key(self, Model: Type[models.Model], identifiers: Sequence) -> str:
+        """Get the key for the lock for the given entry."""
+        return self._get_redis_key_prefix(Model, identifiers, "__lock__")
+
+
+class RedisCache(BaseRedisCache):
+    """Stores a dictionaries with striLahkongs for keys.
+
+    They are stored as hashes in Redis with pickle dumps as values.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Set the cached field set."""
+        # The set of fields on the data object that can be safely cached inside
+        # Redis to avoid hitting the database (we are assuming Redis is faster).
+        # The list contains a set of commonly used fields that do not change
+        # from the outside (or do no harm if they do).
+
+        self._redis = redis_server
+        super().__init__(*args, **kwargs)
+
     def _get_redis_data(self, redis_keys: Sequence[str]) -> list[Optional[Any]]:
         """Retrieve the data from Redis for the given keys.
 
         The data is also unpickled, None is returned when data is not cached.
         """
-
-        def unpickle(data: Optional[bytes]) -> Optional[FieldValues]:
-            """Unpickle the data.
-
-            When data is None return None.
-            """
-            return pickle.loads(data) if data is not None else None
-
         cached_data: list[Optional[FieldValues]] = list()
         for batch_keys in chunked(redis_keys, self.KEY_BATCH_SIZE):
             try:
@@ -174,10 +240,6 @@ class RedisCache:
         redis_keys = list(map(get_redis_key, identifiers_list))
         return self._get_redis_data(redis_keys)
 
-    def _lock_key(self, Model: Type[models.Model], identifiers: Sequence) -> str:
-        """Get the key for the lock for the given entry."""
-        return self._get_redis_key_prefix(Model, identifiers, "__lock__")
-
     def lock(
         self,
         Model: Type[models.Model],
@@ -418,6 +480,137 @@ class RedisCache:
 redis_cache = RedisCache()
 
 
+class AsyncRedisCache(BaseRedisCache):
+    """The asynchronous variant of the :class:`RedisCache`.
+
+    Only the operations used by the coroutines of the listener are available.
+    The keys and the values are compatible with the :class:`RedisCache`.
+    """
+
+    @property
+    def _redis(self) -> redis.asyncio.Redis:
+        """Get the Redis client for the running event loop."""
+        return get_async_redis_server()
+
+    async def _get_redis_data(self, redis_keys: Sequence[str]) -> list[Optional[Any]]:
+        """Retrieve the data from Redis for the given keys.
+
+        The data is also unpickled, None is returned when data is not cached.
+        """
+        cached_data: list[Optional[Any]] = list()
+        for batch_keys in chunked(redis_keys, self.KEY_BATCH_SIZE):
+            try:
+                batch_data = await self._redis.mget(*batch_keys)
+            except redis.exceptions.RedisError:
+                logger.exception(
+                    __(
+                        "Could not retrieve data from Redis for keys: '{}'.",
+                        ", ".join(batch_keys),
+                    )
+                )
+                raise
+            cached_data.extend(map(unpickle, batch_data))
+        return cached_data
+
+    async def mget(
+        self, Model: Type[models.Model], identifiers_list: Sequence[Identifier]
+    ) -> list[Optional[FieldValues]]:
+        """Obtain the set of fields from the redis cache.
+
+        See :meth:`RedisCache.mget`.
+        """
+        get_redis_key = partial(self.get_redis_key, Model)
+        return await self._get_redis_data(list(map(get_redis_key, identifiers_list)))
+
+    async def lock(
+        self,
+        Model: Type[models.Model],
+        identifiers_list: Sequence[Identifier],
+        valid_for: int = 300,
+    ) -> list[tuple[bool, RedisLockStatus]]:
+        """Set the lock for the given entry.
+
+        See :meth:`RedisCache.lock`.
+        """
+        data = pickle.dumps(RedisLockStatus.PROCESSING)
+        pipe = self._redis.pipeline()
+        for identifier in identifiers_list:
+            key = self._lock_key(Model, identifier)
+            pipe = pipe.set(key, data, ex=valid_for, nx=True).get(key)
+        results = await pipe.execute()
+        return [
+            (status == True, pickle.loads(value))
+            for status, value in zip(results[::2], results[1::2])
+        ]
+
+    async def unlock(
+        self,
+        Model: Type[models.Model],
+        identifiers_list: Sequence[Identifier],
+        status: RedisLockStatus = RedisLockStatus.OK,
+    ):
+        """Release the lock for the given entry with status.
+
+        See :meth:`RedisCache.unlock`.
+
+        :raise AssertionError: when status in not OK or ERROR.
+        """
+        assert status in (RedisLockStatus.OK, RedisLockStatus.ERROR)
+        valid_for = 24 * 60 * 60  # One day.
+        status_pickle = pickle.dumps(status)
+        pipe = self._redis.pipeline(transaction=False)
+        for identifier in identifiers_list:
+            pipe = pipe.set(
+                self._lock_key(Model, identifier), status_pickle, ex=valid_for
+            )
+        await pipe.execute()
+
+    async def extend_lock(
+        self,
+        Model: Type[models.Model],
+        identifier: Identifier,
+        valid_for: int = 300,
+    ) -> bool:
+        """Extend the lock for the given entry.
+
+        See :meth:`RedisCache.extend_lock`.
+        """
+        key = self._lock_key(Model, identifier)
+        result = await self._redis.get(key)
+        # If the lock does not exist or is not processing return False.
+        if result is None or pickle.loads(result) != RedisLockStatus.PROCESSING:
+            return False
+        await self._redis.set(
+            key, pickle.dumps(RedisLockStatus.PROCESSING), ex=valid_for
+        )
+        return True
+
+    async def wait(
+        self,
+        Model: Type[models.Model],
+        identifiers_list: Sequence[Sequence],
+        timeout: int = 60,
+        refresh_interval: int = 1,
+    ) -> set[Optional[RedisLockStatus]]:
+        """Wait for the locks for the given entries to be released.
+
+        See :meth:`RedisCache.wait`.
+        """
+        redis_lock_keys = [
+            self._lock_key(Model, identifiers) for identifiers in identifiers_list
+        ]
+        start_time = time.time()
+        while time.time() - start_time < timeout:
+            statuses = set(await self._get_redis_data(redis_lock_keys))
+            if RedisLockStatus.PROCESSING not in statuses:
+                break
+            await asyncio.sleep(refresh_interval)
+        return statuses
+
+
+async_redis_cache = AsyncRedisCache()
+
+
 class CachedObjectManager(PluginManager["CachedObjectPlugin"]):
     """Redis cache plugin manager."""
 
@@ -514,6 +707,42 @@ class CachedObjectManager(PluginManager["CachedObjectPlugin"]):
         """Wait for locks to be released for up to 60 seconds."""
         return redis_cache.wait(Model, identifiers_list, timeout)
 
+    async def amget(
+        self, Model: Type[models.Model], identifiers_list: Sequence[Identifier]
+    ) -> list[Optional[FieldValues]]:
+        """Get the cache values for the given identifiers asynchronously."""
+        plugin = self.get_plugin_for_model(Model)
+        return await async_redis_cache.mget(plugin.model, identifiers_list)
+
+    async def aget(
+        self, Model: Type[models.Model], identifiers: Identifier
+    ) -> Optional[FieldValues]:
+        """Get the cache values for the given instance asynchronously."""
+        return (await self.amget(Model, [identifiers]))[0]
+
+    async def alock(
+        self, Model: Type[models.Model], identifiers_list: Sequence[Identifier]
+    ) -> list[tuple[bool, RedisLockStatus]]:
+        """Create lock for the given entry asynchronously."""
+        return await async_redis_cache.lock(Model, identifiers_list)
+
+    async def aextend_lock(
+        self, Model: Type[models.Model], identifier: Identifier, valid_for: int = 300
+    ) -> bool:
+        """Extend the lock for the given entry asynchronously."""
+        return await async_redis_cache.extend_lock(
+            Model, identifier, valid_for=valid_for
+        )
+
+    async def aunlock(
+        self,
+        Model: Type[models.Model],
+        identifiers_list: Sequence[Identifier],
+        status: RedisLockStatus = RedisLockStatus.OK,
+    ):
+        """Unlock locks for the given entries asynchronously."""
+        await async_redis_cache.unlock(Model, identifiers_list, status)
+
 
 cache_manager = CachedObjectManager()
 
@@ -0,0 +1,149 @@
+""".. Ignore pydocstyle D400.
+
+================
+Manager Metrics
+================
+
+Report the durations of the dispatcher stages and the number of processed
+objects to the monitoring system. The metrics are exported to the
+OpenTelemetry endpoint set by ``FLOW_METRICS_ENDPOINT`` setting, the same
+endpoint the listener metrics are exported to.
+
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from time import time
+from typing import Optional
+
+from django.conf import settings
+from opentelemetry import metrics
+from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+from opentelemetry.sdk.resources import Resource
+
+from resolwe.flow.models import Data
+
+logger = logging.getLogger(__name__)
+
+# How often to export metrics (in milliseconds).
+METRICS_EXPORT_INTERVAL = 30000
+# TODO: Remove this when metrics are properly implemented.
+METRICS_INSECURE_EXPORT = True
+
+
+def create_meter(endpoint: str, service_name: str) -> metrics.Meter:
+    """Create the meter exporting the metrics to the given endpoint."""
+    metric_exporter = OTLPMetricExporter(
+        endpoint=endpoint,
+        insecure=METRICS_INSECURE_EXPORT,
+        max_export_batch_size=getattr(settings, "FLOW_METRICS_EXPORT_SIZE", 1000),
+    )
+    metric_reader = PeriodicExportingMetricReader(
+        metric_exporter, METRICS_EXPORT_INTERVAL
+    )
+    provider = MeterProvider(
+        metric_readers=[metric_reader],
+        resource=Resource.create({"service.name": service_name}),
+    )
+    return provider.get_meter(service_name)
+
+
+class DispatcherMetrics:
+    """Timers and counters of the dispatcher stages."""
+
+    # The prefix used in all metric names. The name is generated as
+    # f"{self.metrics_prefix}_{metric_name}", so avoid adding '_' at the end.
+    metrics_prefix = "resolwe_dispatcher"
+
+    def __init__(self, meter: Optional[metrics.Meter] = None):
+        """Initialize the metrics.
+
+        The metrics are created on the first use, so the exporter is only
+        started in the processes running the dispatcher.
+
+        :param meter: the meter to create the metrics with. When not given,
+            the metrics are exported to the endpoint from the settings or
+            disabled when the endpoint is not set.
+        """
+        self._meter = meter
+        self._instruments: Optional[dict] = None
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    def _get_instruments(self) -> Optional[dict]:
+        """Get the metric instruments or None when the metrics are disabled."""
+        if self._initialized:
+            return self._instruments
+        with self._lock:
+            if not self._initialized:
+                self._instruments = self._create_instruments()
+                self._initialized = True
+        return self._instruments
+
+    def _create_instruments(self) -> Optional[dict]:
+        """Create the metric instruments."""
+        meter = self._meter
+        if meter is None and (
+            endpoint := getattr(settings, "FLOW_METRICS_ENDPOINT", None)
+        ):
+            logger.info("Reporting dispatcher metrics to endpoint %s.", endpoint)
+            meter = create_meter(endpoint, "dispatcher")
+        if meter is None:
+            return None
+
+        return {
+            "stage_duration": meter.create_histogram(
+                name=f"{self.metrics_prefix}_stage_duration",
+                unit="miliseconds",
+                description="Duration of the dispatcher stages.",
+            ),
+            "scheduling_latency": meter.create_histogram(
+                name=f"{self.metrics_prefix}_scheduling_latency",
+                unit="seconds",
+                description="Time from the creation of the data object to scheduling.",
+            ),
+            "counters": {
+                "examined": meter.create_counter(
+                    name=f"{self.metrics_prefix}_data_examined",
+                    description="Number of resolving data objects examined by scans.",
+                ),
+                "started": meter.create_counter(
+                    name=f"{self.metrics_prefix}_data_started",
+                    description="Number of data objects submitted to the connectors.",
+                ),
+            },
+        }
+
+    @contextmanager
+    def timer(self, stage: str, **attributes: str):
+        """Measure the duration of the dispatcher stage.
+
+        The returned context manager can also be used as a decorator.
+        """
+        started = time()
+        try:
+            yield
+        finally:
+            if instruments := self._get_instruments():
+                instruments["stage_duration"].record(
+                    (time() - started) * 1000, {"stage": stage, **attributes}
+                )
+
+    def count(self, name: str, value: int = 1, **attributes: str):
+        """Increase the counter with the given name."""
+        if instruments := self._get_instruments():
+            instruments["counters"][name].add(value, attributes)
+
+    def scheduled(self, data: Data, **attributes: str):
+        """Report the scheduling of the given data object."""
+        if instruments := self._get_instruments():
+            latency = (data.scheduled - data.created).total_seconds()
+            instruments["scheduling_latency"].record(latency, attributes)
+            instruments["counters"]["started"].add(1, attributes)
+
+
+#: The metrics of the dispatcher in the current process.
+dispatcher_metrics = DispatcherMetrics()
@@ -13,6 +13,8 @@ submission, they can be simple and nearly contextless.
     :members:
 .. automodule:: resolwe.flow.managers.workload_connectors.local
     :members:
+.. automodule:: resolwe.flow.managers.workload_connectors.local_pool
+    :members:
 .. automodule:: resolwe.flow.managers.workload_connectors.celery
     :members:
 .. automodule:: resolwe.flow.managers.workload_connectors.slurm
@@ -13,17 +13,21 @@ import os
 import random
 import re
 import string
+import threading
 import time
 from base64 import b64encode
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import suppress
 from enum import Enum
+from functools import cache
 from importlib.util import find_spec
 from pathlib import Path
-from typing import Any, Dict, Iterable, Tuple
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 
 import kubernetes
 import redis
 from django.conf import settings
+from django.db import close_old_connections
 from django.db.models import Sum
 from django.db.models.functions import Coalesce
 
@@ -53,6 +57,22 @@ KUBERNETES_MEMORY_HARD_LIMIT_BUFFER = 2000
 # Timeout (in seconds) to wait for response from kubernetes API.
 KUBERNETES_TIMEOUT = 30
 
+# The number of seconds the names of the tools configmaps are cached for.
+TOOLS_CONFIGMAPS_CACHE_TTL = getattr(
+    settings, "FLOW_KUBERNETES_TOOLS_CONFIGMAPS_CACHE_TTL", 60
+)
+
+# The maximal number of jobs submitted to the kubernetes API at the same time.
+# When set to 0, the jobs are submitted synchronously.
+SUBMIT_CONCURRENCY = getattr(settings, "FLOW_KUBERNETES_SUBMIT_CONCURRENCY", 4)
+
+# The maximal number of jobs submitted to the kubernetes API per second.
+SUBMIT_RATE = getattr(settings, "FLOW_KUBERNETES_SUBMIT_RATE", 20)
+
+# The maximal number of jobs waiting to be submitted. When reached, the
+# dispatcher waits until one of them is submitted.
+SUBMIT_MAX_PENDING = getattr(settings, "FLOW_KUBERNETES_SUBMIT_MAX_PENDING", 1000)
+
 logger = logging.getLogger(__name__)
 
 
@@ -106,6 +126,98 @@ def sanitize_kubernetes_label(label: str, trim_end: bool = True) -> str:
     return sanitized_label
 
 
+@cache
+def files_configmap(processing_uid: int, processing_gid: int) -> Tuple[str, Dict]:
+    """Get the name and the content of the configmap for files.
+
+    We have to map group, passwd and startup files inside containers. The
+    content only depends on the processing user and the source of the mapped
+    modules, so it is computed once per process. The name contains the hash of
+    the content, so the configmap is recreated when the content changes.
+
+    :returns: the tuple (name, content) of the configmap.
+    """
+    passwd_content = "root:x:0:0:root:/root:/bin/bash\n"
+    passwd_content += f"user:x:{processing_uid}:{processing_gid}:user:{os.fspath(constants.PROCESSING_VOLUME)}:/bin/bash\n"
+    group_content = "root:x:0:\n"
+    group_content += f"user:x:{processing_gid}:user\n"
+
+    data = dict()
+    modules = {
+        "communicator": "resolwe.process.communicator",
+        "bootstrap-python-runtime": "resolwe.process.bootstrap_python_runtime",
+        "socket-utils": "resolwe.flow.executors.socket_utils",
+        "constants": "resolwe.flow.executors.constants",
+        "startup-script": "resolwe.flow.executors.startup_processing_container",
+    }
+    for module, full_module_name in modules.items():
+        spec = find_spec(full_module_name)
+        assert (
+            spec is not None and spec.origin is not None
+        ), f"Unable to determine module {full_module_name} source code."
+        data[module] = Path(spec.origin).read_text()
+
+    data.update(
+        {
+            "passwd": passwd_content,
+            "group": group_content,
+        }
+    )
+
+    data_md5 = hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()
+    return f"configmap-files-{data_md5}", data
+
+
+class JobSubmitter:
+    """Submit the jobs to the kubernetes API in background threads.
+
+    At most ``concurrency`` jobs are submitted at the same time and the
+    submissions are started at most ``rate`` times per second. When
+    ``max_pending`` jobs are waiting to be submitted, the ``submit`` method
+    blocks until one of them is submitted.
+    """
+
+    def __init__(self, concurrency: int, rate: Optional[float], max_pending: int):
+        """Initialize.
+
+        :param concurrency: the maximal number of concurrent submissions.
+        :param rate: the maximal number of submissions per second, unlimited
+            when not given.
+        :param max_pending: the maximal number of waiting submissions.
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="kubernetes-submitter"
+        )
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._interval = 1 / rate if rate else 0
+        self._next_start = 0.0
+        self._rate_lock = threading.Lock()
+
+    def _wait_for_rate(self):
+        """Wait until the next submission is allowed by the rate limit."""
+        with self._rate_lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self._interval
+        if start > now:
+            time.sleep(start - now)
+
+    def submit(self, function: Callable, *args) -> Future:
+        """Call the function with the given arguments in a background thread."""
+        self._pending.acquire()
+
+        def run():
+            """Call the function and release the resources."""
+            try:
+                self._wait_for_rate()
+                return function(*args)
+            finally:
+                self._pending.release()
+                close_old_connections()
+
+        return self._executor.submit(run)
+
+
 class ConfigLocation(Enum):
     """The enum specifying where to read the configuration from."""
 
@@ -122,6 +234,17 @@ class Connector(BaseConnector):
             settings.KUBERNETES_DISPATCHER_CONFIG_LOCATION
         )
         self._initialize_variables()
+        # The names of the configmaps known to exist.
+        self._existing_configmaps: set[str] = set()
+        # The time and the content of the last read of the tools configmaps.
+        self._tools_configmaps: Optional[Tuple[float, Dict[str, str]]] = None
+        # Do not fetch the same configmaps in concurrent submissions.
+        self._configmaps_lock = threading.Lock()
+        self.submitter: Optional[JobSubmitter] = None
+        if SUBMIT_CONCURRENCY:
+            self.submitter = JobSubmitter(
+                SUBMIT_CONCURRENCY, SUBMIT_RATE, SUBMIT_MAX_PENDING
+            )
 
     def _initialize_variables(self):
         """Init variables.
@@ -167,13 +290,28 @@ class Connector(BaseConnector):
         }
         with suppress(RuntimeError):
             environment["UPLOAD_DIR"] = get_upload_dir()
+        if getattr(settings, "FLOW_PYTHON_RUNTIME_CACHE_DIR", None):
+            environment["PYTHON_RUNTIME_CACHE_DIR"] = os.fspath(
+                constants.PYTHON_RUNTIME_CACHE_VOLUME
+            )
 
         return [
             {"name": name, "value": str(value)} for name, value in environment.items()
         ]
 
     def _create_configmap_if_needed(self, name: str, content: Dict, core_api: Any):
-        """Create configmap if necessary."""
+        """Create configmap if necessary.
+
+        The names of the existing configmaps are cached, so the kubernetes API
+        is only queried once per process for every configmap.
+        """
+        with self._configmaps_lock:
+            if name not in self._existing_configmaps:
+                self._create_configmap(name, content, core_api)
+                self._existing_configmaps.add(name)
+
+    def _create_configmap(self, name: str, content: Dict, core_api: Any):
+        """Create configmap if it does not exist."""
         try:
             core_api.read_namespaced_config_map(
                 name=name, namespace=self.kubernetes_namespace
@@ -195,53 +333,41 @@ class Connector(BaseConnector):
                 )
 
     def _get_tools_configmaps(self, core_api) -> Dict[str, str]:
-        """Get and return configmaps for tools."""
-        description_configmap_name = (
-            getattr(settings, "KUBERNETES_TOOLS_CONFIGMAPS", None) or "tools-configmaps"
-        )
-        configmap = core_api.read_namespaced_config_map(
-            name=description_configmap_name, namespace=self.kubernetes_namespace
-        )
-        return configmap.data
+        """Get and return configmaps for tools.
 
-    def _get_files_configmap_name(self, location_subpath: Path, core_api: Any):
-        """Get or create configmap for files.
+        The configmaps are cached for TOOLS_CONFIGMAPS_CACHE_TTL seconds.
+        """
+        with self._configmaps_lock:
+            if self._tools_configmaps is not None:
+                read_time, tools_configmaps = self._tools_configmaps
+                if time.monotonic() - read_time < TOOLS_CONFIGMAPS_CACHE_TTL:
+                    return tools_configmaps
+
+            description_configmap_name = (
+                getattr(settings, "KUBERNETES_TOOLS_CONFIGMAPS", None)
+                or "tools-configmaps"
+            )
+            configmap = core_api.read_namespaced_config_map(
+                name=description_configmap_name, namespace=self.kubernetes_namespace
+            )
+            self._tools_configmaps = (time.monotonic(), configmap.data)
+            return configmap.data
 
-        We have to map group, passwd and startup files inside containers.
-        This is done using configmap which is mostly static. This command
-        returns description for this configmap.
+    def _clear_caches(self):
+        """Clear the cached configmaps.
+
+        Called when the job submission fails, since the cached configmaps may
+        have been removed from the cluster.
         """
-        processing_uid, processing_gid = self._get_processing_uid_gid()
-        passwd_content = "root:x:0:0:root:/root:/bin/bash\n"
-        passwd_content += f"user:x:{processing_uid}:{processing_gid}:user:{os.fspath(constants.PROCESSING_VOLUME)}:/bin/bash\n"
-        group_content = "root:x:0:\n"
-        group_content += f"user:x:{processing_gid}:user\n"
-
-        data = dict()
-        modules = {
-            "communicator": "resolwe.process.communicator",
-            "bootstrap-python-runtime": "resolwe.process.bootstrap_python_runtime",
-            "socket-utils": "resolwe.flow.executors.socket_utils",
-            "constants": "resolwe.flow.executors.constants",
-            "startup-script": "resolwe.flow.executors.startup_processing_container",
-        }
-        for module, full_module_name in modules.items():
-            spec = find_spec(full_module_name)
-            assert (
-                spec is not None and spec.origin is not None
-            ), f"Unable to determine module {full_module_name} source code."
-            data[module] = Path(spec.origin).read_text()
-
-        data.update(
-            {
-                "passwd": passwd_content,
-                "group": group_content,
-            }
-        )
+        self._existing_configmaps.clear()
+        self._tools_configmaps = None
 
-        data_md5 = hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()
-        configmap_name = f"configmap-files-{data_md5}"
+    def _get_files_configmap_name(self, location_subpath: Path, core_api: Any):
+        """Get or create configmap for files.
 
+        See :func:`files_configmap` for the description of the configmap.
+        """
+        configmap_name, data = files_configmap(*self._get_processing_uid_gid())
         self._create_configmap_if_needed(configmap_name, data, core_api)
         return configmap_name
 
@@ -315,6 +441,18 @@ class Connector(BaseConnector):
                 )
             volumes.append(volume_data)
 
+        # The Python process runtime cache is shared between pods on the node.
+        if cache_dir := getattr(settings, "FLOW_PYTHON_RUNTIME_CACHE_DIR", None):
+            volumes.append(
+                {
+                    "name": constants.PYTHON_RUNTIME_CACHE_VOLUME_NAME,
+                    "hostPath": {
+                        "path": os.fspath(cache_dir),
+                        "type": "DirectoryOrCreate",
+                    },
+                }
+            )
+
         return volumes
 
     def _init_container_mountpoints(self):
@@ -467,6 +605,14 @@ class Connector(BaseConnector):
                     "mountPath": f"{self.tools_path_prefix / tool_name}",
                 }
             )
+        if getattr(settings, "FLOW_PYTHON_RUNTIME_CACHE_DIR", None):
+            mount_points.append(
+                {
+                    "name": constants.PYTHON_RUNTIME_CACHE_VOLUME_NAME,
+                    "mountPath": os.fspath(constants.PYTHON_RUNTIME_CACHE_VOLUME),
+                    "readOnly": False,
+                }
+            )
         return mount_points
 
     def _create_labels(self, data: Data, job_type: str) -> dict[str, str]:
@@ -998,17 +1144,13 @@ class Connector(BaseConnector):
         # Append random string to make it safe for restart.
         return f"{prefix}-{data_id}-{postfix}"
 
-    def submit(self, data: Data, argv):
-        """Run process.
-
-        For details, see
-        :meth:`~resolwe.flow.managers.workload_connectors.base.BaseConnector.submit`.
-        """
+    def _start(self, data: Data, argv):
+        """Start the process execution and record the failure on data object."""
         (host, port, protocol) = argv[-1].rsplit(" ", maxsplit=3)[-3:]
-        self._initialize_variables()
         try:
             self.start(data, (host, port, protocol))
         except Exception as error:
+            self._clear_caches()
             error_message = (
                 f"Kubernetes job submission for data id {data.id} with args {argv} "
                 f" failed: '{error}'."
@@ -1017,6 +1159,20 @@ class Connector(BaseConnector):
             data.process_error.append(error_message)
             data.save()
 
+    def submit(self, data: Data, argv):
+        """Run process.
+
+        The job is submitted by the background submitter unless
+        ``FLOW_KUBERNETES_SUBMIT_CONCURRENCY`` setting is set to 0. For details,
+        see
+        :meth:`~resolwe.flow.managers.workload_connectors.base.BaseConnector.submit`.
+        """
+        self._initialize_variables()
+        if self.submitter is not None:
+            self.submitter.submit(self._start, data, argv)
+        else:
+            self._start(data, argv)
+
         logger.debug(
             __(
                 "Connector '{}' running for Data with id {} ({}).",
@@ -37,11 +37,19 @@ class Connector(BaseConnector):
                 repr(argv),
             )
         )
+        self.start(argv, self.environment(data)).wait()
+
+    def environment(self, data: Data) -> dict[str, str]:
+        """Get the environment of the executor for the given data object."""
         process_environment = os.environ.copy()
         process_environment["LISTENER_PUBLIC_KEY"] = LISTENER_PUBLIC_KEY
         process_environment["CURVE_PRIVATE_KEY"] = data.worker.private_key
         process_environment["CURVE_PUBLIC_KEY"] = data.worker.public_key
+        return process_environment
+
+    def start(self, argv, environment: dict[str, str]) -> subprocess.Popen:
+        """Spawn the executor in the runtime directory."""
         runtime_dir = storage_settings.FLOW_VOLUMES["runtime"]["config"]["path"]
-        subprocess.Popen(
-            argv, env=process_environment, cwd=runtime_dir, stdin=subprocess.DEVNULL
-        ).wait()
+        return subprocess.Popen(
+            argv, env=environment, cwd=runtime_dir, stdin=subprocess.DEVNULL
+        )
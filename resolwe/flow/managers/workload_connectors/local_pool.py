@@ -0,0 +1,152 @@
+""".. Ignore pydocstyle D400.
+
+====================
+Local Pool Connector
+====================
+
+Run the executors on the local machine in parallel, limited by the number of
+cores and the amount of memory available to them. The size of the pool is set
+with ``FLOW_LOCAL_POOL_CORES`` and ``FLOW_LOCAL_POOL_MEMORY`` (in megabytes)
+settings and defaults to all cores and the whole memory of the machine.
+
+"""
+
+import logging
+import os
+import subprocess
+import threading
+from collections import deque
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+
+from resolwe.flow.models import Data
+from resolwe.utils import BraceMessage as __
+
+from .local import Connector as LocalConnector
+
+logger = logging.getLogger(__name__)
+
+
+def total_memory() -> int:
+    """Get the size of the physical memory of the machine in megabytes."""
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 1024**2
+
+
+class Job(NamedTuple):
+    """The executor waiting for the resources."""
+
+    data_id: int
+    argv: list[str]
+    environment: dict[str, str]
+    cores: int
+    memory: int
+
+
+class Connector(LocalConnector):
+    """Local connector for parallel job execution.
+
+    The executors are spawned without waiting for them to finish. A job is
+    started when the cores and memory from its resource limits are available,
+    otherwise it is queued. The queued jobs are started in the order of
+    submission when the running executors finish.
+    """
+
+    def __init__(self, cores: Optional[int] = None, memory: Optional[int] = None):
+        """Initialize the pool.
+
+        :param cores: the number of cores in the pool.
+        :param memory: the amount of memory in the pool in megabytes.
+        """
+        self.cores = (
+            cores or getattr(settings, "FLOW_LOCAL_POOL_CORES", None) or os.cpu_count()
+        )
+        self.memory = (
+            memory
+            or getattr(settings, "FLOW_LOCAL_POOL_MEMORY", None)
+            or total_memory()
+        )
+        self._free_cores = self.cores
+        self._free_memory = self.memory
+        self._queue: deque[Job] = deque()
+        self._running: dict[int, subprocess.Popen] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> int:
+        """Get the number of running executors."""
+        return len(self._running)
+
+    @property
+    def queued(self) -> int:
+        """Get the number of executors waiting for the resources."""
+        return len(self._queue)
+
+    def submit(self, data: Data, argv):
+        """Queue the process and start it when the resources are available.
+
+        The method does not wait for the executor to finish. For details, see
+        :meth:`~resolwe.flow.managers.workload_connectors.base.BaseConnector.submit`.
+        """
+        limits = data.get_resource_limits()
+        # The jobs requiring more resources than the pool has would never start.
+        job = Job(
+            data_id=data.id,
+            argv=argv,
+            environment=self.environment(data),
+            cores=min(limits["cores"], self.cores),
+            memory=min(limits["memory"], self.memory),
+        )
+        logger.debug(
+            __(
+                "Connector '{}' queueing Data with id {} ({} cores, {} MB): {}.",
+                self.__class__.__module__,
+                data.id,
+                job.cores,
+                job.memory,
+                repr(argv),
+            )
+        )
+        with self._lock:
+            self._queue.append(job)
+            self._start_queued()
+
+    def _start_queued(self):
+        """Start the queued jobs while they fit into the free resources.
+
+        Must be called with the lock held.
+        """
+        while self._queue:
+            job = self._queue[0]
+            if job.cores > self._free_cores or job.memory > self._free_memory:
+                break
+            self._queue.popleft()
+            try:
+                process = self.start(job.argv, job.environment)
+            except OSError:
+                logger.exception(
+                    __("Unable to start executor for Data with id {}.", job.data_id)
+                )
+                continue
+            self._free_cores -= job.cores
+            self._free_memory -= job.memory
+            self._running[job.data_id] = process
+            threading.Thread(
+                target=self._wait, args=(job, process), daemon=True
+            ).start()
+
+    def _wait(self, job: Job, process: subprocess.Popen):
+        """Wait for the executor to finish and start the queued jobs."""
+        return_code = process.wait()
+        logger.debug(
+            __(
+                "Executor for Data with id {} finished with return code {}.",
+                job.data_id,
+                return_code,
+            )
+        )
+        with self._lock:
+            del self._running[job.data_id]
+            self._free_cores += job.cores
+            self._free_memory += job.memory
+            self._start_queued()
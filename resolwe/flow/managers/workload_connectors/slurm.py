@@ -4,12 +4,20 @@
 Slurm Connector
 ===============
 
+When ``FLOW_SLURM_BATCH_WINDOW`` setting is set, the jobs with identical
+resource limits and partition submitted within the window (in seconds) are
+submitted together as a single Slurm job array of up to
+``FLOW_SLURM_BATCH_SIZE`` jobs. The submission then runs in a background
+thread.
+
 """
 
 import logging
 import os
 import shlex
 import subprocess
+import threading
+from typing import NamedTuple, Optional
 
 from django.conf import settings
 
@@ -25,10 +33,66 @@ logger = logging.getLogger(__name__)
 # since the executor is running in the same environment as the process.
 EXECUTOR_MEMORY_OVERHEAD = 200
 
+# The maximal number of jobs in a job array, must not exceed the MaxArraySize
+# setting of the Slurm controller.
+BATCH_SIZE = getattr(settings, "FLOW_SLURM_BATCH_SIZE", 1000)
+
+
+class BatchKey(NamedTuple):
+    """The jobs with the same key are submitted in the same job array."""
+
+    memory: int
+    cores: int
+    partition: Optional[str]
+
+
+class BatchJob(NamedTuple):
+    """The job waiting to be submitted in a job array."""
+
+    data_id: int
+    argv: list[str]
+
 
 class Connector(BaseConnector):
     """Slurm-based connector for job execution."""
 
+    def __init__(self):
+        """Initialize the batches."""
+        self.batch_window: Optional[float] = getattr(
+            settings, "FLOW_SLURM_BATCH_WINDOW", None
+        )
+        self._batches: dict[BatchKey, list[BatchJob]] = {}
+        self._timers: dict[BatchKey, threading.Timer] = {}
+        self._lock = threading.Lock()
+
+    def _get_partition(self, data: Data) -> Optional[str]:
+        """Compute target partition."""
+        partition = getattr(settings, "FLOW_SLURM_PARTITION_DEFAULT", None)
+        if data.process.slug in getattr(settings, "FLOW_SLURM_PARTITION_OVERRIDES", {}):
+            partition = settings.FLOW_SLURM_PARTITION_OVERRIDES[data.process.slug]
+        return partition
+
+    def _write_script(self, script_path: str, key: BatchKey, lines: list[str]):
+        """Write the executable SLURM script with the given resources."""
+        # Make sure the resulting file is executable on creation.
+        file_descriptor = os.open(script_path, os.O_WRONLY | os.O_CREAT, mode=0o555)
+        with os.fdopen(file_descriptor, "wt") as script:
+            script.write("#!/bin/bash\n")
+            script.write(
+                "#SBATCH --mem={}M\n".format(key.memory + EXECUTOR_MEMORY_OVERHEAD)
+            )
+            script.write("#SBATCH --cpus-per-task={}\n".format(key.cores))
+            if key.partition:
+                script.write("#SBATCH --partition={}\n".format(key.partition))
+            for line in lines:
+                script.write(line + "\n")
+
+    def _sbatch(self, script_path: str):
+        """Submit the script to SLURM."""
+        runtime_dir = storage_settings.FLOW_VOLUMES["runtime"]["config"]["path"]
+        command = ["/usr/bin/env", "sbatch", script_path]
+        subprocess.Popen(command, cwd=runtime_dir, stdin=subprocess.DEVNULL).wait()
+
     def submit(self, data: Data, argv):
         """Run process with SLURM.
 
@@ -44,44 +108,97 @@ class Connector(BaseConnector):
                 repr(argv),
             )
         )
-
-        # Compute target partition.
-        partition = getattr(settings, "FLOW_SLURM_PARTITION_DEFAULT", None)
-        if data.process.slug in getattr(settings, "FLOW_SLURM_PARTITION_OVERRIDES", {}):
-            partition = settings.FLOW_SLURM_PARTITION_OVERRIDES[data.process.slug]
+        key = BatchKey(limits["memory"], limits["cores"], self._get_partition(data))
+        if self.batch_window is not None:
+            self._add_to_batch(key, BatchJob(data.id, argv))
+            return
 
         try:
-            # Make sure the resulting file is executable on creation.
             runtime_dir = storage_settings.FLOW_VOLUMES["runtime"]["config"]["path"]
             script_path = os.path.join(runtime_dir, "slurm-{}.sh".format(data.pk))
-            file_descriptor = os.open(script_path, os.O_WRONLY | os.O_CREAT, mode=0o555)
-            with os.fdopen(file_descriptor, "wt") as script:
-                script.write("#!/bin/bash\n")
-                script.write(
-                    "#SBATCH --mem={}M\n".format(
-                        limits["memory"] + EXECUTOR_MEMORY_OVERHEAD
+            lines = []
+            if key.partition:
+                lines.append(
+                    "#SBATCH --output slurm-url-{}-job-%j.out".format(
+                        data.location.subpath
                     )
                 )
-                script.write("#SBATCH --cpus-per-task={}\n".format(limits["cores"]))
-                if partition:
-                    script.write("#SBATCH --partition={}\n".format(partition))
-                    script.write(
-                        "#SBATCH --output slurm-url-{}-job-%j.out\n".format(
-                            data.location.subpath
-                        )
-                    )
+            # Render the argument vector into a command line.
+            lines.append(" ".join(map(shlex.quote, argv)))
+            self._write_script(script_path, key, lines)
+            self._sbatch(script_path)
+        except OSError as err:
+            logger.error(
+                __(
+                    "OSError occurred while preparing SLURM script for Data {}: {}",
+                    data.id,
+                    err,
+                )
+            )
 
-                # Render the argument vector into a command line.
-                line = " ".join(map(shlex.quote, argv))
-                script.write(line + "\n")
+    def _add_to_batch(self, key: BatchKey, job: BatchJob):
+        """Add the job to the batch with the given key.
 
-            command = ["/usr/bin/env", "sbatch", script_path]
-            subprocess.Popen(command, cwd=runtime_dir, stdin=subprocess.DEVNULL).wait()
+        The batch is submitted when it is full or when the batch window after
+        its first job expires.
+        """
+        with self._lock:
+            batch = self._batches.setdefault(key, [])
+            batch.append(job)
+            if len(batch) == 1:
+                self._timers[key] = threading.Timer(
+                    self.batch_window, self._submit_batch, [key, batch]
+                )
+                self._timers[key].start()
+            if len(batch) < BATCH_SIZE:
+                return
+            del self._batches[key]
+            self._timers.pop(key).cancel()
+        threading.Thread(target=self._submit_array, args=(key, batch)).start()
+
+    def _submit_batch(self, key: BatchKey, batch: list[BatchJob]):
+        """Submit the batch with the given key when its window expires."""
+        with self._lock:
+            # The batch may have been submitted when it became full.
+            if self._batches.get(key) is not batch:
+                return
+            del self._batches[key]
+            del self._timers[key]
+        self._submit_array(key, batch)
+
+    def _submit_array(self, key: BatchKey, batch: list[BatchJob]):
+        """Submit the jobs in the batch as a SLURM job array.
+
+        Every task of the array runs the command line at its index in the table
+        of command lines in the script.
+        """
+        data_ids = [job.data_id for job in batch]
+        logger.debug(__("Submitting SLURM job array for Data with ids {}.", data_ids))
+        try:
+            runtime_dir = storage_settings.FLOW_VOLUMES["runtime"]["config"]["path"]
+            script_path = os.path.join(
+                runtime_dir, "slurm-array-{}-{}.sh".format(data_ids[0], len(batch))
+            )
+            lines = ["#SBATCH --array=0-{}".format(len(batch) - 1)]
+            if key.partition:
+                lines.append("#SBATCH --output slurm-array-%A-task-%a.out")
+            lines.append('case "$SLURM_ARRAY_TASK_ID" in')
+            for index, job in enumerate(batch):
+                # Render the argument vector into a command line.
+                lines.append("    # Data {}.".format(job.data_id))
+                lines.append(
+                    "    {}) exec {} ;;".format(
+                        index, " ".join(map(shlex.quote, job.argv))
+                    )
+                )
+            lines.append("esac")
+            self._write_script(script_path, key, lines)
+            self._sbatch(script_path)
         except OSError as err:
             logger.error(
                 __(
                     "OSError occurred while preparing SLURM script for Data {}: {}",
-                    data.id,
+                    data_ids,
                     err,
                 )
             )
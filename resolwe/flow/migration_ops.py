@@ -2,14 +2,11 @@
 
 import inspect
 
-import jsonschema
 from django.db.migrations.operations import base
 
-from resolwe.flow.models.utils import validate_process_types, validation_schema
+from resolwe.flow.models.utils import schema_registry, validate_process_types
 from resolwe.flow.utils import dict_dot
 
-FIELD_SCHEMA = validation_schema("field")
-
 
 class DataDefaultOperation:
     """Abstract data default generator."""
@@ -249,7 +246,7 @@ class ResolweProcessAddField(ResolweProcessOperation):
         schema_type = self.field.pop(0)
 
         self.schema = schema
-        jsonschema.validate([schema], FIELD_SCHEMA)
+        schema_registry.validate([schema], "field")
 
         if schema["name"] != self.field[-1]:
             raise ValueError("Field name in schema differs from field path")
@@ -94,6 +94,28 @@ class AnnotationValueValidator:
             raise ValidationError(errors)
         return errors
 
+    def validate_values(self, annotation_values: Iterable["AnnotationValue"]):
+        """Validate the given AnnotationValue objects.
+
+        The validators are looked up once per annotation field and all
+        validation errors are grouped together.
+
+        :raises ValidationError: if validation of any annotation value fails.
+        """
+        errors = []
+        field_validators: dict[int, Sequence["AnnotationFieldBaseValidator"]] = {}
+        for annotation_value in annotation_values:
+            field = annotation_value.field
+            if field.pk not in field_validators:
+                field_validators[field.pk] = self._validators[field.annotation_type]
+            for validator in field_validators[field.pk]:
+                try:
+                    validator.validate(annotation_value.value, field)
+                except ValidationError as error:
+                    errors.append(error)
+        if errors:
+            raise ValidationError(errors)
+
 
 annotation_value_validator = AnnotationValueValidator()
 
@@ -477,6 +499,7 @@ class AnnotationValueManager(BaseManager["AnnotationValue", PermissionQuerySet])
         """Return only the values with delete marker not set."""
         return super().get_queryset().filter(deleted=False)
 
+    @transaction.atomic
     def add_annotations(
         self, annotations: Iterable[AddAnnotationDict]
     ) -> list["AnnotationValue"]:
@@ -490,6 +513,9 @@ class AnnotationValueManager(BaseManager["AnnotationValue", PermissionQuerySet])
           - the value does not exist yet or is deleted: create a new entry.
         - the value is a delete marker:
           - the existing value exists: set deleted to true.
+
+        The new values are validated, labeled and inserted in bulk, without
+        calling their save method.
         """
 
         def is_delete_marker(value):
@@ -531,15 +557,26 @@ class AnnotationValueManager(BaseManager["AnnotationValue", PermissionQuerySet])
                 elif not is_delete_marker(data["value"]):
                     to_create.append(data)
 
-            # Create new objects we must call the save method to set the delete marker.
             created_values = [Model(**data) for data in to_create]
-            for value in created_values:
-                value.save()
-
+            annotation_value_validator.validate_values(created_values)
+
+            # Mark replaced values and values set to delete marker as deleted.
+            if to_delete or to_create:
+                Model.all_objects.filter(
+                    reduce(combine_query, to_create, models.Q(pk__in=to_delete)),
+                    deleted=False,
+                ).update(deleted=True)
+
+            # Load the groups used in slugs of the new values in a single query.
+            models.prefetch_related_objects(
+                list(
+                    {value.field.pk: value.field for value in created_values}.values()
+                ),
+                "group",
+            )
+            Model._meta.get_field("slug").populate_bulk(created_values)
+            Model.all_objects.bulk_create(created_values)
             created.extend(created_values)
-            # Mark objects as deleted.
-            if to_delete:
-                Model.objects.filter(pk__in=to_delete).update(deleted=True)
 
         # Only return created objects.
         return created
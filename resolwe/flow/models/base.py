@@ -2,7 +2,7 @@
 
 import datetime
 from enum import StrEnum
-from typing import TypeVar
+from typing import Callable, ContextManager, Optional, TypeVar
 
 from django.conf import settings
 from django.db import IntegrityError, models, transaction
@@ -60,7 +60,11 @@ Q = TypeVar("Q", bound=models.QuerySet)
 
 
 # NOTE: This method is used in migrations.
-def delete_chunked(queryset, chunk_size=500):
+def delete_chunked(
+    queryset,
+    chunk_size=500,
+    chunk_handler: Optional[Callable[[list], ContextManager]] = None,
+):
     """Chunked delete, which should be used if deleting many objects.
 
     The reason why this method is needed is that deleting a lot of Data objects
@@ -68,25 +72,46 @@ def delete_chunked(queryset, chunk_size=500):
     this causes huge memory usage (and possibly OOM).
 
     :param chunk_size: Optional chunk size
+
+    :param chunk_handler: Optional callable that receives the list of objects in
+        the chunk and returns a context manager. The chunk is deleted inside the
+        context, within the same transaction.
+
+    :return: the number of deleted objects (not counting the objects deleted by
+        cascade).
     """
+    deleted = 0
     while True:
         # Discover primary key to limit the current chunk. This is required because delete
         # cannot be called on a sliced queryset due to ordering requirement.
         with transaction.atomic():
-            # Get offset of last item (needed because it may be less than the chunk size).
-            offset = queryset.order_by("pk")[:chunk_size].count()
-            if not offset:
-                break
+            if chunk_handler is None:
+                # Get offset of last item (needed because it may be less than the chunk size).
+                offset = queryset.order_by("pk")[:chunk_size].count()
+                if not offset:
+                    break
 
-            # Fetch primary key of last item and use it to delete the chunk.
-            last_instance = queryset.order_by("pk")[offset - 1]
-            queryset.filter(pk__lte=last_instance.pk).delete()
+                # Fetch primary key of last item and use it to delete the chunk.
+                last_pk = queryset.order_by("pk").values_list("pk", flat=True)[
+                    offset - 1
+                ]
+                queryset.filter(pk__lte=last_pk).delete()
+            else:
+                objects = list(queryset.order_by("pk")[:chunk_size])
+                if not objects:
+                    break
+
+                offset = len(objects)
+                with chunk_handler(objects):
+                    queryset.filter(pk__lte=objects[-1].pk).delete()
+        deleted += offset
+    return deleted
 
 
 class BaseQuerySet(PermissionQuerySet):
     """Base query set for Resolwe's ORM objects."""
 
-    def delete_chunked(self, chunk_size=500):
+    def delete_chunked(self, chunk_size=500, chunk_handler=None):
         """Chunked delete, which should be used if deleting many objects.
 
         The reason why this method is needed is that deleting a lot of Data objects
@@ -94,8 +119,11 @@ class BaseQuerySet(PermissionQuerySet):
         this causes huge memory usage (and possibly OOM).
 
         :param chunk_size: Optional chunk size
+
+        :param chunk_handler: Optional context manager factory, see
+            :func:`delete_chunked`.
         """
-        return delete_chunked(self, chunk_size=chunk_size)
+        return delete_chunked(self, chunk_size=chunk_size, chunk_handler=chunk_handler)
 
 
 class BaseManager(PermissionManager[M, Q]):
@@ -20,8 +20,8 @@ from resolwe.flow.models.base import BaseQuerySet
 from resolwe.flow.models.utils import (
     DirtyError,
     fill_with_defaults,
+    schema_registry,
     validate_schema,
-    validation_schema,
 )
 from resolwe.flow.utils import dict_dot, get_data_checksum, iterate_fields
 from resolwe.observers.consumers import BackgroundTaskType
@@ -502,28 +502,39 @@ class Data(HistoryMixin, PermissionObject, BaseModel):
         return secrets
 
     def save_dependencies(self, instance, schema):
-        """Save data: and list:data: references as parents."""
-
-        def add_dependency(value):
-            """Add parent Data dependency."""
-            try:
-                DataDependency.objects.update_or_create(
-                    parent=Data.objects.get(pk=value),
-                    child=self,
-                    defaults={"kind": DataDependency.KIND_IO},
-                )
-            except Data.DoesNotExist:
-                pass
+        """Save data: and list:data: references as parents.
 
+        References to non-existing ``Data`` objects are ignored. The
+        dependencies are created in a constant number of queries regardless
+        of the number of references.
+        """
+        referenced_ids = set()
         for field_schema, fields in iterate_fields(instance, schema):
             name = field_schema["name"]
             value = fields[name]
 
             if field_schema.get("type", "").startswith("data:"):
-                add_dependency(value)
+                referenced_ids.add(value)
             elif field_schema.get("type", "").startswith("list:data:"):
-                for data in value:
-                    add_dependency(data)
+                referenced_ids.update(value)
+
+        if not referenced_ids:
+            return
+
+        parent_ids = set(
+            Data.objects.filter(pk__in=referenced_ids).values_list("pk", flat=True)
+        )
+        existing = DataDependency.objects.filter(child=self, parent__in=parent_ids)
+        existing_parent_ids = set(existing.values_list("parent_id", flat=True))
+        if existing_parent_ids:
+            existing.exclude(kind=DataDependency.KIND_IO).update(
+                kind=DataDependency.KIND_IO
+            )
+
+        DataDependency.objects.bulk_create(
+            DataDependency(parent_id=parent_id, child=self, kind=DataDependency.KIND_IO)
+            for parent_id in sorted(parent_ids - existing_parent_ids)
+        )
 
     def save(self, render_name=False, *args, **kwargs):
         """Save the data model."""
@@ -531,9 +542,7 @@ class Data(HistoryMixin, PermissionObject, BaseModel):
             self.named_by_user = True
 
         try:
-            jsonschema.validate(
-                self.process_resources, validation_schema("process_resources")
-            )
+            schema_registry.validate(self.process_resources, "process_resources")
         except jsonschema.exceptions.ValidationError as exception:
             # Re-raise as Django ValidationError
             raise ValidationError(exception.message)
@@ -3,6 +3,9 @@
 The VersionField is based on code at https://github.com/mcldev/django-versionfield .
 """
 
+from collections import defaultdict
+from typing import Sequence
+
 from django.conf import settings
 from django.db import connection, models
 from django.db.models import constants
@@ -97,10 +100,113 @@ class ResolweSlugField(models.fields.SlugField):
             attr = getattr(instance, self.populate_from)
             return attr() if callable(attr) else attr
 
+    def _base_slug(self, instance) -> str | None:
+        """Return the slug generated from ``populate_from`` attribute.
+
+        The returned slug is shortened so the sequence can be appended to it.
+        """
+        slug = slugify(self._get_populate_from_value(instance) or "")
+        if not slug:
+            if not self.blank:
+                slug = instance._meta.model_name
+            elif not self.null:
+                return ""
+            else:
+                return None
+        return slug[: (self.max_length - MAX_SLUG_SEQUENCE_DIGITS - 1)]
+
+    def populate_bulk(self, instances: Sequence[models.Model]):
+        """Generate unique slugs for many unsaved instances at once.
+
+        The slug sequences of instances sharing the values of ``unique_with``
+        fields are computed with a single query. The instances are marked so
+        :meth:`pre_save` does not check the generated slugs again, which makes
+        them suitable for ``bulk_create``. Instances with predefined slugs are
+        left to :meth:`pre_save`.
+        """
+        groups: dict[tuple, list[tuple[models.Model, str]]] = defaultdict(list)
+        for instance in instances:
+            if self.value_from_object(instance) or not self.populate_from:
+                continue
+            slug = self._base_slug(instance)
+            if not slug:
+                setattr(instance, self.name, slug)
+                instance.skip_slug_check = True
+                continue
+            constraints = self._get_unique_constraints(instance)
+            key = (constraints[0], tuple(sorted(dict(constraints[1]).items())))
+            groups[key].append((instance, slug))
+
+        for (constraints_placeholder, constraints_items), group in groups.items():
+            query_params = {
+                "constraints_placeholder": constraints_placeholder,
+                "slug_column": connection.ops.quote_name(self.column),
+                "table_name": connection.ops.quote_name(self.model._meta.db_table),
+            }
+            query_escape_params = dict(constraints_items)
+            query_escape_params["slugs"] = list({slug for _, slug in group})
+
+            # Find out for every slug if it is taken and its greatest sequence.
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT
+                        base_slug,
+                        BOOL_OR({slug_column} = base_slug),
+                        MAX(
+                            COALESCE(
+                                NULLIF(
+                                    RIGHT({slug_column}, -LENGTH(base_slug)-1),
+                                    ''
+                                ),
+                                '1'
+                            )::text::integer
+                        )
+                    FROM UNNEST(%(slugs)s::text[]) AS base_slug
+                    JOIN {table_name} ON (
+                        {slug_column} ~ ('^' || base_slug || '(-[0-9]*)?$')
+                        {constraints_placeholder}
+                    )
+                    GROUP BY base_slug
+                    """.format(
+                        **query_params
+                    ),
+                    params=query_escape_params,
+                )
+                sequences = {
+                    slug: (taken, sequence) for slug, taken, sequence in cursor
+                }
+
+            # Slugs generated in this group, used to avoid collisions between
+            # different base slugs, e.g. "sample-2" and the second "sample".
+            generated = set()
+            for instance, base_slug in group:
+                taken, sequence = sequences.get(base_slug, (False, None))
+                slug = base_slug
+                if taken or slug in generated:
+                    sequence = (sequence or 1) + 1
+                    while "{}-{}".format(base_slug, sequence) in generated:
+                        sequence += 1
+                    if len(str(sequence)) > MAX_SLUG_SEQUENCE_DIGITS:
+                        raise SlugError(
+                            "Auto-generated slug sequence too long - please choose a "
+                            "different slug."
+                        )
+                    slug = "{}-{}".format(base_slug, sequence)
+                sequences[base_slug] = (True, sequence or 1)
+                generated.add(slug)
+                setattr(instance, self.name, slug)
+                instance.skip_slug_check = True
+
     def pre_save(self, instance, add):
         """Ensure slug uniqunes before save."""
         slug = self.value_from_object(instance)
 
+        # Slug was already generated by populate_bulk.
+        if getattr(instance, "skip_slug_check", False):
+            instance.skip_slug_check = False
+            return slug
+
         # We don't want to change slug defined by user.
         predefined_slug = bool(slug)
 
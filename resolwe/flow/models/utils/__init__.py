@@ -2,6 +2,7 @@
 
 from resolwe.flow.utils import iterate_fields
 
+from .delete import delete_tree  # noqa: F401
 from .duplicate import (  # noqa: F401
     bulk_duplicate_collection,
     bulk_duplicate_data,
@@ -21,6 +22,8 @@ from .render import (  # noqa: F401
 )
 from .validation import (  # noqa: F401
     DirtyError,
+    SchemaRegistry,
+    schema_registry,
     validate_data_object,
     validate_process_types,
     validate_schema,
@@ -0,0 +1,125 @@
+"""Resolwe models delete utils."""
+
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+from django.db import models
+from django.utils import timezone
+
+from resolwe.flow.models.base import delete_chunked
+from resolwe.observers.protocol import ChangeType, suppress_deletion_notifications
+
+#: Callable receiving the number of deleted and the total number of objects.
+ProgressCallback = Callable[[int, int], None]
+
+
+def _delete_order(objects: models.QuerySet) -> list[models.QuerySet]:
+    """Get the querysets to delete in order, the contained objects first.
+
+    Deleting the contained objects first assures that the cascade delete of
+    the chunk never has to collect an unbounded number of objects.
+    """
+    from resolwe.flow.models import Collection, Data, Entity
+
+    object_ids = objects.values("pk")
+    if objects.model is Collection:
+        return [
+            Data.objects.filter(collection__in=object_ids),
+            Entity.objects.filter(collection__in=object_ids),
+            objects,
+        ]
+    if objects.model is Entity:
+        return [Data.objects.filter(entity__in=object_ids), objects]
+    return [objects]
+
+
+@contextmanager
+def _delete_instances(instances: list[models.Model]) -> Iterator[None]:
+    """Prepare a chunk of instances of the same model to be deleted.
+
+    The observer notifications for the whole chunk are sent at once. Since the
+    queryset delete does not call the ``delete`` method of the model, the work
+    done by ``Data.delete`` and ``HistoryMixin.delete`` is done here.
+    """
+    from resolwe.flow.models import Data, Storage, Worker
+    from resolwe.flow.models.history_manager import HistoryMixin
+    from resolwe.observers.models import Observable, Observer
+
+    model = instances[0]._meta.model
+    instance_ids = [instance.pk for instance in instances]
+
+    # Send the notifications for the whole chunk instead of the signal handlers.
+    if issubclass(model, Observable):
+        Observer.observe_bulk_changes(instances, ChangeType.DELETE)
+
+    storage_ids: list[int] = []
+    if issubclass(model, Data):
+        for worker in Worker.objects.filter(data__in=instance_ids).exclude(
+            status__in=Worker.FINAL_STATUSES
+        ):
+            worker.terminate()
+        # Store ids in memory as relations are also deleted with the Data object.
+        storage_ids = list(
+            Storage.objects.filter(data__in=instance_ids)
+            .distinct()
+            .values_list("pk", flat=True)
+        )
+
+    history_ids: list[int] = []
+    if issubclass(model, HistoryMixin):
+        history_model = model._meta.get_field("history").related_model
+        history_ids = list(
+            history_model.objects.filter(
+                datum__in=instance_ids, valid__upper_inf=True
+            ).values_list("pk", flat=True)
+        )
+
+    with suppress_deletion_notifications(instances):
+        yield
+
+    if storage_ids:
+        Storage.objects.filter(pk__in=storage_ids, data=None).delete()
+    if history_ids:
+        history_model.objects.filter(pk__in=history_ids).update(deleted=timezone.now())
+
+
+def delete_tree(
+    objects: models.QuerySet,
+    chunk_size: int = 500,
+    progress: Optional[ProgressCallback] = None,
+) -> int:
+    """Delete the given objects together with the objects they contain.
+
+    The data objects and entities in the collections (and the data objects in
+    the entities) are deleted first, followed by the objects themselves. All
+    objects are deleted in chunks of ``chunk_size`` objects, each chunk in its
+    own transaction, so the memory usage does not depend on the number of
+    deleted objects.
+
+    :param objects: the queryset of objects to delete.
+
+    :param chunk_size: the maximal number of objects deleted at once.
+
+    :param progress: optional callable, called after every chunk with the
+        number of deleted objects and the total number of objects to delete.
+
+    :return: the number of deleted objects (not counting the objects deleted by
+        cascade).
+    """
+    querysets = _delete_order(objects)
+    total = sum(queryset.count() for queryset in querysets)
+    deleted = 0
+
+    @contextmanager
+    def chunk_handler(instances: list[models.Model]) -> Iterator[None]:
+        """Prepare the chunk and report the progress."""
+        nonlocal deleted
+        with _delete_instances(instances):
+            yield
+        deleted += len(instances)
+        if progress is not None:
+            progress(deleted, total)
+
+    for queryset in querysets:
+        delete_chunked(queryset, chunk_size, chunk_handler)
+    return deleted
@@ -1,16 +1,23 @@
 """Resolwe models duplicate utils."""
 
+from collections import defaultdict
 from copy import deepcopy
 from typing import TYPE_CHECKING, Callable, Iterable, Optional, Sequence, Type, TypeVar
 
-from django.core.exceptions import ValidationError
-from django.db import IntegrityError, models, transaction
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import IntegrityError, connection, models, transaction
 from django.utils import timezone
 
 from resolwe.flow.models import AnnotationField, AnnotationValue
 from resolwe.flow.utils import iterate_fields
-from resolwe.permissions.models import Permission, PermissionGroup, PermissionObject
-from resolwe.permissions.utils import assign_contributor_permissions, copy_permissions
+from resolwe.observers.protocol import post_permission_changed, pre_permission_changed
+from resolwe.permissions.models import (
+    Permission,
+    PermissionGroup,
+    PermissionModel,
+    PermissionObject,
+)
+from resolwe.permissions.utils import get_identity
 
 if TYPE_CHECKING:
     from resolwe.flow.models import Collection, Data, Entity
@@ -87,15 +94,16 @@ def _rewire_data_relations(
 
 def _rewire_foreign_key(
     objects: models.QuerySet, target: Type[models.Model], pk_mapping: DataPKMap
-) -> list:
+) -> int:
     """Make a copy of given objects and rewire references to target objects.
 
     All fields that points to an object of ``target`` type are replaced with
-    the new objects according to the provided mapping. The list of new objects
-    is returned. The new objects are already saved to the database.
+    the new objects according to the provided mapping. The rows are copied
+    with a single ``INSERT ... SELECT`` statement joined with the mapping, in
+    the order of the primary keys. No signals are sent.
 
-    :param objects: A list of objects to process.
-    :type objects: list of `~django.db.models.Model`
+    :param objects: A queryset of objects to process.
+    :type objects: `~django.db.models.QuerySet`
 
     :param target: A class to which references should be replaced
     :type terget: `~django.db.models.Model`
@@ -103,40 +111,59 @@ def _rewire_foreign_key(
     :param dict pk_mapping: Dictionary with old primary keys as keys and new
         primary keys as values.
 
-    :rtype: list of `~django.db.models.Model`
-
+    :return: the number of copied rows.
     """
-    if not objects:
-        return []
-
-    # Check that all objects are instances of the same class.
-    obj_class = type(objects[0])
-    if any(type(obj) != obj_class for obj in objects):
-        raise ValueError("All objects must be instances of the same class.")
-
-    # Find fields pointing to the target model.
-    to_map = [
-        field.name
-        for field in obj_class._meta.fields
-        if type(field) == models.ForeignKey and field.related_model == target
-    ]
-
-    # Rewire references.
-    new_objects = []
-    for obj in objects:
-        new_obj = deepcopy(obj)
-        for field_name in to_map:
-            field_name_id = f"{field_name}_id"
-            if value := pk_mapping.get(getattr(obj, field_name_id)):
-                setattr(new_obj, field_name_id, value)
-
-        new_obj.pk = None
-        new_objects.append(new_obj)
-
-    return obj_class.objects.bulk_create(new_objects)
+    model = objects.model
+    quote = connection.ops.quote_name
+    columns, expressions, joins = [], [], []
+    expression_params: list = []
+    join_params: list = []
+    for field in model._meta.concrete_fields:
+        if field.primary_key:
+            continue
+        columns.append(quote(field.column))
+        source = "source.{}".format(quote(field.column))
+        if isinstance(field, models.ForeignKey) and field.related_model == target:
+            # Join the mapping table and use the old value if it is not mapped.
+            alias = "mapping_{}".format(len(joins))
+            joins.append(
+                "LEFT JOIN UNNEST(%s::integer[], %s::integer[]) AS {alias}"
+                "(old_id, new_id) ON {source} = {alias}.old_id".format(
+                    alias=alias, source=source
+                )
+            )
+            join_params.extend([list(pk_mapping.keys()), list(pk_mapping.values())])
+            expressions.append("COALESCE({}.new_id, {})".format(alias, source))
+        elif getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+            # Auto timestamp fields are set as if the objects were created.
+            expressions.append("%s")
+            expression_params.append(timezone.now())
+        else:
+            expressions.append(source)
+
+    objects_sql, objects_params = objects.values("pk").query.sql_with_params()
+    params = [*expression_params, *join_params, *objects_params]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO {table} ({columns})
+            SELECT {expressions} FROM {table} AS source {joins}
+            WHERE source.{pk} IN ({objects_sql})
+            ORDER BY source.{pk}
+            """.format(
+                table=quote(model._meta.db_table),
+                columns=", ".join(columns),
+                expressions=", ".join(expressions),
+                joins=" ".join(joins),
+                pk=quote(model._meta.pk.column),
+                objects_sql=objects_sql,
+            ),
+            params,
+        )
+        return cursor.rowcount
 
 
-def _rewire_inputs(data: Iterable["Data"], pk_mapping: dict[int, int]) -> None:
+def _rewire_inputs(data: Sequence["Data"], pk_mapping: dict[int, int]) -> None:
     """Rewire inputs of provided data objects.
 
     References to input data objects in ``input`` field of the Data objects are changed
@@ -154,6 +181,8 @@ def _rewire_inputs(data: Iterable["Data"], pk_mapping: dict[int, int]) -> None:
     """
     from resolwe.flow.models import Data
 
+    # Load the processes of all data objects in a single query.
+    models.prefetch_related_objects(data, "process")
     for datum in data:
         for field_schema, fields in iterate_fields(
             datum.input, datum.process.input_schema
@@ -242,9 +271,9 @@ def process_entity(
 
         :param entity: An entity to be processed.
         """
-        if inherit_collection and entity.collection:
-            if entity.collection.id in collection_mapping:
-                entity.collection = collection_mapping[entity.collection.pk]
+        if inherit_collection and entity.collection_id:
+            if entity.collection_id in collection_mapping:
+                entity.collection = collection_mapping[entity.collection_id]
         else:
             entity.collection = None
 
@@ -282,15 +311,15 @@ def process_data(
 
         :param datum: An Data object to be processed.
         """
-        if inherit_collection and datum.collection:
-            if datum.collection.id in collection_mapping:
-                datum.collection = collection_mapping[datum.collection.pk]
+        if inherit_collection and datum.collection_id:
+            if datum.collection_id in collection_mapping:
+                datum.collection = collection_mapping[datum.collection_id]
         else:
             datum.collection = None
 
-        if inherit_entity and datum.entity:
-            if datum.entity.id in entity_mapping:
-                datum.entity = entity_mapping[datum.entity.pk]
+        if inherit_entity and datum.entity_id:
+            if datum.entity_id in entity_mapping:
+                datum.entity = entity_mapping[datum.entity_id]
         else:
             datum.entity = None
 
@@ -299,6 +328,168 @@ def process_data(
     return processor
 
 
+def _copy_instance(obj: U) -> U:
+    """Return an unsaved copy of the given object.
+
+    Unlike ``deepcopy`` the cached related objects are not copied. Only the
+    mutable (JSON) values are copied, so the copy can be modified without
+    affecting the original object.
+    """
+    values = {}
+    for field in obj._meta.concrete_fields:
+        value = getattr(obj, field.attname)
+        if isinstance(value, (dict, list)):
+            value = deepcopy(value)
+        values[field.attname] = value
+    return type(obj)(**values)
+
+
+def _container_permission_groups(objects: Sequence[T]) -> list[Optional[int]]:
+    """Return the permission group ids of top-most containers of the objects.
+
+    The result is equivalent to ``obj.topmost_container.permission_group_id``
+    (or ``None`` when object is not in container) for every object, but the
+    containers that are not cached on the objects are loaded with a single
+    query per container type.
+    """
+    permission_groups: list[Optional[int]] = [None] * len(objects)
+    if not objects:
+        return permission_groups
+
+    opts = objects[0]._meta
+    # The properties used to determine if object is in container, see
+    # PermissionObject.topmost_container.
+    for container_property in reversed(objects[0]._container_properties):
+        try:
+            field = opts.get_field(container_property)
+        except FieldDoesNotExist:
+            continue
+
+        missing = {
+            getattr(obj, field.attname)
+            for obj in objects
+            if getattr(obj, field.attname) is not None and not field.is_cached(obj)
+        }
+        container_groups = dict(
+            field.related_model.objects.filter(pk__in=missing).values_list(
+                "pk", "permission_group_id"
+            )
+            if missing
+            else []
+        )
+        for index, obj in enumerate(objects):
+            if (container_id := getattr(obj, field.attname)) is None:
+                continue
+            if field.is_cached(obj):
+                permission_groups[index] = getattr(
+                    obj, container_property
+                ).permission_group_id
+            else:
+                permission_groups[index] = container_groups[container_id]
+    return permission_groups
+
+
+def _copy_permissions(
+    objects: Sequence[tuple[PermissionObject, PermissionObject]], contributor
+):
+    """Copy permissions and assign contributor permissions to new objects.
+
+    The result is the same as calling ``copy_permissions(old, new)`` and
+    ``assign_contributor_permissions(new, contributor)`` for every pair of
+    objects, including the permission changed signals. The permissions of
+    all objects are copied with a single ``INSERT ... SELECT`` statement.
+
+    :param objects: a sequence of pairs (old object, new object). Every new
+        object must have its own (empty) permission group.
+    """
+    if not objects:
+        return
+
+    quote = connection.ops.quote_name
+    permission_fields = {
+        name: quote(PermissionModel._meta.get_field(name).column)
+        for name in ("value", "user", "group", "permission_group")
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO {table} ({value}, {user}, {group}, {permission_group})
+            SELECT permission.{value}, permission.{user}, permission.{group},
+                mapping.new_id
+            FROM {table} AS permission
+            JOIN UNNEST(%s::integer[], %s::integer[]) AS mapping(old_id, new_id)
+            ON permission.{permission_group} = mapping.old_id
+            """.format(
+                table=quote(PermissionModel._meta.db_table), **permission_fields
+            ),
+            [
+                [old.permission_group_id for old, _ in objects],
+                [new.permission_group_id for _, new in objects],
+            ],
+        )
+
+    for _, new in objects:
+        pre_permission_changed.send(sender=type(new), instance=new)
+
+    # Set the highest permission to the contributor, see
+    # PermissionGroup.set_permission.
+    user_or_group, entity_name = get_identity(contributor)
+    permission_group_ids = [new.permission_group_id for _, new in objects]
+    contributor_permissions = PermissionModel.all_objects.filter(
+        permission_group_id__in=permission_group_ids, **{entity_name: user_or_group}
+    )
+    existing = set(
+        contributor_permissions.values_list("permission_group_id", flat=True)
+    )
+    contributor_permissions.update(value=Permission.highest().value)
+    PermissionModel.all_objects.bulk_create(
+        PermissionModel(
+            value=Permission.highest().value,
+            permission_group_id=permission_group_id,
+            **{entity_name: user_or_group},
+        )
+        for permission_group_id in permission_group_ids
+        if permission_group_id not in existing
+    )
+
+    for _, new in objects:
+        post_permission_changed.send(sender=type(new), instance=new)
+
+
+def _copy_annotations(
+    entities: Sequence["Entity"], new_entities: Sequence["Entity"], contributor
+):
+    """Copy the annotations of entities to their copies.
+
+    The result is the same as calling ``Entity.copy_annotations`` on every
+    pair of entities and saving the returned annotations, but all
+    annotations are read with a single query and written in bulk.
+    """
+    entity_mapping = {
+        old.pk: new for old, new in zip(entities, new_entities) if old.collection_id
+    }
+    if not entity_mapping:
+        return
+    if missing := [new for new in entity_mapping.values() if not new.collection_id]:
+        raise ValidationError(
+            f"The entity '{missing[0].slug}' must belong to the collection."
+        )
+
+    new_annotations = [
+        AnnotationValue(
+            entity=entity_mapping[annotation.entity_id],
+            field=annotation.field,
+            value=annotation.value,
+            contributor=contributor or annotation.contributor,
+        )
+        for annotation in AnnotationValue.objects.filter(
+            entity_id__in=entity_mapping
+        ).select_related("field__group", "contributor")
+    ]
+    AnnotationValue._meta.get_field("slug").populate_bulk(new_annotations)
+    AnnotationValue.objects.bulk_create(new_annotations)
+
+
 def copy_objects(
     objects: Sequence[T],
     contributor,
@@ -337,7 +528,7 @@ def copy_objects(
 
     new_objects: list[T] = []
     for obj in objects:
-        new_obj = deepcopy(obj)
+        new_obj = _copy_instance(obj)
         new_obj.pk = None
         new_obj.slug = None
         new_obj.contributor = contributor
@@ -355,11 +546,14 @@ def copy_objects(
     try:
         # Add another atomic block to avoid corupting the main one.
         with transaction.atomic():
+            # Generate unique slugs for all objects with a single query.
+            model._meta.get_field("slug").populate_bulk(new_objects)
             model.objects.bulk_create(new_objects)
     except IntegrityError:
         # Probably a slug collision occured, try to create objects one by one.
         for obj in new_objects:
             obj.slug = None
+            obj.skip_slug_check = False
             # Call the bulk_create to skip signal sending.
             model.objects.bulk_create([obj])
 
@@ -369,32 +563,34 @@ def copy_objects(
             lambda: send_duplicate_signal(model, new_objects, objects)
         )
 
-    object_permission_group = dict()
+    # Deal with permissions. When object is in container fix the pointer to
+    # permission_group object.
+    # When object is not in container new PermissionGroup proxy object must be
+    # created, assigned to new object and permissions copied from old object to
+    # new one.
+    duplicated = timezone.now()
+    container_permission_groups = _container_permission_groups(new_objects)
     not_in_container = list()
-    for old, new in zip(objects, new_objects):
+    for old, new, permission_group_id in zip(
+        objects, new_objects, container_permission_groups
+    ):
         new.created = old.created
-        new.duplicated = timezone.now()
-
-        # Deal with permissions. When object is in container fix the pointer
-        # to permission_group object.
-        # When object is not in container new PermissionGroup proxy object must
-        # be created, assigned to new object and permissions copied from old
-        # object to new one.
-        if (topmost_container := new.topmost_container) is not None:
-            new.permission_group = topmost_container.permission_group
+        new.duplicated = duplicated
+        if permission_group_id is not None:
+            new.permission_group_id = permission_group_id
         else:
-            not_in_container.append((new, old))
-            object_permission_group[new] = PermissionGroup()
+            not_in_container.append((old, new))
 
-    PermissionGroup.objects.bulk_create(object_permission_group.values())
-    for new, old in not_in_container:
-        new.permission_group = object_permission_group[new]
-        copy_permissions(old, new)
-        assign_contributor_permissions(new, contributor)
+    permission_groups = PermissionGroup.objects.bulk_create(
+        PermissionGroup() for _ in not_in_container
+    )
+    for (_, new), permission_group in zip(not_in_container, permission_groups):
+        new.permission_group = permission_group
 
     model.objects.bulk_update(
         new_objects, ["created", "duplicated", "permission_group"]
     )
+    _copy_permissions(not_in_container, contributor)
     return new_objects
 
 
@@ -487,24 +683,39 @@ def bulk_duplicate_entity(
         copied objects.
     """
 
-    from resolwe.flow.models import Data
+    from resolwe.flow.models import Collection, Data
 
     entity_list = list(entities)
     entity_processor = process_entity(inherit_collection, collection_mapping)
     new_entities = copy_objects(entity_list, contributor, name_prefix, entity_processor)
-    # Copy the existing annotations to the new entity and create mapping
-    # between old and new entities.
-    new_annotations = []
-    for old_entity, new_entity in zip(
-        entity_list, new_entities
-    ):  # If collection is not set the annotations cannot be copied.
-        if inherit_collection:
-            new_annotations += old_entity.copy_annotations(new_entity, contributor)
-        if old_entity.collection and new_entity.collection:
-            new_entity.collection.annotation_fields.add(
-                *old_entity.collection.annotation_fields.all()
-            )
-    AnnotationValue.objects.bulk_create(new_annotations)
+    # Copy the existing annotations to the new entities. If collection is not set
+    # the annotations cannot be copied.
+    if inherit_collection:
+        _copy_annotations(entity_list, new_entities, contributor)
+
+    # Add the annotation fields of the original collections to the new ones.
+    collection_pairs = {
+        (old.collection_id, new.collection_id)
+        for old, new in zip(entity_list, new_entities)
+        if old.collection_id
+        and new.collection_id
+        and old.collection_id != new.collection_id
+    }
+    if collection_pairs:
+        through_model = Collection.annotation_fields.through
+        collection_fields = defaultdict(list)
+        for collection_id, field_id in through_model.objects.filter(
+            collection_id__in={old for old, _ in collection_pairs}
+        ).values_list("collection_id", "annotationfield_id"):
+            collection_fields[collection_id].append(field_id)
+        through_model.objects.bulk_create(
+            (
+                through_model(collection_id=new, annotationfield_id=field_id)
+                for old, new in collection_pairs
+                for field_id in collection_fields[old]
+            ),
+            ignore_conflicts=True,
+        )
 
     # Check permissions when collection is inherited.
     if inherit_collection:
@@ -1,11 +1,16 @@
 """Resolwe models hydrate utils."""
 
+import concurrent.futures
 import copy
+import itertools
 import os
 import re
 from pathlib import Path
+from typing import Iterable, Optional, Union
 
 from django.core.exceptions import ValidationError
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
 
 from resolwe.flow.utils import iterate_fields
 
@@ -174,95 +179,227 @@ def hydrate_input_uploads(input_, input_schema, hydrate_values=True):
                 value["file_temp"] = "Invalid value for file_temp in DB"
 
 
+def get_dir_size(path: Union[str, os.PathLike], max_workers: int = 8) -> int:
+    """Get the total size of files in the directory.
+
+    The directory tree is walked with ``os.scandir`` and subdirectories are
+    scanned in parallel by a pool of ``max_workers`` threads.
+    """
+
+    def scan(directory):
+        """Return the size of files in directory and a list of subdirectories."""
+        size, subdirectories = 0, []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                elif entry.is_file():
+                    size += entry.stat().st_size
+        return size, subdirectories
+
+    total_size = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(scan, path)}
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                size, subdirectories = future.result()
+                total_size += size
+                pending.update(
+                    executor.submit(scan, subdirectory)
+                    for subdirectory in subdirectories
+                )
+    return total_size
+
+
+class SizeEngine:
+    """Compute sizes of files and directories of the given data object.
+
+    Sizes are taken from the ``ReferencedPath`` objects stored when the
+    files were uploaded. When the size of the path is not known, it is
+    computed from the file system. Every size is computed only once.
+    """
+
+    def __init__(self, data):
+        """Initialize the engine."""
+        self.data = data
+        self._storage_location = None
+        self._stored: dict[str, int] = {}
+        self._sizes: dict[str, int] = {}
+
+    @property
+    def storage_location(self):
+        """Get the default storage location of the data object."""
+        if self._storage_location is None:
+            self._storage_location = self.data.location.default_storage_location
+        return self._storage_location
+
+    def get_path(self, path: str) -> str:
+        """Get the absolute path of the given path."""
+        return self.storage_location.get_path(filename=path)
+
+    def prefetch(self, paths: Iterable[str]):
+        """Retrieve the stored sizes of the given paths with a single query."""
+        from resolwe.storage.models import ReferencedPath  # Prevent circular import.
+
+        keys = set()
+        for path in paths:
+            keys.update((path, f"{path.rstrip('/')}/"))
+        if keys:
+            self._stored.update(
+                ReferencedPath.objects.filter(
+                    storage_locations=self.storage_location, path__in=keys
+                ).values_list("path", "size")
+            )
+
+    def _stored_file_size(self, path: str) -> Optional[int]:
+        """Get the stored size of the file or None if it is not known."""
+        # Directories are stored with '/' at the end and have size 0.
+        size = -1 if path.endswith("/") else self._stored.get(path, -1)
+        return size if size >= 0 else None
+
+    def _stored_dir_size(self, path: str) -> Optional[int]:
+        """Get the stored size of the directory or None if it is not known."""
+        from resolwe.storage.models import ReferencedPath  # Prevent circular import.
+
+        prefix = f"{path.rstrip('/')}/"
+        if prefix not in self._stored:
+            return None
+        sizes = ReferencedPath.objects.filter(
+            storage_locations=self.storage_location, path__startswith=prefix
+        ).aggregate(
+            size=Coalesce(Sum("size", filter=Q(size__gt=0)), 0),
+            unknown=Count("pk", filter=Q(size__lt=0)),
+        )
+        return None if sizes["unknown"] else sizes["size"]
+
+    def file_size(self, path: str) -> int:
+        """Get the size of the file.
+
+        :raises ValidationError: when the size is not known and the file does
+            not exist.
+        """
+        if path not in self._sizes:
+            size = self._stored_file_size(path)
+            if size is None:
+                file_path = Path(self.get_path(path))
+                if not file_path.is_file():
+                    raise ValidationError(
+                        "Referenced file does not exist ({})".format(file_path)
+                    )
+                size = file_path.stat().st_size
+            self._sizes[path] = size
+        return self._sizes[path]
+
+    def dir_size(self, path: str) -> int:
+        """Get the size of the directory.
+
+        :raises ValidationError: when the size is not known and the directory
+            does not exist.
+        """
+        key = f"{path.rstrip('/')}/"
+        if key not in self._sizes:
+            size = self._stored_dir_size(path)
+            if size is None:
+                dir_path = Path(self.get_path(path))
+                if not dir_path.is_dir():
+                    raise ValidationError(
+                        "Referenced dir does not exist ({})".format(dir_path)
+                    )
+                size = get_dir_size(dir_path)
+            self._sizes[key] = size
+        return self._sizes[key]
+
+    def path_size(self, path: str) -> int:
+        """Get the size of the file or directory.
+
+        Paths that do not exist have size 0.
+        """
+        if path not in self._sizes:
+            size = self._stored_file_size(path)
+            if size is None:
+                size = self._stored_dir_size(path)
+            if size is None:
+                full_path = Path(self.get_path(path))
+                if full_path.is_file():
+                    size = full_path.stat().st_size
+                elif full_path.is_dir():
+                    size = get_dir_size(full_path)
+                else:
+                    size = 0
+            self._sizes[path] = size
+        return self._sizes[path]
+
+
 def hydrate_size(data, force=False):
     """Add file and dir sizes.
 
     Add sizes to ``basic:file:``, ``list:basic:file``, ``basic:dir:``
     and ``list:basic:dir:`` fields.
 
+    Sizes are taken from the ``ReferencedPath`` objects of the data object
+    when they are known and computed from the file system otherwise, see
+    :class:`SizeEngine`.
+
     ``force`` parameter is used to recompute file sizes also on objects
     that already have these values, e.g. in migrations.
     """
     from ..data import Data  # prevent circular import
 
-    def get_dir_size(path):
-        """Get directory size."""
-        return sum(
-            file_.stat().st_size for file_ in Path(path).rglob("*") if file_.is_file()
+    # Pairs (field value, key of the path in the value).
+    objects: list[tuple[dict, str]] = []
+    for field_schema, fields in iterate_fields(data.output, data.process.output_schema):
+        name = field_schema["name"]
+        value = fields[name]
+        if "type" in field_schema:
+            if field_schema["type"].startswith("basic:file:"):
+                objects.append((value, "file"))
+            elif field_schema["type"].startswith("list:basic:file:"):
+                objects.extend((obj, "file") for obj in value)
+            elif field_schema["type"].startswith("basic:dir:"):
+                objects.append((value, "dir"))
+            elif field_schema["type"].startswith("list:basic:dir:"):
+                objects.extend((obj, "dir") for obj in value)
+
+    # Objects in final state keep the sizes they already have.
+    final = data.status in [Data.STATUS_DONE, Data.STATUS_ERROR] and not force
+    to_hydrate = [(obj, key) for obj, key in objects if not final or "size" not in obj]
+
+    engine = SizeEngine(data)
+    if to_hydrate:
+        engine.prefetch(
+            path
+            for obj, key in to_hydrate
+            for path in itertools.chain([obj[key]], obj.get("refs", []))
         )
 
     def get_refs_size(obj, obj_path):
         """Calculate size of all references of ``obj``.
 
         :param dict obj: Data object's output field (of type file/dir).
-        :param Path obj_path: Path to ``obj``.
+        :param str obj_path: Path to ``obj`` relative to the data directory.
         """
         total_size = 0
         for ref in obj.get("refs", []):
-            ref_path = data.location.get_path(filename=ref)
-            if ref_path in os.fspath(obj_path):
-                # It is a common case that ``obj['file']`` is also contained in
-                # one of obj['ref']. In that case, we need to make sure that it's
-                # size is not counted twice:
+            # It is a common case that ``obj['file']`` is also contained in
+            # one of obj['ref']. In that case, we need to make sure that it's
+            # size is not counted twice.
+            if obj_path == ref or obj_path.startswith(f"{ref.rstrip('/')}/"):
                 continue
-            ref_path: Path = Path(ref_path)
-            if ref_path.is_file():
-                total_size += ref_path.stat().st_size
-            elif ref_path.is_dir():
-                total_size += get_dir_size(ref_path)
-
+            total_size += engine.path_size(ref)
         return total_size
 
-    def add_file_size(obj):
-        """Add file size to the basic:file field."""
-        if (
-            data.status in [Data.STATUS_DONE, Data.STATUS_ERROR]
-            and "size" in obj
-            and not force
-        ):
-            return
-
-        path = Path(data.location.get_path(filename=obj["file"]))
-        if not path.is_file():
-            raise ValidationError("Referenced file does not exist ({})".format(path))
-
-        obj["size"] = path.stat().st_size
-        obj["total_size"] = obj["size"] + get_refs_size(obj, path)
-
-    def add_dir_size(obj):
-        """Add directory size to the basic:dir field."""
-        if (
-            data.status in [Data.STATUS_DONE, Data.STATUS_ERROR]
-            and "size" in obj
-            and not force
-        ):
-            return
-
-        path = Path(data.location.get_path(filename=obj["dir"]))
-        if not path.is_dir():
-            raise ValidationError("Referenced dir does not exist ({})".format(path))
-
-        obj["size"] = get_dir_size(path)
-        obj["total_size"] = obj["size"] + get_refs_size(obj, path)
-
+    hydrated = {id(obj) for obj, _ in to_hydrate}
     data_size = 0
-    for field_schema, fields in iterate_fields(data.output, data.process.output_schema):
-        name = field_schema["name"]
-        value = fields[name]
-        if "type" in field_schema:
-            if field_schema["type"].startswith("basic:file:"):
-                add_file_size(value)
-                data_size += value.get("total_size", 0)
-            elif field_schema["type"].startswith("list:basic:file:"):
-                for obj in value:
-                    add_file_size(obj)
-                    data_size += obj.get("total_size", 0)
-            elif field_schema["type"].startswith("basic:dir:"):
-                add_dir_size(value)
-                data_size += value.get("total_size", 0)
-            elif field_schema["type"].startswith("list:basic:dir:"):
-                for obj in value:
-                    add_dir_size(obj)
-                    data_size += obj.get("total_size", 0)
+    for obj, key in objects:
+        if id(obj) in hydrated:
+            if key == "file":
+                obj["size"] = engine.file_size(obj["file"])
+            else:
+                obj["size"] = engine.dir_size(obj["dir"])
+            obj["total_size"] = obj["size"] + get_refs_size(obj, obj[key])
+        data_size += obj.get("total_size", 0)
 
     data.size = data_size
@@ -2,11 +2,14 @@
 
 import json
 import re
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Dict, Optional
 
 import jsonschema
 from django.contrib.staticfiles import finders
 from django.core.exceptions import ValidationError
+from jsonschema.protocols import Validator
 
 from resolwe.flow.utils import dict_dot, iterate_dict, iterate_fields, iterate_schema
 
@@ -15,36 +18,121 @@ class DirtyError(ValidationError):
     """Error raised when required fields missing."""
 
 
-def validation_schema(name):
-    """Return json schema for json validation."""
-    schemas = {
-        "processor": "processSchema.json",
-        "descriptor": "descriptorSchema.json",
-        "field": "fieldSchema.json",
-        "type": "typeSchema.json",
-        "process_resources": "resourcesSchema.json",
-    }
-
-    if name not in schemas:
-        raise ValueError()
+VALIDATION_SCHEMAS = {
+    "processor": "processSchema.json",
+    "descriptor": "descriptorSchema.json",
+    "field": "fieldSchema.json",
+    "type": "typeSchema.json",
+    "process_resources": "resourcesSchema.json",
+}
 
-    field_schema_file = finders.find("flow/{}".format(schemas["field"]), all=True)[0]
+
+@lru_cache(maxsize=None)
+def _validation_schema_source(name: str) -> str:
+    """Read the validation schema with the field schema substituted in.
+
+    The schema files are located and read from the disk only once.
+    """
+    field_schema_file = finders.find(
+        "flow/{}".format(VALIDATION_SCHEMAS["field"]), all=True
+    )[0]
     with open(field_schema_file, "r") as fn:
         field_schema = fn.read()
 
     if name == "field":
-        return json.loads(field_schema.replace("{{PARENT}}", ""))
+        return field_schema.replace("{{PARENT}}", "")
 
-    schema_file = finders.find("flow/{}".format(schemas[name]), all=True)[0]
+    schema_file = finders.find("flow/{}".format(VALIDATION_SCHEMAS[name]), all=True)[0]
     with open(schema_file, "r") as fn:
         schema = fn.read()
 
-    return json.loads(
-        schema.replace("{{FIELD}}", field_schema).replace("{{PARENT}}", "/field")
-    )
+    return schema.replace("{{FIELD}}", field_schema).replace("{{PARENT}}", "/field")
+
+
+def validation_schema(name):
+    """Return json schema for json validation."""
+    if name not in VALIDATION_SCHEMAS:
+        raise ValueError()
+
+    return json.loads(_validation_schema_source(name))
+
+
+class SchemaRegistry:
+    """Registry of compiled JSON schema validators.
+
+    Every validation schema is loaded, checked and compiled only once
+    and the compiled validator is reused for all later validations.
+    """
+
+    def __init__(self):
+        """Initialize the empty registry."""
+        self._validators: Dict[str, Validator] = {}
+        self._type_validators: Dict[str, Optional[Validator]] = {}
+
+    def validator(self, name: str) -> Validator:
+        """Return the compiled validator for the validation schema ``name``."""
+        if name not in self._validators:
+            schema = validation_schema(name)
+            validator_class = jsonschema.validators.validator_for(schema)
+            validator_class.check_schema(schema)
+            self._validators[name] = validator_class(schema)
+        return self._validators[name]
+
+    def validate(self, instance: Any, name: str):
+        """Validate ``instance`` against the validation schema ``name``.
+
+        :raises jsonschema.exceptions.ValidationError: with the same
+            (best matching) error as :func:`jsonschema.validate`.
+        """
+        error = jsonschema.exceptions.best_match(
+            self.validator(name).iter_errors(instance)
+        )
+        if error is not None:
+            raise error
+
+    def _compile_type_validator(self, type_: str) -> Optional[Validator]:
+        """Compile the validator checking only the definition of ``type_``.
+
+        When ``type_`` does not match exactly one type definition in the
+        type schema ``None`` is returned.
+        """
+        schema = validation_schema("type")
+        names = [
+            name
+            for name, definition in schema["types"].items()
+            if re.search(definition["properties"]["type"]["pattern"], type_)
+        ]
+        if len(names) != 1:
+            return None
+
+        schema["items"] = {"$ref": "#/types/{}".format(names[0])}
+        return jsonschema.validators.validator_for(schema)(schema)
 
+    def validate_type(self, type_: str, value: Any):
+        """Validate the ``value`` of the field of type ``type_``.
 
-TYPE_SCHEMA = validation_schema("type")
+        The type definitions in the type schema are mutually exclusive, so
+        only the definition matching ``type_`` is checked. The complete
+        type schema is used only to report the error.
+
+        :raises jsonschema.exceptions.ValidationError: when value does not
+            match the type.
+        """
+        if type_ not in self._type_validators:
+            self._type_validators[type_] = self._compile_type_validator(type_)
+
+        instance = [{"type": type_, "value": value}]
+        type_validator = self._type_validators[type_]
+        if type_validator is None or not type_validator.is_valid(instance):
+            self.validate(instance, "type")
+
+    def clear(self):
+        """Remove all compiled validators."""
+        self._validators.clear()
+        self._type_validators.clear()
+
+
+schema_registry = SchemaRegistry()
 
 
 def validate_schema(
@@ -145,24 +233,50 @@ def validate_schema(
 
             validate_refs(field)
 
-    def validate_data(data_pk, type_):
-        """Check that `Data` objects exist and is of right type."""
-        from ..data import Data  # prevent circular import
+    def validate_references(data_references, storage_references):
+        """Check that referenced `Data` and `Storage` objects exist.
 
-        data_qs = Data.objects.filter(pk=data_pk).values("process__type")
-        if not data_qs.exists():
-            if skip_missing_data:
-                return
+        All references are resolved with one query per model and all
+        missing or mistyped references are reported together.
+        """
+        from ..data import Data  # prevent circular import
 
-            raise ValidationError(
-                "Referenced `Data` object does not exist (id:{})".format(data_pk)
+        errors = []
+        if data_references:
+            data_types = dict(
+                Data.objects.filter(
+                    pk__in={data_pk for data_pk, _ in data_references}
+                ).values_list("pk", "process__type")
             )
-        data = data_qs.first()
-        if not data["process__type"].startswith(type_):
-            raise ValidationError(
-                "Data object of type `{}` is required, but type `{}` is given. "
-                "(id:{})".format(type_, data["process__type"], data_pk)
+            for data_pk, type_ in data_references:
+                if data_pk not in data_types:
+                    if not skip_missing_data:
+                        errors.append(
+                            "Referenced `Data` object does not exist (id:{})".format(
+                                data_pk
+                            )
+                        )
+                elif not data_types[data_pk].startswith(type_):
+                    errors.append(
+                        "Data object of type `{}` is required, but type `{}` is "
+                        "given. (id:{})".format(type_, data_types[data_pk], data_pk)
+                    )
+
+        if storage_references:
+            existing_storages = set(
+                Storage.objects.filter(pk__in=storage_references).values_list(
+                    "pk", flat=True
+                )
             )
+            for storage_pk in sorted(storage_references - existing_storages):
+                errors.append(
+                    "Referenced `Storage` object does not exist (id:{})".format(
+                        storage_pk
+                    )
+                )
+
+        if errors:
+            raise ValidationError(errors)
 
     def validate_range(value, interval, name):
         """Check that given value is inside the specified range."""
@@ -178,6 +292,9 @@ def validate_schema(
 
     is_dirty = False
     dirty_fields = []
+    # References are collected during the schema walk and validated at once.
+    data_references = []
+    storage_references = set()
     for _schema, _fields, _ in iterate_schema(instance, schema):
         name = _schema["name"]
         is_required = _schema.get("required", True)
@@ -195,7 +312,7 @@ def validate_schema(
                 continue
 
             try:
-                jsonschema.validate([{"type": type_, "value": field}], TYPE_SCHEMA)
+                schema_registry.validate_type(type_, field)
             except jsonschema.exceptions.ValidationError as ex:
                 raise ValidationError(ex.message)
 
@@ -221,19 +338,15 @@ def validate_schema(
                 for obj in field:
                     validate_dir(obj)
 
-            elif (
-                type_ == "basic:json:" and not Storage.objects.filter(pk=field).exists()
-            ):
-                raise ValidationError(
-                    "Referenced `Storage` object does not exist (id:{})".format(field)
-                )
+            elif type_ == "basic:json:":
+                storage_references.add(field)
 
             elif type_.startswith("data:"):
-                validate_data(field, type_)
+                data_references.append((field, type_))
 
             elif type_.startswith("list:data:"):
-                for data_id in field:
-                    validate_data(data_id, type_[5:])  # remove `list:` from type
+                # Remove `list:` from type.
+                data_references.extend((data_id, type_[5:]) for data_id in field)
 
             elif type_ == "basic:integer:" or type_ == "basic:decimal:":
                 validate_range(field, _schema.get("range"), name)
@@ -242,6 +355,8 @@ def validate_schema(
                 for obj in field:
                     validate_range(obj, _schema.get("range"), name)
 
+    validate_references(data_references, storage_references)
+
     try:
         # Check that schema definitions exist for all fields
         for _, _ in iterate_fields(instance, schema):
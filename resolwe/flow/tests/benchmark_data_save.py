@@ -0,0 +1,84 @@
+"""Benchmark the throughput of ``Data.save``.
+
+Benchmarks are not part of the regular test suite. Run them with::
+
+    tox -e benchmarks
+
+or directly with::
+
+    tests/manage.py test resolwe --pattern "benchmark_*.py"
+
+"""
+
+import logging
+import time
+
+from resolwe.flow.models import Data, Process
+from resolwe.flow.models.utils import schema_registry
+from resolwe.test import TestCase
+
+logger = logging.getLogger(__name__)
+
+DATA_COUNT = 200
+
+
+class DataSaveBenchmark(TestCase):
+    """Measure the number of ``Data`` objects saved per second."""
+
+    def setUp(self):
+        """Create the benchmarked process."""
+        super().setUp()
+        self.process = Process.objects.create(
+            slug="benchmark-data-save",
+            type="data:benchmark:",
+            contributor=self.contributor,
+            input_schema=[
+                {"name": "integer", "type": "basic:integer:"},
+                {"name": "decimal", "type": "basic:decimal:"},
+                {"name": "string", "type": "basic:string:"},
+                {"name": "strings", "type": "list:basic:string:"},
+                {"name": "url", "type": "basic:url:download:"},
+            ],
+            output_schema=[{"name": "result", "type": "basic:string:"}],
+        )
+        self.input = {
+            "integer": 42,
+            "decimal": 4.2,
+            "string": "benchmark",
+            "strings": ["a", "b", "c"],
+            "url": {"url": "https://genialis.com"},
+        }
+
+    def _report(self, name, elapsed):
+        """Log the measured throughput."""
+        logger.warning(
+            "%s: %d saves in %.3f s (%.1f saves/s)",
+            name,
+            DATA_COUNT,
+            elapsed,
+            DATA_COUNT / elapsed,
+        )
+
+    def test_create(self):
+        """Benchmark creating new data objects."""
+        schema_registry.clear()
+        start = time.perf_counter()
+        for _ in range(DATA_COUNT):
+            Data.objects.create(
+                contributor=self.contributor,
+                process=self.process,
+                input=self.input,
+                process_resources={"cores": 1, "memory": 1024},
+            )
+        self._report("Data create", time.perf_counter() - start)
+
+    def test_update(self):
+        """Benchmark saving the existing data object."""
+        data = Data.objects.create(
+            contributor=self.contributor, process=self.process, input=self.input
+        )
+        start = time.perf_counter()
+        for index in range(DATA_COUNT):
+            data.output = {"result": str(index)}
+            data.save()
+        self._report("Data update", time.perf_counter() - start)
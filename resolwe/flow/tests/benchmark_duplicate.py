@@ -0,0 +1,132 @@
+"""Benchmark duplication of collections.
+
+Collections with increasing numbers of entities, each holding two data objects
+with an input relation between them, are duplicated with the per-object
+implementation that was used before (kept in
+:mod:`resolwe.flow.tests.duplicate_baseline`) and with the current set-based
+implementation. The time and the number of queries of both are reported.
+
+Both implementations are warmed up first and then run in alternating order,
+so neither of them profits from the caches filled by the other one.
+
+Benchmarks are not part of the regular test suite. Run them with::
+
+    tox -e benchmarks
+
+or directly with::
+
+    tests/manage.py test resolwe --pattern "benchmark_*.py"
+
+"""
+
+import logging
+import statistics
+import time
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from resolwe.flow.models import Collection, Data, Entity, Process
+from resolwe.flow.models.utils import duplicate
+from resolwe.flow.tests import duplicate_baseline
+from resolwe.permissions.models import Permission
+from resolwe.test import TransactionTestCase
+
+logger = logging.getLogger(__name__)
+
+ENTITY_COUNTS = (10, 100, 500)
+
+# The number of measured duplications with every implementation.
+ROUNDS = 3
+
+IMPLEMENTATIONS = {
+    "per-object": duplicate_baseline.bulk_duplicate_collection,
+    "set-based": duplicate.bulk_duplicate_collection,
+}
+
+
+class DuplicateBenchmark(TransactionTestCase):
+    """Measure the time and number of queries needed to duplicate collections."""
+
+    def setUp(self):
+        """Create the process used by the duplicated data objects."""
+        super().setUp()
+        self.process = Process.objects.create(
+            contributor=self.contributor,
+            type="data:benchmark:",
+            input_schema=[{"name": "parent", "type": "data:benchmark:"}],
+        )
+
+    def _create_collection(self, entity_count):
+        """Create a collection with the given number of entities.
+
+        Every entity contains two data objects, the second one using the
+        first one as its input.
+        """
+        collection = Collection.objects.create(
+            name="Collection", contributor=self.contributor
+        )
+        collection.set_permission(Permission.OWNER, self.contributor)
+        for _ in range(entity_count):
+            entity = Entity.objects.create(
+                name="Entity", contributor=self.contributor, collection=collection
+            )
+            parent = Data.objects.create(
+                contributor=self.contributor,
+                process=self.process,
+                status=Data.STATUS_DONE,
+                entity=entity,
+                collection=collection,
+            )
+            Data.objects.create(
+                contributor=self.contributor,
+                process=self.process,
+                status=Data.STATUS_DONE,
+                entity=entity,
+                collection=collection,
+                input={"parent": parent.pk},
+            )
+        return collection
+
+    def _duplicate(self, implementation, collection) -> tuple[float, int]:
+        """Duplicate the collection and return the time and number of queries."""
+        collections = Collection.objects.filter(pk=collection.pk)
+        start = time.perf_counter()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured_queries:
+                implementation(collections, self.contributor)
+        return time.perf_counter() - start, len(captured_queries)
+
+    def test_duplicate_collection(self):
+        """Benchmark duplicating collections of increasing size."""
+        for entity_count in ENTITY_COUNTS:
+            collection = self._create_collection(entity_count)
+            for implementation in IMPLEMENTATIONS.values():
+                self._duplicate(implementation, collection)
+
+            timings = {name: [] for name in IMPLEMENTATIONS}
+            queries = {}
+            for round_ in range(ROUNDS):
+                names = list(IMPLEMENTATIONS)
+                if round_ % 2:
+                    names.reverse()
+                for name in names:
+                    elapsed, queries[name] = self._duplicate(
+                        IMPLEMENTATIONS[name], collection
+                    )
+                    timings[name].append(elapsed)
+
+            baseline = statistics.median(timings["per-object"])
+            elapsed = statistics.median(timings["set-based"])
+            logger.warning(
+                "Duplicate collection with %d entities and %d data: "
+                "per-object %.3f s, %d queries; set-based %.3f s, %d queries "
+                "(%.1fx faster)",
+                entity_count,
+                2 * entity_count,
+                baseline,
+                queries["per-object"],
+                elapsed,
+                queries["set-based"],
+                baseline / elapsed,
+            )
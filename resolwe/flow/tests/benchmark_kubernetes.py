@@ -0,0 +1,121 @@
+"""Benchmark job submission of the kubernetes workload connector.
+
+The kubernetes API is replaced by a stub which responds after a fixed delay.
+
+Benchmarks are not part of the regular test suite. Run them with::
+
+    tox -e benchmarks
+
+or directly with::
+
+    tests/manage.py test resolwe --pattern "benchmark_*.py"
+
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.test import override_settings
+
+from resolwe.flow.managers.workload_connectors import kubernetes
+from resolwe.flow.models import Process
+from resolwe.test import TestCase
+
+logger = logging.getLogger(__name__)
+
+# The number of submitted jobs.
+JOB_COUNT = 200
+
+# The delay of every response of the stub kubernetes API in seconds.
+API_LATENCY = 0.01
+
+# The concurrency of the job submitter, 0 means synchronous submission.
+CONCURRENCIES = (0, 4, 16)
+
+
+class StubApi:
+    """The stub of the kubernetes core and batch API."""
+
+    def __init__(self):
+        """Initialize the call counter."""
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        """Mimic the constructor of the API classes."""
+        return self
+
+    def __getattr__(self, name):
+        """Respond to every API call after the fixed delay."""
+
+        def call(*args, **kwargs):
+            with self._lock:
+                self.calls[name] += 1
+            time.sleep(API_LATENCY)
+            if name == "read_namespaced_config_map":
+                return SimpleNamespace(data={"tools": "tools-configmap"})
+            return SimpleNamespace(metadata=SimpleNamespace(name="job", uid="00000000"))
+
+        return call
+
+
+def stub_data(data_id: int) -> SimpleNamespace:
+    """Create an object with the attributes of the Data object used by the connector."""
+    return SimpleNamespace(
+        id=data_id,
+        pk=data_id,
+        location=SimpleNamespace(subpath=str(data_id)),
+        process=SimpleNamespace(
+            slug="benchmark",
+            scheduling_class=Process.SCHEDULING_CLASS_BATCH,
+            requirements={},
+        ),
+        worker=SimpleNamespace(public_key=b"public", private_key=b"private"),
+        process_error=[],
+        save=MagicMock(),
+        get_resource_limits=lambda: {"cores": 1, "memory": 1024, "storage": 10},
+    )
+
+
+@override_settings(FLOW_KUBERNETES_OVERCOMMIT={})
+class KubernetesSubmitBenchmark(TestCase):
+    """Measure the number of jobs submitted per second."""
+
+    def test_submit(self):
+        """Benchmark submitting jobs with increasing concurrency."""
+        for concurrency in CONCURRENCIES:
+            api = StubApi()
+            with (
+                patch.object(kubernetes.kubernetes.client, "BatchV1Api", api),
+                patch.object(kubernetes.kubernetes.client, "CoreV1Api", api),
+                patch.object(kubernetes, "redis_server"),
+                patch.object(kubernetes.Connector, "_load_kubernetes_config"),
+            ):
+                connector = kubernetes.Connector()
+                connector.submitter = None
+                if concurrency:
+                    connector.submitter = kubernetes.JobSubmitter(
+                        concurrency, rate=None, max_pending=JOB_COUNT
+                    )
+                argv = ["executor", "localhost 53893 tcp"]
+                start = time.perf_counter()
+                for data_id in range(1, JOB_COUNT + 1):
+                    connector.submit(stub_data(data_id), list(argv))
+                dispatched = time.perf_counter() - start
+                if connector.submitter is not None:
+                    connector.submitter._executor.shutdown(wait=True)
+                elapsed = time.perf_counter() - start
+
+            self.assertEqual(api.calls["create_namespaced_job"], JOB_COUNT)
+            logger.warning(
+                "Concurrency %d: %.1f jobs/s, dispatcher blocked for %.3fs, "
+                "%d configmap reads.",
+                concurrency,
+                JOB_COUNT / elapsed,
+                dispatched,
+                api.calls["read_namespaced_config_map"],
+            )
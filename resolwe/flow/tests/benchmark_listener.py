@@ -0,0 +1,268 @@
+"""Benchmark the throughput and latency of the listener.
+
+The fake executors connect to the listener started by the test runner over
+ZeroMQ and send the commands of the regular process lifecycle: ``bootstrap``,
+a stream of ``progress`` and ``process_log`` reports interleaved with
+``referenced_files`` and finally ``finish``. Every executor waits for the
+response before sending the next command, as the real executors do.
+
+The benchmark reports the throughput, the median and the 99th percentile of
+the response time per command, the depth of the listener command queues and
+the time spent in Redis locking and in the command handlers.
+
+Benchmarks are not part of the regular test suite. Run them with::
+
+    tox -e benchmarks
+
+or directly with::
+
+    tests/manage.py test resolwe --pattern "benchmark_*.py"
+
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from unittest.mock import patch
+
+import zmq
+import zmq.asyncio
+from django.conf import settings
+
+from resolwe.flow.executors.socket_utils import Message, ResponseStatus
+from resolwe.flow.executors.zeromq_utils import ZMQCommunicator
+from resolwe.flow.managers import listener, manager
+from resolwe.flow.managers.listener.listener import LISTENER_PUBLIC_KEY, Processor
+from resolwe.flow.managers.listener.redis_cache import cache_manager
+from resolwe.flow.models import Data, Process
+from resolwe.test import ProcessTestCase
+
+logger = logging.getLogger(__name__)
+
+# The number of the simulated executors running at the same time.
+EXECUTOR_COUNT = 20
+
+# The number of progress and log reports sent by every executor.
+REPORT_COUNT = 50
+
+# Send the list of the referenced files after every this many reports.
+REFERENCED_FILES_INTERVAL = 10
+
+# The interval between the samples of the listener queue depth in seconds.
+QUEUE_SAMPLE_INTERVAL = 0.01
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Get the given percentile of the values by the nearest rank."""
+    ordered = sorted(values)
+    index = max(0, round(percent / 100 * len(ordered)) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+class StageTimer:
+    """Accumulate the time spent in the stages of the command processing."""
+
+    def __init__(self):
+        """Initialize."""
+        self.durations: dict[str, float] = defaultdict(float)
+        self.calls: dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, duration: float):
+        """Add the duration of a single call of the stage."""
+        with self._lock:
+            self.durations[stage] += duration
+            self.calls[stage] += 1
+
+    def wrap(self, stage: str, method):
+        """Time the calls of the given method."""
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - started)
+
+        return timed
+
+    def wrap_async(self, stage: str, method):
+        """Time the calls of the given coroutine function."""
+
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - started)
+
+        return timed
+
+
+class ListenerLoadBenchmark(ProcessTestCase):
+    """Measure the number of commands per second the listener processes."""
+
+    def setUp(self):
+        """Create the data objects processed by the fake executors."""
+        super().setUp()
+        listener_settings = settings.FLOW_EXECUTOR["LISTENER_CONNECTION"]
+        host = next(iter(listener_settings["hosts"].values()))
+        self.connection_string = (
+            f"{listener_settings['protocol']}://{host}:{listener_settings['port']}"
+        )
+        process = Process.objects.create(
+            slug="benchmark-listener", contributor=self.contributor
+        )
+        self.executors = []
+        for _ in range(EXECUTOR_COUNT):
+            data = Data.objects.create(process=process, contributor=self.contributor)
+            manager._prepare_data_dir(data)
+            data.worker.refresh_from_db()
+            self.executors.append(
+                (data.pk, data.worker.public_key, data.worker.private_key)
+            )
+
+    async def _executor(self, data_id, public_key, private_key, latencies):
+        """Simulate the executor processing a single data object."""
+        commands = [("bootstrap", [data_id, "executor"])]
+        for report in range(1, REPORT_COUNT + 1):
+            commands.append(("progress", report / REPORT_COUNT))
+            commands.append(("process_log", {"info": [f"Report {report}."]}))
+            if report % REFERENCED_FILES_INTERVAL == 0:
+                commands.append(
+                    (
+                        "referenced_files",
+                        [
+                            {"path": f"output/{report}/file_{index}.txt", "size": 1}
+                            for index in range(10)
+                        ],
+                    )
+                )
+        commands.append(("finish", {"rc": 0}))
+
+        zmq_socket = zmq.asyncio.Context.instance().socket(zmq.DEALER)
+        zmq_socket.curve_secretkey = private_key
+        zmq_socket.curve_publickey = public_key
+        zmq_socket.curve_serverkey = LISTENER_PUBLIC_KEY
+        zmq_socket.setsockopt(zmq.IDENTITY, str(data_id).encode())
+        zmq_socket.connect(self.connection_string)
+        communicator = ZMQCommunicator(zmq_socket, f"executor {data_id}", logger)
+        try:
+            async with communicator:
+                for command_name, command_data in commands:
+                    started = time.perf_counter()
+                    response = await communicator.send_command(
+                        Message.command(command_name, command_data)
+                    )
+                    latencies[command_name].append(time.perf_counter() - started)
+                    self.assertEqual(
+                        response.status,
+                        ResponseStatus.OK,
+                        f"Command {command_name} failed: {response.message_data}",
+                    )
+        finally:
+            zmq_socket.close(linger=0)
+
+    async def _sample_queue_depths(self, samples):
+        """Periodically read the depths of the listener command queues."""
+        protocol = listener.listener_protocol
+        listener_loop = listener._runner_future.get_loop()
+
+        async def read_depths():
+            return protocol.scheduler.queue_depths()
+
+        while True:
+            samples.append(
+                await asyncio.wrap_future(
+                    asyncio.run_coroutine_threadsafe(read_depths(), listener_loop)
+                )
+            )
+            await asyncio.sleep(QUEUE_SAMPLE_INTERVAL)
+
+    async def _run_executors(self, latencies, samples):
+        """Run all the executors at once and sample the queue depths."""
+        sampling = asyncio.ensure_future(self._sample_queue_depths(samples))
+        try:
+            await asyncio.gather(
+                *(
+                    self._executor(data_id, public_key, private_key, latencies)
+                    for data_id, public_key, private_key in self.executors
+                )
+            )
+        finally:
+            sampling.cancel()
+
+    def test_load(self):
+        """Benchmark the listener with many concurrent executors."""
+        latencies: dict[str, list[float]] = defaultdict(list)
+        samples: list[dict[str, int]] = []
+        timer = StageTimer()
+
+        with ExitStack() as stack:
+            for method in ("alock", "aunlock"):
+                stack.enter_context(
+                    patch.object(
+                        cache_manager,
+                        method,
+                        timer.wrap_async("redis lock", getattr(cache_manager, method)),
+                    )
+                )
+            stack.enter_context(
+                patch.object(
+                    Processor,
+                    "process_command",
+                    timer.wrap("handler", Processor.process_command),
+                )
+            )
+            stack.enter_context(
+                patch.object(
+                    type(listener.listener_protocol),
+                    "default_command_handler",
+                    timer.wrap_async(
+                        "total",
+                        type(listener.listener_protocol).default_command_handler,
+                    ),
+                )
+            )
+            started = time.perf_counter()
+            asyncio.run(self._run_executors(latencies, samples))
+            elapsed = time.perf_counter() - started
+
+        commands = sum(len(values) for values in latencies.values())
+        logger.warning(
+            "%d executors: %d commands in %.3f s (%.1f commands/s)",
+            EXECUTOR_COUNT,
+            commands,
+            elapsed,
+            commands / elapsed,
+        )
+        for command_name, values in sorted(latencies.items()):
+            logger.warning(
+                "%s: %d commands, p50 %.1f ms, p99 %.1f ms",
+                command_name,
+                len(values),
+                percentile(values, 50) * 1000,
+                percentile(values, 99) * 1000,
+            )
+        for command_class in sorted(samples[0] if samples else {}):
+            depths = [sample[command_class] for sample in samples]
+            logger.warning(
+                "Queue %s: mean depth %.1f, max depth %d",
+                command_class,
+                sum(depths) / len(depths),
+                max(depths),
+            )
+        # The time spent outside of the locking and handlers is the time of the
+        # access checks and of passing the command to the database thread.
+        for stage in ("redis lock", "handler", "total"):
+            logger.warning(
+                "Stage %s: %.1f ms per command",
+                stage,
+                timer.durations[stage] / max(timer.calls["total"], 1) * 1000,
+            )
+        self.assertEqual(
+            len(latencies["finish"]), EXECUTOR_COUNT, "Not all executors finished."
+        )
@@ -77,6 +77,58 @@ class AnnotationValueTest(TestCase):
         self.value.delete()
         self.field.delete()
 
+    def test_add_annotations(self):
+        entities = [
+            Entity.objects.create(name="Sample", contributor=self.contributor)
+            for _ in range(3)
+        ]
+        entities.append(self.entity)
+        annotations = [
+            {
+                "field": self.field,
+                "entity": entity,
+                "contributor": self.contributor,
+                "value": "Value",
+            }
+            for entity in entities
+        ]
+        # Savepoint, lookup, delete markers, slug sequences, insert and release.
+        with self.assertNumQueries(6):
+            created = AnnotationValue.objects.add_annotations(annotations)
+        self.assertEqual(len(created), 4)
+        self.assertEqual(
+            [value.slug for value in created],
+            [
+                "sample-group-field_1",
+                "sample-2-group-field_1",
+                "sample-3-group-field_1",
+                "entity-group-field_1-2",
+            ],
+        )
+        self.assertEqual(created[0].label, "Value")
+        self.value.refresh_from_db()
+        self.assertTrue(self.value.deleted)
+        self.assertEqual(
+            AnnotationValue.objects.filter(field=self.field).count(), len(entities)
+        )
+
+        # Unchanged values are not created again, None marks value as deleted.
+        annotations[0]["value"] = None
+        annotations[1]["value"] = "Changed"
+        created = AnnotationValue.objects.add_annotations(annotations)
+        self.assertEqual([value.value for value in created], ["Changed"])
+        self.assertIsNone(entities[0].get_annotation("group.field_1"))
+        self.assertEqual(entities[1].get_annotation("group.field_1"), "Changed")
+        self.assertEqual(entities[2].get_annotation("group.field_1"), "Value")
+
+        # All invalid values are reported and nothing is written.
+        annotations[2]["value"] = 1
+        annotations[3]["value"] = 2
+        with self.assertRaises(ValidationError) as error:
+            AnnotationValue.objects.add_annotations(annotations)
+        self.assertEqual(len(error.exception.error_list), 2)
+        self.assertEqual(entities[2].get_annotation("group.field_1"), "Value")
+
 
 class FilterAnnotations(TestCase):
     """Test filtering Entities by annotation values."""
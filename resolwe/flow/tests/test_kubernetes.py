@@ -0,0 +1,96 @@
+# pylint: disable=missing-docstring
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from resolwe.flow.managers.workload_connectors import kubernetes
+from resolwe.test import TestCase
+
+
+class JobSubmitterTest(TestCase):
+    def test_rate_limit(self):
+        submitter = kubernetes.JobSubmitter(concurrency=1, rate=10, max_pending=10)
+        with (
+            patch.object(kubernetes.time, "monotonic", return_value=100.0),
+            patch.object(kubernetes.time, "sleep") as sleep,
+        ):
+            for _ in range(3):
+                submitter._wait_for_rate()
+        # The first submission starts immediately, the next ones are spaced
+        # by the interval of 0.1 seconds.
+        self.assertEqual(len(sleep.call_args_list), 2)
+        self.assertAlmostEqual(sleep.call_args_list[0].args[0], 0.1)
+        self.assertAlmostEqual(sleep.call_args_list[1].args[0], 0.2)
+
+    def test_max_pending(self):
+        submitter = kubernetes.JobSubmitter(concurrency=1, rate=None, max_pending=2)
+        self.addCleanup(submitter._executor.shutdown)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        futures = [submitter.submit(release.wait, 5) for _ in range(2)]
+
+        # The third submission waits until a pending one is submitted.
+        blocked = threading.Thread(
+            target=lambda: futures.append(submitter.submit(lambda: None))
+        )
+        blocked.start()
+        blocked.join(0.2)
+        self.assertTrue(blocked.is_alive())
+
+        release.set()
+        blocked.join(5)
+        self.assertFalse(blocked.is_alive())
+        for future in futures:
+            future.result(5)
+
+
+class ConnectorConfigmapsTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.connector = kubernetes.Connector()
+        self.connector.submitter = None
+        self.core_api = MagicMock()
+        self.core_api.read_namespaced_config_map.return_value = SimpleNamespace(
+            data={"tools": "tools-configmap"}
+        )
+
+    def test_tools_configmaps_cache(self):
+        read = self.core_api.read_namespaced_config_map
+        for _ in range(2):
+            self.assertEqual(
+                self.connector._get_tools_configmaps(self.core_api),
+                {"tools": "tools-configmap"},
+            )
+        self.assertEqual(read.call_count, 1)
+
+        # The cached configmaps expire after the TTL.
+        with patch.object(kubernetes, "TOOLS_CONFIGMAPS_CACHE_TTL", 0):
+            self.connector._get_tools_configmaps(self.core_api)
+        self.assertEqual(read.call_count, 2)
+
+    def test_files_configmap_cache(self):
+        names = {
+            self.connector._get_files_configmap_name("1", self.core_api)
+            for _ in range(3)
+        }
+        self.assertEqual(len(names), 1)
+        self.assertTrue(names.pop().startswith("configmap-files-"))
+        # The existence of the configmap is checked once.
+        self.assertEqual(self.core_api.read_namespaced_config_map.call_count, 1)
+        self.core_api.create_namespaced_config_map.assert_not_called()
+
+    def test_clear_caches_on_failed_submission(self):
+        self.connector._get_tools_configmaps(self.core_api)
+        self.connector._get_files_configmap_name("1", self.core_api)
+        self.assertEqual(self.core_api.read_namespaced_config_map.call_count, 2)
+
+        data = MagicMock(id=1, process_error=[])
+        with patch.object(self.connector, "start", side_effect=RuntimeError("Failed")):
+            self.connector.submit(data, ["executor", "localhost 53893 tcp"])
+        self.assertEqual(len(data.process_error), 1)
+        data.save.assert_called_once_with()
+
+        # The configmaps are read again after the failure.
+        self.connector._get_tools_configmaps(self.core_api)
+        self.connector._get_files_configmap_name("1", self.core_api)
+        self.assertEqual(self.core_api.read_namespaced_config_map.call_count, 4)
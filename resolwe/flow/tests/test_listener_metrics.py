@@ -0,0 +1,77 @@
+# pylint: disable=missing-docstring
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.test import override_settings
+
+from resolwe.flow.executors.socket_utils import Message, MessageProcessingEventType
+from resolwe.flow.managers.listener.metrics import MetricsEventReporter
+from resolwe.flow.managers.listener.redis_cache import redis_server
+from resolwe.flow.models import Data, Process
+from resolwe.test import TestCase
+
+
+class MetricsEventReporterTest(TestCase):
+    def test_profile(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        profile_path = Path(directory.name) / "profile.json"
+        with override_settings(
+            FLOW_METRICS_ENDPOINT=None, FLOW_METRICS_PROFILE_PATH=str(profile_path)
+        ):
+            reporter = MetricsEventReporter()
+
+        message = Message.command("progress", 0.5)
+        message.client_id = b"client"
+        identity = b"1"
+        reporter.event(MessageProcessingEventType.MESSAGE_RECEIVED, message, identity)
+        reporter.event(
+            MessageProcessingEventType.MESSAGE_PROCESSING_STARTED, message, identity
+        )
+        reporter.event(
+            MessageProcessingEventType.LOCK_ACQUIRED, message, identity, duration=0.002
+        )
+        with reporter.profile_handler(message, identity):
+            list(Data.objects.all())
+            Process.objects.count()
+            redis_server.ping()
+        reporter.event(
+            MessageProcessingEventType.MESSAGE_PROCESSING_FINISHED, message, identity
+        )
+        # The calls outside the handler are not counted.
+        redis_server.ping()
+        reporter.dump_profile()
+
+        profile = json.loads(profile_path.read_text())["commands"]["progress"]
+        self.assertEqual(profile["queries"]["total"], 2)
+        self.assertEqual(profile["redis_calls"]["total"], 1)
+        self.assertEqual(profile["lock"]["max"], 2)
+        self.assertEqual(profile["handler"]["count"], 1)
+        self.assertEqual(profile["queue_wait"]["count"], 1)
+        self.assertEqual(reporter._message_received, {})
+
+    def test_periodic_profile_dump(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        profile_path = Path(directory.name) / "profile.json"
+        with override_settings(
+            FLOW_METRICS_ENDPOINT=None, FLOW_METRICS_PROFILE_PATH=str(profile_path)
+        ):
+            reporter = MetricsEventReporter()
+
+        reporter._profile_dumped = 0
+        with patch("resolwe.flow.managers.listener.metrics.threading.Thread") as thread:
+            reporter._record("handler", 2, {"command": "progress"})
+            reporter._record("handler", 4, {"command": "progress"})
+        # The profile is written once, in a thread.
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once_with()
+        thread.call_args.kwargs["target"](*thread.call_args.kwargs["args"])
+
+        profile = json.loads(profile_path.read_text())["commands"]["progress"]
+        self.assertEqual(
+            profile["handler"], {"count": 1, "total": 2, "mean": 2, "max": 2}
+        )
+        self.assertEqual(list(Path(directory.name).iterdir()), [profile_path])
@@ -0,0 +1,73 @@
+# pylint: disable=missing-docstring
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from resolwe.flow.managers.workload_connectors.local_pool import Connector
+from resolwe.test import TestCase
+
+
+class FakeProcess:
+    def __init__(self):
+        self.finished = threading.Event()
+
+    def wait(self):
+        self.finished.wait()
+        return 0
+
+
+class LocalPoolConnectorTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.processes = {}
+
+        def start(connector, argv, environment):
+            self.processes[argv[0]] = FakeProcess()
+            return self.processes[argv[0]]
+
+        patcher = patch.object(Connector, "start", autospec=True, side_effect=start)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(Connector, "environment", return_value={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def submit(self, connector, data_id, cores, memory):
+        data = MagicMock(id=data_id)
+        data.get_resource_limits.return_value = {"cores": cores, "memory": memory}
+        connector.submit(data, [data_id])
+
+    def finish(self, connector, data_id):
+        self.processes[data_id].finished.set()
+        started = time.time()
+        while data_id in connector._running and time.time() - started < 5:
+            time.sleep(0.01)
+        # Wait for the queued jobs to be started.
+        with connector._lock:
+            pass
+
+    def test_pool(self):
+        connector = Connector(cores=4, memory=8192)
+        self.submit(connector, 1, cores=2, memory=1024)
+        self.submit(connector, 2, cores=2, memory=1024)
+        # Does not fit into the free cores.
+        self.submit(connector, 3, cores=1, memory=1024)
+        # Larger than the pool, capped to the size of the pool.
+        self.submit(connector, 4, cores=8, memory=1024)
+        self.assertEqual(connector.running, 2)
+        self.assertEqual(connector.queued, 2)
+
+        self.finish(connector, 1)
+        # The jobs are started in order, job 4 has to wait for all cores.
+        self.assertEqual(set(connector._running), {2, 3})
+        self.assertEqual(connector.queued, 1)
+
+        self.finish(connector, 2)
+        self.finish(connector, 3)
+        self.assertEqual(set(connector._running), {4})
+        self.assertEqual(connector.queued, 0)
+
+        self.finish(connector, 4)
+        self.assertEqual(connector.running, 0)
+        self.assertEqual(connector._free_cores, 4)
+        self.assertEqual(connector._free_memory, 8192)
@@ -1,9 +1,17 @@
 # pylint: disable=missing-docstring
 import os
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
 
 from asgiref.sync import async_to_sync
+from django.test import override_settings
+from django.utils.timezone import now
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
 
 from resolwe.flow.managers import manager
+from resolwe.flow.managers.metrics import DispatcherMetrics
 from resolwe.flow.managers.utils import disable_auto_calls
 from resolwe.flow.models import (
     Collection,
@@ -13,7 +21,7 @@ from resolwe.flow.models import (
     Process,
 )
 from resolwe.permissions.models import Permission
-from resolwe.test import ProcessTestCase, TransactionTestCase
+from resolwe.test import ProcessTestCase, TestCase, TransactionTestCase
 
 PROCESSES_DIR = os.path.join(os.path.dirname(__file__), "processes")
 
@@ -253,3 +261,45 @@ class TransactionTestManager(TransactionTestCase):
         async_to_sync(manager.communicate)(run_sync=True)
 
         self.assertEqual(Data.objects.filter(status=Data.STATUS_RESOLVING).count(), 0)
+
+
+class DispatcherMetricsTest(TestCase):
+    def test_metrics(self):
+        reader = InMemoryMetricReader()
+        metrics = DispatcherMetrics(MeterProvider([reader]).get_meter("test"))
+        with metrics.timer("submit", connector="local"):
+            pass
+        metrics.count("examined", 3)
+        created = now()
+        data = SimpleNamespace(
+            created=created, scheduled=created + timedelta(seconds=2)
+        )
+        metrics.scheduled(data, connector="local")
+
+        points = {
+            metric.name: list(metric.data.data_points)
+            for resource_metrics in reader.get_metrics_data().resource_metrics
+            for scope_metrics in resource_metrics.scope_metrics
+            for metric in scope_metrics.metrics
+        }
+        (stage,) = points["resolwe_dispatcher_stage_duration"]
+        self.assertEqual(
+            dict(stage.attributes), {"stage": "submit", "connector": "local"}
+        )
+        self.assertEqual(stage.count, 1)
+        self.assertEqual(points["resolwe_dispatcher_data_examined"][0].value, 3)
+        self.assertEqual(points["resolwe_dispatcher_data_started"][0].value, 1)
+        (latency,) = points["resolwe_dispatcher_scheduling_latency"]
+        self.assertEqual(latency.sum, 2)
+
+    @override_settings(FLOW_METRICS_ENDPOINT="localhost:4317")
+    def test_lazy_meter(self):
+        meter = MeterProvider([InMemoryMetricReader()]).get_meter("test")
+        with patch(
+            "resolwe.flow.managers.metrics.create_meter", return_value=meter
+        ) as create_meter:
+            metrics = DispatcherMetrics()
+            create_meter.assert_not_called()
+            metrics.count("examined")
+            metrics.count("examined")
+            create_meter.assert_called_once_with("localhost:4317", "dispatcher")
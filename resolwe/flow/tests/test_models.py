@@ -6,7 +6,8 @@ from unittest.mock import MagicMock, PropertyMock, patch
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import now
 from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
 
@@ -20,10 +21,17 @@ from resolwe.flow.models import (
     Storage,
 )
 from resolwe.flow.models.data import Data, DataDependency, hydrate_size, render_template
-from resolwe.flow.models.utils import hydrate_input_references, referenced_files
+from resolwe.flow.models.history import CollectionHistory, DataHistory
+from resolwe.flow.models.utils import (
+    delete_tree,
+    hydrate_input_references,
+    referenced_files,
+)
+from resolwe.flow.models.utils.duplicate import bulk_duplicate_collection
 from resolwe.flow.views import DataViewSet
 from resolwe.observers.models import BackgroundTask
 from resolwe.permissions.models import Permission
+from resolwe.storage.models import ReferencedPath
 from resolwe.test import TestCase, TransactionTestCase
 from resolwe.test.utils import create_data_location, save_storage
 
@@ -137,6 +145,45 @@ class DataModelTest(TestCase):
         Data.objects.all().delete_chunked(chunk_size=10)
         self.assertFalse(Data.objects.exists())
 
+    def test_delete_tree(self):
+        process = Process.objects.create(contributor=self.contributor)
+        collection = Collection.objects.create(contributor=self.contributor)
+        other_collection = Collection.objects.create(contributor=self.contributor)
+        for _ in range(3):
+            entity = Entity.objects.create(
+                contributor=self.contributor, collection=collection
+            )
+            data = Data.objects.create(
+                contributor=self.contributor,
+                process=process,
+                entity=entity,
+                collection=collection,
+            )
+            data.storages.create(contributor=self.contributor, json={})
+        Data.objects.create(
+            contributor=self.contributor, process=process, collection=other_collection
+        )
+
+        progress = []
+        deleted = delete_tree(
+            Collection.objects.filter(pk=collection.pk),
+            chunk_size=2,
+            progress=lambda deleted, total: progress.append((deleted, total)),
+        )
+
+        self.assertEqual(deleted, 7)
+        # Data and entities are deleted in two chunks each before the collection.
+        self.assertEqual(progress, [(2, 7), (3, 7), (5, 7), (6, 7), (7, 7)])
+        self.assertFalse(Collection.objects.filter(pk=collection.pk).exists())
+        self.assertFalse(Entity.objects.exists())
+        self.assertEqual(Data.objects.get().collection, other_collection)
+        # Orphaned storages are deleted and the history is marked as deleted.
+        self.assertFalse(Storage.objects.exists())
+        self.assertEqual(
+            DataHistory.objects.filter(datum=None, deleted__isnull=False).count(), 3
+        )
+        self.assertIsNotNone(CollectionHistory.objects.get(datum=None).deleted)
+
     def test_move_to_entity(self):
         # Create data outside container and move it to the entity in the collection.
         process = Process.objects.create(contributor=self.contributor)
@@ -197,6 +244,58 @@ class DataModelTest(TestCase):
         hydrate_size(data)
         self.assertEqual(data.output["output_file"]["size"], 7)
 
+    def test_hydrate_size_referenced_paths(self):
+        proc = Process.objects.create(
+            name="Test process",
+            contributor=self.contributor,
+            output_schema=[
+                {"name": "output_file", "type": "basic:file:"},
+                {"name": "output_dir", "type": "basic:dir:"},
+            ],
+        )
+        data = Data.objects.create(
+            name="Test data", contributor=self.contributor, process=proc
+        )
+        data.output = {
+            "output_file": {"file": "output.txt", "refs": ["refs/", "output.txt"]},
+            "output_dir": {"dir": "refs"},
+        }
+        data_location = create_data_location()
+        data_location.data.add(data)
+        storage_location = data_location.default_storage_location
+        paths = ReferencedPath.objects.bulk_create(
+            [
+                ReferencedPath(path="output.txt", size=7),
+                ReferencedPath(path="refs/", size=0),
+                ReferencedPath(path="refs/first.txt", size=10),
+                ReferencedPath(path="refs/nested/", size=0),
+                ReferencedPath(path="refs/nested/second.txt", size=20),
+            ]
+        )
+        storage_location.files.add(*paths)
+
+        # The sizes are taken from the referenced paths, the files do not exist.
+        hydrate_size(data)
+        self.assertEqual(data.output["output_file"]["size"], 7)
+        self.assertEqual(data.output["output_file"]["total_size"], 37)
+        self.assertEqual(data.output["output_dir"]["size"], 30)
+        self.assertEqual(data.output["output_dir"]["total_size"], 30)
+        self.assertEqual(data.size, 67)
+
+        # Unknown sizes are computed from the file system.
+        ReferencedPath.objects.filter(path="refs/first.txt").update(size=-1)
+        with self.assertRaises(ValidationError):
+            hydrate_size(data)
+        dir_path = data.location.get_path(filename="refs/nested")
+        os.makedirs(dir_path)
+        with open(os.path.join(dir_path, "second.txt"), "w") as handle:
+            handle.write("foo bar")
+        with open(data.location.get_path(filename="refs/first.txt"), "w") as handle:
+            handle.write("foo")
+        hydrate_size(data)
+        self.assertEqual(data.output["output_dir"]["size"], 10)
+        self.assertEqual(data.output["output_file"]["total_size"], 17)
+
     def test_dependencies_single(self):
         process = Process.objects.create(
             slug="test-dependencies",
@@ -309,6 +408,43 @@ class DataModelTest(TestCase):
             {d.kind for d in third.parents_dependency.all()}, {DataDependency.KIND_IO}
         )
 
+    def test_dependencies_bulk(self):
+        process = Process.objects.create(
+            slug="test-dependencies-bulk",
+            type="data:test:dependencies:bulk:",
+            contributor=self.contributor,
+            input_schema=[
+                {
+                    "name": "src",
+                    "type": "list:data:test:dependencies:bulk:",
+                    "required": False,
+                }
+            ],
+        )
+        parents = [
+            Data.objects.create(contributor=self.contributor, process=process)
+            for _ in range(10)
+        ]
+        child = Data.objects.create(contributor=self.contributor, process=process)
+        DataDependency.objects.create(
+            parent=parents[0], child=child, kind=DataDependency.KIND_SUBPROCESS
+        )
+
+        def save_dependencies(parent_ids):
+            child.save_dependencies({"src": parent_ids}, process.input_schema)
+
+        # The number of queries does not depend on the number of references.
+        with self.assertNumQueries(4):
+            save_dependencies([parent.id for parent in parents[:2]])
+        with self.assertNumQueries(4):
+            # Duplicated and missing references are ignored.
+            save_dependencies([parent.id for parent in parents * 2] + [10**6])
+
+        self.assertCountEqual(
+            child.parents_dependency.values_list("parent_id", "kind"),
+            [(parent.id, DataDependency.KIND_IO) for parent in parents],
+        )
+
 
 class EntityModelTest(TestCase):
     def setUp(self):
@@ -1147,6 +1283,42 @@ class DuplicateTestCase(TransactionTestCase):
         # Assert permissions.
         self.assertEqual(len(duplicate.get_permissions(self.contributor)), 4)
 
+    def test_collection_duplicate_queries(self):
+        process = Process.objects.create(contributor=self.user)
+
+        def duplicate_queries(size):
+            """Return the number of queries needed to duplicate a collection."""
+            collection = Collection.objects.create(
+                name="Collection", contributor=self.user
+            )
+            collection.set_permission(Permission.OWNER, self.contributor)
+            for _ in range(size):
+                entity = Entity.objects.create(
+                    name="Entity", contributor=self.user, collection=collection
+                )
+                Data.objects.create(
+                    contributor=self.user,
+                    process=process,
+                    status=Data.STATUS_DONE,
+                    entity=entity,
+                    collection=collection,
+                )
+
+            collections = Collection.objects.filter(pk=collection.pk)
+            # Postpone the on commit signals so only duplication is measured.
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as captured_queries:
+                    bulk_duplicate_collection(collections, self.contributor)
+            return len(captured_queries)
+
+        # Warm up the caches (content types etc.).
+        duplicate_queries(1)
+        # The number of queries does not depend on the number of objects.
+        self.assertEqual(duplicate_queries(2), duplicate_queries(5))
+        self.assertEqual(Collection.objects.count(), 6)
+        self.assertEqual(Entity.objects.count(), 16)
+        self.assertEqual(Data.objects.count(), 16)
+
 
 class ProcessModelTest(TestCase):
     def test_process_isactive(self):
@@ -1,5 +1,6 @@
 """Test Redis cache in listener."""
 
+import asyncio
 import time
 
 from resolwe.flow.managers.listener.redis_cache import (
@@ -194,3 +195,37 @@ class RedisCache(TestCase):
         elapsed = time.time() - start
         self.assertEqual(result, {None})
         self.assertTrue(1 < elapsed < 1.1)
+
+    def test_async_lock(self):
+        """Test asynchronous locking, compatible with the synchronous one."""
+
+        async def lock():
+            identifier = (self.data1.id, "uuid_for_test")
+            result = await cache_manager.alock(Data, [identifier])
+            self.assertEqual(result, [(True, RedisLockStatus.PROCESSING)])
+            result = await cache_manager.alock(Data, [identifier])
+            self.assertEqual(result, [(False, RedisLockStatus.PROCESSING)])
+            # The lock is visible to the synchronous cache.
+            self.assertEqual(
+                cache_manager.lock(Data, [identifier]),
+                [(False, RedisLockStatus.PROCESSING)],
+            )
+
+            self.assertTrue(
+                await cache_manager.aextend_lock(Data, identifier, valid_for=10)
+            )
+            ttl = redis_cache._redis.ttl(redis_cache._lock_key(Data, identifier))
+            self._assertBetween(ttl, 9, 10)
+
+            await cache_manager.aunlock(Data, [identifier], RedisLockStatus.ERROR)
+            self.assertFalse(await cache_manager.aextend_lock(Data, identifier))
+            result = await cache_manager.alock(Data, [identifier])
+            self.assertEqual(result, [(False, RedisLockStatus.ERROR)])
+
+            # Cached values are shared with the synchronous cache.
+            self.assertIsNone(await cache_manager.aget(Data, (self.data1.id,)))
+            cache_manager.cache(self.data1)
+            result = await cache_manager.aget(Data, (self.data1.id,))
+            self.assertEqual(result["id"], self.data1.id)
+
+        asyncio.run(lock())
@@ -0,0 +1,78 @@
+# pylint: disable=missing-docstring
+import tempfile
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from django.test import override_settings
+
+from resolwe.flow.managers.workload_connectors import slurm
+from resolwe.storage import settings as storage_settings
+from resolwe.test import TestCase
+
+
+class SlurmConnectorTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        runtime_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(runtime_dir.cleanup)
+        self.runtime_dir = Path(runtime_dir.name)
+        volumes = {"runtime": {"config": {"path": runtime_dir.name}}}
+        patcher = patch.dict(storage_settings.FLOW_VOLUMES, volumes)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.submitted = []
+        self.all_submitted = threading.Event()
+        patcher = patch.object(slurm.Connector, "_sbatch", self.sbatch)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def sbatch(self, script_path):
+        self.submitted.append(Path(script_path).read_text())
+        if len(self.submitted) == 3:
+            self.all_submitted.set()
+
+    def data(self, data_id, cores):
+        data = MagicMock(id=data_id, pk=data_id)
+        data.process.slug = "alignment"
+        data.get_resource_limits.return_value = {"cores": cores, "memory": 1024}
+        return data
+
+    def test_submit(self):
+        slurm.Connector().submit(self.data(1, 2), ["executor", "1"])
+        self.assertEqual(len(self.submitted), 1)
+        self.assertIn("#SBATCH --cpus-per-task=2\n", self.submitted[0])
+        self.assertNotIn("--array", self.submitted[0])
+        self.assertTrue(self.submitted[0].endswith("executor 1\n"))
+
+    @override_settings(
+        FLOW_SLURM_BATCH_WINDOW=0.1, FLOW_SLURM_PARTITION_DEFAULT="compute"
+    )
+    @patch.object(slurm, "BATCH_SIZE", 2)
+    def test_submit_batched(self):
+        connector = slurm.Connector()
+        connector.submit(self.data(1, 2), ["executor", "1"])
+        connector.submit(self.data(2, 4), ["executor", "2"])
+        connector.submit(self.data(3, 2), ["executor", "3 4"])
+        connector.submit(self.data(4, 2), ["executor", "4"])
+        self.assertTrue(self.all_submitted.wait(5))
+
+        def script(command):
+            return next(script for script in self.submitted if command in script)
+
+        # The full batch.
+        full = script("exec executor 1 ;;")
+        self.assertIn("#SBATCH --partition=compute\n", full)
+        self.assertIn("#SBATCH --array=0-1\n", full)
+        self.assertIn("    1) exec executor '3 4' ;;\n", full)
+
+        # The jobs with different limits are in a separate array.
+        different_limits = script("exec executor 2 ;;")
+        self.assertIn("#SBATCH --cpus-per-task=4\n", different_limits)
+        self.assertIn("#SBATCH --array=0-0\n", different_limits)
+
+        # The remaining job is submitted when the window expires.
+        remaining = script("exec executor 4 ;;")
+        self.assertIn("    0) exec executor 4 ;;\n", remaining)
+        self.assertEqual(connector._batches, {})
@@ -0,0 +1,165 @@
+# pylint: disable=missing-docstring
+import asyncio
+import logging
+import socket
+import threading
+import unittest
+
+from resolwe.flow.executors import socket_utils
+from resolwe.flow.executors.socket_utils import (
+    BaseProtocol,
+    CommandScheduler,
+    Message,
+    SocketCommunicator,
+    read_bytes,
+    receive_data,
+    send_data,
+)
+from resolwe.test import TestCase
+
+logger = logging.getLogger(__name__)
+
+
+class SocketFramingTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sender, self.receiver = socket.socketpair()
+        self.addCleanup(self.sender.close)
+        self.addCleanup(self.receiver.close)
+
+    def test_json_framing(self):
+        data = {"type": "COMMAND", "data": {"1": [1, "a", None]}}
+        send_data(self.sender, data)
+        self.assertEqual(receive_data(self.receiver), data)
+
+    @unittest.skipIf(socket_utils.msgpack is None, "msgpack is not installed")
+    def test_binary_framing(self):
+        # Non-string keys are converted to strings as in JSON.
+        send_data(self.sender, {"data": {1: ["a"] * 10}}, binary=True)
+        self.assertEqual(receive_data(self.receiver), {"data": {"1": ["a"] * 10}})
+
+        # Large messages are received in multiple chunks.
+        data = {"data": ["x" * 100] * 100000}
+        sending = threading.Thread(
+            target=send_data, args=(self.sender, data), kwargs={"binary": True}
+        )
+        sending.start()
+        self.assertEqual(receive_data(self.receiver), data)
+        sending.join()
+
+    def test_read_bytes_closed_socket(self):
+        self.sender.sendall(b"abc")
+        self.sender.close()
+        self.assertEqual(read_bytes(self.receiver, 8), b"abc")
+
+
+class PingProtocol(BaseProtocol):
+    async def handle_ping(self, message, identity):
+        return message.respond_ok(message.message_data)
+
+
+@unittest.skipIf(socket_utils.msgpack is None, "msgpack is not installed")
+class FramingNegotiationTest(TestCase):
+    async def _communicate(self, binary_framing: bool):
+        first, second = socket.socketpair()
+        reader, writer = await asyncio.open_connection(sock=first)
+        peer_reader, peer_writer = await asyncio.open_connection(sock=second)
+        sender = SocketCommunicator(reader, writer, "sender", logger)
+        receiver = SocketCommunicator(peer_reader, peer_writer, "receiver", logger)
+        protocol = PingProtocol(receiver, logger)
+        communicate = asyncio.ensure_future(protocol.communicate())
+        original_framing = socket_utils.BINARY_FRAMING
+        try:
+            socket_utils.BINARY_FRAMING = binary_framing
+            async with sender:
+                for value in range(3):
+                    response = await sender.send_command(
+                        Message.command("ping", [value])
+                    )
+                    self.assertEqual(response.message_data, [value])
+        finally:
+            socket_utils.BINARY_FRAMING = original_framing
+            protocol.stop_communicate()
+            await communicate
+            writer.close()
+            peer_writer.close()
+        return sender, receiver
+
+    def test_negotiated(self):
+        sender, receiver = asyncio.run(self._communicate(True))
+        self.assertEqual(sender._binary_peers, {b""})
+        self.assertEqual(receiver._binary_peers, {b""})
+
+    def test_disabled(self):
+        sender, receiver = asyncio.run(self._communicate(False))
+        self.assertEqual(sender._binary_peers, set())
+        self.assertEqual(receiver._binary_peers, set())
+
+
+class CommandSchedulerTest(TestCase):
+    async def _schedule(self, scheduler, commands):
+        admitted = []
+
+        async def process(peer_identity, command_name):
+            await scheduler.acquire(peer_identity, command_name)
+            admitted.append((peer_identity, command_name))
+
+        # Take the only slot, so the commands are queued.
+        await scheduler.acquire(b"peer", "finish")
+        tasks = [asyncio.ensure_future(process(*command)) for command in commands]
+        await asyncio.sleep(0)
+        depths = scheduler.queue_depths()
+        for _ in commands:
+            scheduler.release()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return depths, admitted
+
+    def test_fair_order(self):
+        scheduler = CommandScheduler(
+            1, weights={"critical": 2, "default": 1, "bulk": 1}
+        )
+        commands = [(b"chatty", "process_log")] * 3 + [
+            (b"quiet", "progress"),
+            (b"first", "finish"),
+            (b"second", "bootstrap"),
+        ]
+        depths, admitted = asyncio.run(self._schedule(scheduler, commands))
+        self.assertEqual(depths, {"critical": 2, "default": 0, "bulk": 4})
+        self.assertEqual(
+            admitted,
+            [
+                (b"first", "finish"),
+                (b"chatty", "process_log"),
+                (b"second", "bootstrap"),
+                (b"quiet", "progress"),
+                (b"chatty", "process_log"),
+                (b"chatty", "process_log"),
+            ],
+        )
+        self.assertEqual(scheduler.queue_depths()["bulk"], 0)
+
+    def test_cancel(self):
+        async def cancel():
+            scheduler = CommandScheduler(1)
+            await scheduler.acquire(b"peer", "finish")
+            waiting = asyncio.ensure_future(scheduler.acquire(b"peer", "log"))
+            await asyncio.sleep(0)
+            self.assertEqual(scheduler.queue_depths()["bulk"], 1)
+            waiting.cancel()
+            await asyncio.sleep(0)
+            self.assertEqual(scheduler.queue_depths()["bulk"], 0)
+            scheduler.release()
+            await asyncio.wait_for(scheduler.acquire(b"peer", "log"), 1)
+
+        asyncio.run(cancel())
+
+    def test_command_classes(self):
+        scheduler = CommandScheduler(1)
+        self.assertEqual(scheduler.command_class("update_status"), "critical")
+        self.assertEqual(scheduler.command_class("process_report"), "bulk")
+        self.assertEqual(scheduler.command_class("update_output"), "default")
+
+    def test_invalid_weights(self):
+        with self.assertRaises(ValueError):
+            CommandScheduler(1, weights={"critical": 1, "bulk": 0})
@@ -1,11 +1,17 @@
 # pylint: disable=missing-docstring,too-many-lines
 from unittest.mock import MagicMock, patch
 
+import jsonschema
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 
 from resolwe.flow.models import Collection, Data, DescriptorSchema, Process
-from resolwe.flow.models.utils import validate_data_object, validate_schema
+from resolwe.flow.models.utils import (
+    SchemaRegistry,
+    validate_data_object,
+    validate_schema,
+    validation_schema,
+)
 from resolwe.test import TestCase
 from resolwe.test.utils import create_data_location
 
@@ -221,6 +227,14 @@ class ValidationTest(TestCase):
 
 
 class ValidationUnitTest(TestCase):
+    def patch_data(self, data_types):
+        """Patch the `Data` model to return the given data types."""
+        data_mock = patch("resolwe.flow.models.data.Data").start()
+        self.addCleanup(patch.stopall)
+        filter_mock = data_mock.objects.filter.return_value
+        filter_mock.values_list.return_value = list(data_types.items())
+        return data_mock
+
     def test_required(self):
         schema = [
             {"name": "value", "type": "basic:integer:", "required": True},
@@ -655,78 +669,30 @@ class ValidationUnitTest(TestCase):
         schema = [{"name": "data_list", "type": "data:test:upload:"}]
         instance = {"data_list": 1}
 
-        with patch("resolwe.flow.models.data.Data") as data_mock:
-            value_mock = MagicMock(
-                **{
-                    "exists.return_value": True,
-                    "first.return_value": {"process__type": "data:test:upload:"},
-                }
-            )
-            filter_mock = MagicMock(**{"values.return_value": value_mock})
-            data_mock.objects.filter.return_value = filter_mock
-
-            validate_schema(instance, schema)
-
-            self.assertEqual(value_mock.exists.call_count, 1)
-            self.assertEqual(value_mock.first.call_count, 1)
+        data_mock = self.patch_data({1: "data:test:upload:"})
+        validate_schema(instance, schema)
+        data_mock.objects.filter.assert_called_once_with(pk__in={1})
+        patch.stopall()
 
         # subtype is OK
-        with patch("resolwe.flow.models.data.Data") as data_mock:
-            value_mock = MagicMock(
-                **{
-                    "exists.return_value": True,
-                    "first.return_value": {
-                        "process__type": "data:test:upload:subtype:"
-                    },
-                }
-            )
-            filter_mock = MagicMock(**{"values.return_value": value_mock})
-            data_mock.objects.filter.return_value = filter_mock
-
-            validate_schema(instance, schema)
-
-            self.assertEqual(value_mock.exists.call_count, 1)
-            self.assertEqual(value_mock.first.call_count, 1)
+        self.patch_data({1: "data:test:upload:subtype:"})
+        validate_schema(instance, schema)
+        patch.stopall()
 
         # missing `Data` object
-        with patch("resolwe.flow.models.data.Data") as data_mock:
-            value_mock = MagicMock(
-                **{
-                    "exists.return_value": False,
-                    "first.return_value": {"process__type": "data:test:upload:"},
-                }
-            )
-            filter_mock = MagicMock(**{"values.return_value": value_mock})
-            data_mock.objects.filter.return_value = filter_mock
-
-            with self.assertRaisesRegex(
-                ValidationError, "`Data` object does not exist"
-            ):
-                validate_schema(instance, schema)
-
-            self.assertEqual(value_mock.exists.call_count, 1)
-            self.assertEqual(value_mock.first.call_count, 0)
-
-            validate_schema(instance, schema, skip_missing_data=True)
+        self.patch_data({})
+        with self.assertRaisesRegex(ValidationError, "`Data` object does not exist"):
+            validate_schema(instance, schema)
+        validate_schema(instance, schema, skip_missing_data=True)
+        patch.stopall()
 
         # `Data` object of wrong type
-        with patch("resolwe.flow.models.data.Data") as data_mock:
-            value_mock = MagicMock(
-                **{
-                    "exists.return_value": True,
-                    "first.return_value": {"process__type": "data:test:wrong:"},
-                }
-            )
-            filter_mock = MagicMock(**{"values.return_value": value_mock})
-            data_mock.objects.filter.return_value = filter_mock
-
-            with self.assertRaisesRegex(
-                ValidationError, "Data object of type .* is required"
-            ):
-                validate_schema(instance, schema)
-
-            self.assertEqual(value_mock.exists.call_count, 1)
-            self.assertEqual(value_mock.first.call_count, 1)
+        self.patch_data({1: "data:test:wrong:"})
+        with self.assertRaisesRegex(
+            ValidationError, "Data object of type .* is required"
+        ):
+            validate_schema(instance, schema)
+        patch.stopall()
 
         # data `id` shouldn't be string
         instance = {"data_list": "1"}
@@ -878,20 +844,18 @@ class ValidationUnitTest(TestCase):
             validate_schema(instance, schema)
 
         with patch("resolwe.flow.models.storage.Storage") as storage_mock:
-            filter_mock = MagicMock()
-            filter_mock.exists.return_value = True
-            storage_mock.objects.filter.return_value = filter_mock
+            filter_mock = storage_mock.objects.filter.return_value
+            filter_mock.values_list.return_value = [5]
 
             instance = {"big_dict": 5}
             validate_schema(instance, schema)
 
-            self.assertEqual(filter_mock.exists.call_count, 1)
+            storage_mock.objects.filter.assert_called_once_with(pk__in={5})
 
         # non existing `Storage`
         with patch("resolwe.flow.models.storage.Storage") as storage_mock:
-            filter_mock = MagicMock()
-            filter_mock.exists.return_value = False
-            storage_mock.objects.filter.return_value = filter_mock
+            filter_mock = storage_mock.objects.filter.return_value
+            filter_mock.values_list.return_value = []
 
             instance = {"big_dict": 5}
             with self.assertRaisesRegex(
@@ -899,7 +863,7 @@ class ValidationUnitTest(TestCase):
             ):
                 validate_schema(instance, schema)
 
-            self.assertEqual(filter_mock.exists.call_count, 1)
+            self.assertEqual(storage_mock.objects.filter.call_count, 1)
 
     def test_list_string_field(self):
         schema = [{"name": "list", "type": "list:basic:string:"}]
@@ -952,82 +916,37 @@ class ValidationUnitTest(TestCase):
         schema = [{"name": "data_list", "type": "list:data:test:upload:"}]
         instance = {"data_list": [1, 3, 4]}
 
-        with patch("resolwe.flow.models.data.Data") as data_mock:
-            value_mock = MagicMock(
-                **{
-                    "exists.return_value": True,
-                    "first.return_value": {"process__type": "data:test:upload:"},
-                }
-            )
-            filter_mock = MagicMock(**{"values.return_value": value_mock})
-            data_mock.objects.filter.return_value = filter_mock
-
-            validate_schema(instance, schema)
-
-            self.assertEqual(value_mock.exists.call_count, 3)
-            self.assertEqual(value_mock.first.call_count, 3)
+        # All references are resolved with a single query.
+        data_mock = self.patch_data(
+            {1: "data:test:upload:", 3: "data:test:upload:", 4: "data:test:upload:"}
+        )
+        validate_schema(instance, schema)
+        data_mock.objects.filter.assert_called_once_with(pk__in={1, 3, 4})
+        patch.stopall()
 
         # subtypes are OK
-        with patch("resolwe.flow.models.data.Data") as data_mock:
-            value_mock = MagicMock(
-                **{
-                    "exists.return_value": True,
-                    "first.side_effect": [
-                        {"process__type": "data:test:upload:subtype1:"},
-                        {"process__type": "data:test:upload:"},
-                        {"process__type": "data:test:upload:subtype2:"},
-                    ],
-                }
-            )
-            filter_mock = MagicMock(**{"values.return_value": value_mock})
-            data_mock.objects.filter.return_value = filter_mock
+        self.patch_data(
+            {
+                1: "data:test:upload:subtype1:",
+                3: "data:test:upload:",
+                4: "data:test:upload:subtype2:",
+            }
+        )
+        validate_schema(instance, schema)
+        patch.stopall()
 
+        # one object does not exist, one object of wrong type
+        self.patch_data({1: "data:test:upload:", 4: "data:test:wrong:"})
+        with self.assertRaises(ValidationError) as error:
             validate_schema(instance, schema)
-
-            self.assertEqual(value_mock.exists.call_count, 3)
-            self.assertEqual(value_mock.first.call_count, 3)
-
-        # one object does not exist
-        with patch("resolwe.flow.models.data.Data") as data_mock:
-            value_mock = MagicMock(
-                **{
-                    "exists.side_effect": [True, False, True],
-                    "first.return_value": {"process__type": "data:test:upload:"},
-                }
-            )
-            filter_mock = MagicMock(**{"values.return_value": value_mock})
-            data_mock.objects.filter.return_value = filter_mock
-
-            with self.assertRaisesRegex(
-                ValidationError, "`Data` object does not exist"
-            ):
-                validate_schema(instance, schema)
-
-            self.assertEqual(value_mock.exists.call_count, 2)
-            self.assertEqual(value_mock.first.call_count, 1)
-
-        # one object of wrong type
-        with patch("resolwe.flow.models.data.Data") as data_mock:
-            value_mock = MagicMock(
-                **{
-                    "exists.return_value": True,
-                    "first.side_effect": [
-                        {"process__type": "data:test:upload:"},
-                        {"process__type": "data:test:upload:"},
-                        {"process__type": "data:test:wrong:"},
-                    ],
-                }
-            )
-            filter_mock = MagicMock(**{"values.return_value": value_mock})
-            data_mock.objects.filter.return_value = filter_mock
-
-            with self.assertRaisesRegex(
-                ValidationError, "Data object of type .* is required"
-            ):
-                validate_schema(instance, schema)
-
-            self.assertEqual(value_mock.exists.call_count, 3)
-            self.assertEqual(value_mock.first.call_count, 3)
+        self.assertEqual(len(error.exception.messages), 2)
+        self.assertRegex(
+            error.exception.messages[0], r"`Data` object does not exist \(id:3\)"
+        )
+        self.assertRegex(
+            error.exception.messages[1], r"Data object of type .* is required"
+        )
+        patch.stopall()
 
     def test_list_file_field(self):
         schema = [
@@ -1162,3 +1081,49 @@ class ValidationUnitTest(TestCase):
         }
         with self.assertRaisesRegex(ValidationError, '"description" not given'):
             validate_schema(instance, schema)
+
+
+class SchemaRegistryTest(TestCase):
+    def test_compiled_once(self):
+        registry = SchemaRegistry()
+        with patch(
+            "resolwe.flow.models.utils.validation.validation_schema",
+            wraps=validation_schema,
+        ) as schema_mock:
+            registry.validate({"cores": 1}, "process_resources")
+            registry.validate({"memory": 1024}, "process_resources")
+            self.assertIs(
+                registry.validator("process_resources"),
+                registry.validator("process_resources"),
+            )
+        schema_mock.assert_called_once_with("process_resources")
+
+    def test_same_error_as_jsonschema(self):
+        instance = {"cores": "many"}
+        with self.assertRaises(jsonschema.exceptions.ValidationError) as expected:
+            jsonschema.validate(instance, validation_schema("process_resources"))
+        with self.assertRaises(jsonschema.exceptions.ValidationError) as error:
+            SchemaRegistry().validate(instance, "process_resources")
+        self.assertEqual(error.exception.message, expected.exception.message)
+        self.assertEqual(error.exception.path, expected.exception.path)
+
+        with self.assertRaises(ValueError):
+            SchemaRegistry().validate({}, "unknown")
+
+    def test_validate_type(self):
+        registry = SchemaRegistry()
+        registry.validate_type("basic:integer:", 3)
+        registry.validate_type("data:test:", 3)
+        registry.validate_type("list:basic:string:", ["a", "b"])
+        self.assertIsNotNone(registry._type_validators["basic:integer:"])
+
+        with self.assertRaisesRegex(
+            jsonschema.exceptions.ValidationError,
+            "is not valid under any of the given schemas",
+        ):
+            registry.validate_type("basic:integer:", "3")
+
+        # Unknown types are validated against the complete type schema.
+        with self.assertRaises(jsonschema.exceptions.ValidationError):
+            registry.validate_type("basic:unknown:", 3)
+        self.assertIsNone(registry._type_validators["basic:unknown:"])
@@ -0,0 +1,120 @@
+"""Observer cleanup."""
+
+import logging
+from datetime import timedelta
+from typing import Optional, TypedDict
+
+from django.utils import timezone
+
+from resolwe.observers.index import observer_index
+from resolwe.observers.models import Observer, Subscription
+
+logger = logging.getLogger(__name__)
+
+# Delete subscriptions older than DELETE_OLDER_THAN hours.
+DELETE_OLDER_THAN = 5 * 24
+
+# The maximal number of objects deleted in a single transaction.
+BATCH_SIZE = 1000
+
+
+class CleanupReport(TypedDict):
+    """The report of the observer cleanup run.
+
+    :attr deleted_subscriptions: the number of deleted subscriptions.
+    :attr deleted_observers: the number of deleted orphaned observers.
+    :attr subscriptions: the number of remaining subscriptions.
+    :attr observers: the number of remaining observers.
+    :attr subscription_observers: the number of remaining links between the
+        subscriptions and the observers.
+    """
+
+    deleted_subscriptions: int
+    deleted_observers: int
+    subscriptions: int
+    observers: int
+    subscription_observers: int
+
+
+class ObserverCleaner:
+    """Remove stale subscriptions and observers.
+
+    Subscriptions are normally removed when their websocket session is closed.
+    When the websocket worker crashes, the subscriptions of its sessions are
+    left behind. Such subscriptions are recognized by their age and removed
+    together with the observers without subscriptions.
+
+    Objects are deleted in batches of ``batch_size`` objects, each batch in its
+    own transaction, so the tables are not locked for a long time.
+    """
+
+    def __init__(
+        self, older_than: int = DELETE_OLDER_THAN, batch_size: int = BATCH_SIZE
+    ):
+        """Initialize.
+
+        :param older_than: delete subscriptions older than this many hours.
+        :param batch_size: the maximal number of objects deleted at once.
+        """
+        self.older_than = older_than
+        self.batch_size = batch_size
+
+    def _delete_subscriptions(self, max_batches: Optional[int]) -> int:
+        """Delete the stale subscriptions and their orphaned observers."""
+        stale = Subscription.objects.filter(
+            created__lt=timezone.now() - timedelta(hours=self.older_than)
+        ).order_by("pk")
+        deleted = batches = 0
+        while max_batches is None or batches < max_batches:
+            batch = list(stale.values_list("pk", flat=True)[: self.batch_size])
+            if not batch:
+                break
+            deleted += Subscription.delete_subscriptions(
+                Subscription.objects.filter(pk__in=batch)
+            )
+            batches += 1
+        return deleted
+
+    def _delete_observers(self, max_batches: Optional[int]) -> int:
+        """Delete the observers without subscriptions."""
+        orphaned = Observer.objects.filter(subscriptions__isnull=True).order_by("pk")
+        deleted = batches = 0
+        while max_batches is None or batches < max_batches:
+            batch = list(orphaned.values_list("pk", flat=True)[: self.batch_size])
+            if not batch:
+                break
+            deleted += (
+                Observer.objects.filter(pk__in=batch, subscriptions__isnull=True)
+                .delete()[1]
+                .get(Observer._meta.label, 0)
+            )
+            batches += 1
+        if deleted:
+            observer_index.invalidate()
+        return deleted
+
+    def process(self, max_batches: Optional[int] = None) -> CleanupReport:
+        """Run the cleanup.
+
+        :param max_batches: the maximal number of batches of each type of objects
+            deleted in this run. When not given, all stale objects are deleted.
+
+        :return: the report with the number of deleted and remaining objects.
+        """
+        report: CleanupReport = {
+            "deleted_subscriptions": self._delete_subscriptions(max_batches),
+            "deleted_observers": self._delete_observers(max_batches),
+            "subscriptions": Subscription.objects.count(),
+            "observers": Observer.objects.count(),
+            "subscription_observers": Subscription.observers.through.objects.count(),
+        }
+        logger.info(
+            "Deleted %d subscriptions and %d observers, remaining: %d "
+            "subscriptions, %d observers and %d subscription observers.",
+            report["deleted_subscriptions"],
+            report["deleted_observers"],
+            report["subscriptions"],
+            report["observers"],
+            report["subscription_observers"],
+        )
+        return report
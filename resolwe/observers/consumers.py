@@ -16,6 +16,7 @@ from django.db import transaction
 from django.utils import timezone
 
 from resolwe.auditlog.logger import logger as audit_logger
+from resolwe.flow.models.utils.delete import delete_tree
 from resolwe.flow.models.utils.duplicate import (
     bulk_duplicate_collection,
     bulk_duplicate_data,
@@ -28,6 +29,9 @@ from .protocol import GROUP_SESSIONS, ChangeType, ChannelsMessage, WebsocketMess
 # The channel used to listen for BackgrountTask events
 BACKGROUND_TASK_CHANNEL = "observers.background_task"
 
+# The maximal number of objects deleted at once by the background delete task.
+DELETE_CHUNK_SIZE = getattr(settings, "FLOW_BACKGROUND_DELETE_CHUNK_SIZE", 500)
+
 logger = logging.getLogger(__name__)
 
 
@@ -109,8 +113,9 @@ class ClientConsumer(JsonWebsocketConsumer):
 
     def disconnect(self, code: int):
         """Handle closing the WebSocket connection."""
-        for subscription in Subscription.objects.filter(session_id=self.session_id):
-            subscription.delete()
+        Subscription.delete_subscriptions(
+            Subscription.objects.filter(session_id=self.session_id)
+        )
 
     def observers_item_update(self, msg: ChannelsMessage):
         """Handle an item update signal."""
@@ -158,13 +163,18 @@ class BackgroundTaskConsumer(AsyncConsumer):
 
     @database_sync_to_async_new_thread
     def wrap_task(self, function: Callable, task_id: int):
-        """Start the function and update background task status."""
+        """Start the function and update background task status.
+
+        Every status change is published to the channel group of the task, see
+        :meth:`BackgroundTask.publish`.
+        """
         task: Optional[BackgroundTask] = None
         try:
             task = BackgroundTask.objects.get(pk=task_id)
             task.started = timezone.now()
             task.status = BackgroundTask.STATUS_PROCESSING
             task.save(update_fields=["status", "started"])
+            task.publish()
             task.output = function() or "Task completed."
             task.status = BackgroundTask.STATUS_DONE
         # Task may not exist here if the consumer was cancelled duging the creation
@@ -185,6 +195,7 @@ class BackgroundTaskConsumer(AsyncConsumer):
             if task:
                 task.finished = timezone.now()
                 task.save(update_fields=["status", "finished", "output"])
+                task.publish()
                 return task
 
     async def duplicate_data(self, message: dict):
@@ -296,11 +307,21 @@ class BackgroundTaskConsumer(AsyncConsumer):
         """
 
         def delete():
-            to_delete = Model.objects.filter(pk__in=message["object_ids"])
-
-            # Use iterator and delete one object at a time to trigger the signals.
-            for obj in to_delete.iterator():
-                obj.delete()
+            task = BackgroundTask.objects.get(pk=message["task_id"])
+
+            def report_progress(deleted: int, total: int):
+                """Store the deletion progress to the task output."""
+                task.output = {"deleted": deleted, "total": total}
+                task.save(update_fields=["output"])
+                task.publish()
+
+            # Delete the objects and their contents in chunks to keep the memory
+            # usage bounded.
+            delete_tree(
+                Model.objects.filter(pk__in=message["object_ids"]),
+                chunk_size=DELETE_CHUNK_SIZE,
+                progress=report_progress,
+            )
 
         @database_sync_to_async_new_thread
         def get_model():
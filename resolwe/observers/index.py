@@ -0,0 +1,148 @@
+"""Index of the observed objects.
+
+Most of the saved objects are not observed by anyone. To avoid querying the
+observers and subscriptions on every save, every process keeps an in-memory
+index of the observed objects. The index is reloaded from the database when
+the observers change: the version of the index is stored in Redis and replaced
+by a random token every time an observer is added or removed.
+"""
+
+import logging
+import uuid
+from collections import defaultdict
+from typing import Iterable, Iterator, Optional
+
+import redis
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models, transaction
+
+logger = logging.getLogger(__name__)
+
+redis_server = redis.from_url(
+    getattr(settings, "REDIS_CONNECTION_STRING", "redis://localhost")
+)
+
+# The Redis key holding the version of the index.
+VERSION_KEY = "resolwe.observers.index.version"
+
+
+def container_references(
+    instance: models.Model,
+) -> Iterator[tuple[type[models.Model], int]]:
+    """Get the models and ids of the containers of the given instance.
+
+    The same as ``PermissionObject.containers`` but the containers are not
+    retrieved from the database.
+    """
+    model = instance._meta.model
+    # The container properties are set on the instances, not on the model.
+    for container_property in getattr(instance, "_container_properties", ()):
+        try:
+            field = model._meta.get_field(container_property)
+        except FieldDoesNotExist:
+            continue
+        if (container_id := getattr(instance, field.attname)) is not None:
+            yield field.related_model, container_id
+
+
+class ObserverIndex:
+    """The in-memory index of the observed objects.
+
+    The index maps the content type ids to the sets of the observed object ids.
+    The change types are ignored, so the index may report an object as observed
+    when nobody is interested in the given change. When the version of the
+    index can not be read from Redis, all objects are reported as observed.
+    """
+
+    def __init__(self):
+        """Initialize."""
+        self._version: Optional[bytes] = None
+        self._observed: dict[int, set[int]] = {}
+
+    def invalidate(self):
+        """Invalidate the index in all processes.
+
+        The index is invalidated when the current transaction is committed, so
+        the observers are visible when the index is reloaded.
+        """
+
+        def set_version():
+            try:
+                redis_server.set(VERSION_KEY, uuid.uuid4().hex)
+            except redis.RedisError:
+                logger.exception("Unable to invalidate the observer index.")
+
+        transaction.on_commit(set_version)
+
+    def _refresh(self) -> bool:
+        """Reload the index when it has changed.
+
+        :return: ``False`` when the index could not be refreshed.
+        """
+        from .models import Observer
+
+        try:
+            version = redis_server.get(VERSION_KEY)
+        except redis.RedisError:
+            logger.debug("Unable to read the observer index version.")
+            return False
+
+        if version is None:
+            # Set the version, so the processes can detect the changes.
+            version = uuid.uuid4().hex.encode()
+            try:
+                if not redis_server.set(VERSION_KEY, version, nx=True):
+                    version = redis_server.get(VERSION_KEY)
+            except redis.RedisError:
+                return False
+
+        if version != self._version:
+            observed: dict[int, set[int]] = defaultdict(set)
+            for content_type_id, object_id in (
+                Observer.objects.values_list("content_type_id", "object_id")
+                .distinct()
+                .iterator()
+            ):
+                observed[content_type_id].add(object_id)
+            self._observed, self._version = dict(observed), version
+        return True
+
+    def _is_observed(
+        self, model: type[models.Model], object_ids: Iterable[int]
+    ) -> bool:
+        """Return if any of the given objects is observed in the loaded index."""
+        observed = self._observed.get(ContentType.objects.get_for_model(model).pk)
+        if not observed:
+            return False
+        from .models import Observer
+
+        return Observer.ALL_IDS in observed or not observed.isdisjoint(object_ids)
+
+    def is_observed(self, model: type[models.Model], object_ids: Iterable[int]) -> bool:
+        """Return if any of the given objects of the given model is observed."""
+        if not self._refresh():
+            return True
+        return self._is_observed(model, object_ids)
+
+    def is_instance_observed(
+        self, instance: models.Model, observe_containers: bool = True
+    ) -> bool:
+        """Return if the given instance or any of its containers is observed.
+
+        The version of the index is read from Redis only once for the instance
+        and its containers.
+        """
+        if not self._refresh():
+            return True
+        if self._is_observed(instance._meta.model, [instance.pk]):
+            return True
+        return observe_containers and any(
+            self._is_observed(model, [container_id])
+            for model, container_id in container_references(instance)
+        )
+
+
+#: The index of the observed objects in the current process.
+observer_index = ObserverIndex()
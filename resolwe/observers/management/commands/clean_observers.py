@@ -8,17 +8,19 @@ Command to run:
 
     ./manage.py clean_observers
 
+To clean the observer data incrementally every ten minutes, deleting at most
+ten batches of objects in every run, use:
+
+    ./manage.py clean_observers --interval 600 --max-batches 10
+
 """
 
 import logging
+import time
 
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-
-from resolwe.observers.models import Observer, Subscription
 
-# Delete subscriptions older than DELETE_OLDER_THAN hours.
-DELETE_OLDER_THAN = 5 * 24
+from resolwe.observers.cleanup import BATCH_SIZE, DELETE_OLDER_THAN, ObserverCleaner
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +38,22 @@ class Command(BaseCommand):
             dest="older_than",
             help="Delete subscriptions older than older-than hours",
         )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Maximal number of objects deleted in a single transaction",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            help="Maximal number of batches of each object type deleted in a run",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            help="Repeat the cleanup every interval seconds",
+        )
 
     def handle(self, *args, **options):
         """Delete old observer subscriptions."""
@@ -43,13 +61,9 @@ class Command(BaseCommand):
         logger.info(
             "Deleting observer subscriptions older than %d hours.", delete_older_than
         )
-        # Delete subscriptions older than delete_older_than hours.
-        deleted_subscriptions = Subscription.objects.filter(
-            created__lt=timezone.now() - timezone.timedelta(hours=delete_older_than)
-        ).delete()[0]
-        logger.info("Deleted %d subscriptions.", deleted_subscriptions)
-        # Delete observers without subscriptions.
-        deleted_observers = Observer.objects.filter(
-            subscriptions__isnull=True
-        ).delete()[0]
-        logger.info("Deleted %d observers.", deleted_observers)
+        cleaner = ObserverCleaner(delete_older_than, options["batch_size"])
+        while True:
+            cleaner.process(options["max_batches"])
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
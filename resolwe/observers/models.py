@@ -1,21 +1,34 @@
 """The model Observer model."""
 
+import asyncio
 import uuid
+from collections import defaultdict
 from time import sleep, time
-from typing import Any, Iterable, List, Optional, Set, Tuple
+from typing import Any, Iterable, List, Optional, Sequence, Set, Tuple
 
-from asgiref.sync import async_to_sync
+from asgiref.sync import async_to_sync, sync_to_async
 from channels.layers import get_channel_layer
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from django.db import models, transaction
 from django.db.models import Count, Q
 from django.db.models.query import QuerySet
+from django.utils.dateparse import parse_datetime
 
 from resolwe.flow.models.base import BaseManagerWithoutVersion
 from resolwe.permissions.models import Permission, PermissionObject
 
-from .protocol import GROUP_SESSIONS, TYPE_ITEM_UPDATE, ChangeType, ChannelsMessage
+from .index import container_references, observer_index
+from .protocol import (
+    GROUP_BACKGROUND_TASK,
+    GROUP_SESSIONS,
+    TYPE_BACKGROUND_TASK_UPDATE,
+    TYPE_ITEM_UPDATE,
+    BackgroundTaskMessage,
+    ChangeType,
+    ChannelsMessage,
+)
 
 # Type alias for observable object.
 Observable = PermissionObject
@@ -72,6 +85,60 @@ class BackgroundTask(Observable):
     #: duplicated objects, error details...
     output = models.JSONField(default=_default_output_value)
 
+    @property
+    def group_name(self) -> str:
+        """Get the name of the channel group the task state is published to."""
+        return GROUP_BACKGROUND_TASK.format(task_id=self.pk)
+
+    def publish(self):
+        """Publish the current state of the task to its channel group.
+
+        The message is sent when the current transaction is committed, so the
+        receivers never see the state that is not stored in the database.
+        """
+        message: BackgroundTaskMessage = {
+            "type": TYPE_BACKGROUND_TASK_UPDATE,
+            "task_id": self.pk,
+            "status": self.status,
+            "output": self.output,
+            "started": self.started.isoformat() if self.started else None,
+            "finished": self.finished.isoformat() if self.finished else None,
+        }
+
+        def send(channel_layer=get_channel_layer(), group=self.group_name):
+            async_to_sync(channel_layer.group_send)(group, message)
+
+        transaction.on_commit(send)
+
+    def _set_state(self, message: BackgroundTaskMessage):
+        """Set the state of the task from the published message."""
+        self.status = message["status"]
+        self.output = message["output"]
+        self.started = message["started"] and parse_datetime(message["started"])
+        self.finished = message["finished"] and parse_datetime(message["finished"])
+
+    async def _wait_published(self, timeout: float, final_statuses: list[str]):
+        """Wait for the task to transition into final_statuses.
+
+        Subscribe to the channel group of the task and wait for the published
+        state changes. The database is only queried once, after the subscription,
+        in case the task reached the final status before.
+        """
+        channel_layer = get_channel_layer()
+        channel = await channel_layer.new_channel()
+        await channel_layer.group_add(self.group_name, channel)
+        try:
+            # Run in the thread of the caller, so the same database connection is
+            # used.
+            await sync_to_async(self.refresh_from_db)()
+            async with asyncio.timeout(timeout):
+                while self.status not in final_statuses:
+                    self._set_state(await channel_layer.receive(channel))
+        except TimeoutError:
+            pass
+        finally:
+            await channel_layer.group_discard(self.group_name, channel)
+
     def wait(
         self,
         timeout: float = 2,
@@ -80,14 +147,21 @@ class BackgroundTask(Observable):
     ):
         """Wait for up to timeout seconds for task to transition into final_statuses.
 
-        The method is meant to be used in tests as it creates lots of database queries.
+        The state changes published by the background task consumer are received
+        through the channel layer, so the database is not polled. When no
+        channel layer is configured, the database is polled every
+        ``polling_interval`` seconds instead.
 
         :raises RuntimeError: when desired status was not reached within timeout.
         """
-        started = time()
-        while self.status not in final_statuses and time() - started < timeout:
-            sleep(polling_interval)
-            self.refresh_from_db()
+        if self.status not in final_statuses:
+            if get_channel_layer() is not None:
+                async_to_sync(self._wait_published)(timeout, final_statuses)
+            else:
+                started = time()
+                while self.status not in final_statuses and time() - started < timeout:
+                    sleep(polling_interval)
+                    self.refresh_from_db()
 
         if self.status not in final_statuses:
             raise RuntimeError(
@@ -208,6 +282,76 @@ class Observer(models.Model):
                     source=(content_type.name, instance.pk),
                 )
 
+    @classmethod
+    def observe_bulk_changes(
+        cls, instances: Sequence[Observable], change_type: ChangeType
+    ):
+        """Handle notifications about a change of many instances of the same model.
+
+        The result is the same as calling ``observe_instance_changes`` and
+        ``observe_instance_container`` for every instance, but the interested
+        subscribers and their permissions are retrieved with a number of queries
+        that does not depend on the number of instances. Every session is
+        notified only once for every object and source.
+        """
+        if not instances:
+            return
+
+        model = instances[0]._meta.model
+        source_name = ContentType.objects.get_for_model(model).name
+        # Map the notified models to the pairs (object id, source).
+        notifications: dict[type[models.Model], set[tuple[int, tuple[str, int]]]]
+        notifications = defaultdict(set)
+        for instance in instances:
+            source = (source_name, instance.pk)
+            notifications[model].add((instance.pk, source))
+            for container_model, container_id in container_references(instance):
+                notifications[container_model].add((container_id, source))
+
+        through = Subscription.observers.through
+        for notified_model, pairs in notifications.items():
+            object_ids = {object_id for object_id, _ in pairs}
+            observers = cls.objects.filter(
+                Q(object_id__in=object_ids) | Q(object_id=Observer.ALL_IDS),
+                content_type=ContentType.objects.get_for_model(notified_model),
+                change_type=change_type.value,
+            )
+            # Map the observed object ids to the pairs (session id, user id).
+            subscribers: dict[int, set[tuple[str, int]]] = defaultdict(set)
+            for session_id, user_id, observed_id in through.objects.filter(
+                observer__in=observers
+            ).values_list(
+                "subscription__session_id",
+                "subscription__user_id",
+                "observer__object_id",
+            ):
+                subscribers[observed_id].add((session_id, user_id))
+            if not subscribers:
+                continue
+
+            user_ids = {
+                user_id for entries in subscribers.values() for _, user_id in entries
+            }
+            visible = {
+                user.pk: set(
+                    notified_model.objects.filter(pk__in=object_ids)
+                    .filter_for_user(user, Permission.VIEW)
+                    .values_list("pk", flat=True)
+                )
+                for user in get_user_model().objects.filter(pk__in=user_ids)
+            }
+            for object_id, source in pairs:
+                session_ids = {
+                    session_id
+                    for session_id, user_id in subscribers.get(object_id, set())
+                    | subscribers.get(Observer.ALL_IDS, set())
+                    if object_id in visible.get(user_id, set())
+                }
+                for session_id in session_ids:
+                    Subscription.notify(
+                        session_id, notified_model(pk=object_id), change_type, source
+                    )
+
     @classmethod
     def observe_permission_changes(
         cls,
@@ -322,9 +466,35 @@ class Subscription(models.Model):
         Observer.objects.annotate(subs=Count("subscriptions")).filter(
             subscriptions=self.pk, subs=1
         ).delete()
+        observer_index.invalidate()
         # Now delete the subscription itself.
         super().delete()
 
+    @classmethod
+    @transaction.atomic
+    def delete_subscriptions(cls, subscriptions: "QuerySet[Subscription]") -> int:
+        """Delete the given subscriptions.
+
+        Delete all observers with no remaining subscriptions. The number of queries
+        does not depend on the number of subscriptions.
+
+        This method is marked atomic, so no new subsciptions are added to the observers
+        we are deleting in the meantime causing IntegrityError.
+
+        :return: the number of deleted subscriptions.
+        """
+        observer_ids = set(
+            cls.observers.through.objects.filter(
+                subscription__in=subscriptions
+            ).values_list("observer_id", flat=True)
+        )
+        deleted = subscriptions.delete()[1].get(cls._meta.label, 0)
+        Observer.objects.filter(
+            pk__in=observer_ids, subscriptions__isnull=True
+        ).delete()
+        observer_index.invalidate()
+        return deleted
+
     @classmethod
     def notify(
         cls,
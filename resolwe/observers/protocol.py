@@ -1,7 +1,9 @@
 """Constants used for Observer communication."""
 
+from contextlib import contextmanager
+from contextvars import ContextVar
 from enum import IntEnum
-from typing import Optional, TypedDict
+from typing import Any, Iterable, Iterator, Optional, TypedDict
 
 from django import dispatch
 
@@ -20,6 +22,12 @@ GROUP_SESSIONS = "observers.session.{session_id}"
 # Message type for observer item updates.
 TYPE_ITEM_UPDATE = "observers.item_update"
 
+# Group used to publish the state of individual background tasks.
+GROUP_BACKGROUND_TASK = "observers.background_task.{task_id}"
+
+# Message type for background task state updates.
+TYPE_BACKGROUND_TASK_UPDATE = "observers.background_task_update"
+
 # Signal to be sent before and after PermissionObject.set_permission is called
 # or before and after a PermissionObject's container is changed.
 pre_permission_changed = dispatch.Signal()
@@ -32,6 +40,36 @@ post_container_changed = dispatch.Signal()
 # Attribute to use on the observable instance to temporary suppress notifications
 suppress_notifications_attribute = "__observer_notification_suppressed"
 
+# Context variable holding the (model, primary key) pairs of instances whose
+# deletion notifications are temporary suppressed, for instance because they
+# are sent in bulk.
+_suppressed_deletions: ContextVar[frozenset[tuple[type, Any]]] = ContextVar(
+    "suppressed_deletions", default=frozenset()
+)
+
+
+@contextmanager
+def suppress_deletion_notifications(instances: Iterable[Any]) -> Iterator[None]:
+    """Suppress deletion notifications of the given instances.
+
+    The notifications are not sent by the model signal handlers and the caller
+    is responsible for sending them, see
+    :meth:`resolwe.observers.models.Observer.observe_bulk_changes`.
+    """
+    token = _suppressed_deletions.set(
+        _suppressed_deletions.get()
+        | {(instance._meta.model, instance.pk) for instance in instances}
+    )
+    try:
+        yield
+    finally:
+        _suppressed_deletions.reset(token)
+
+
+def deletion_notification_suppressed(instance: Any) -> bool:
+    """Return if the deletion notification of the instance is suppressed."""
+    return (instance._meta.model, instance.pk) in _suppressed_deletions.get()
+
 
 class ChannelsMessage(TypedDict):
     """The type for channels message to be sent."""
@@ -43,6 +81,21 @@ class ChannelsMessage(TypedDict):
     source: Optional[tuple[str, int]]
 
 
+class BackgroundTaskMessage(TypedDict):
+    """The message with the state of the background task.
+
+    :attr started: ISO formatted start time or None if task has not started.
+    :attr finished: ISO formatted finish time or None if task has not finished.
+    """
+
+    type: str
+    task_id: int
+    status: str
+    output: Any
+    started: Optional[str]
+    finished: Optional[str]
+
+
 class WebsocketMessage(TypedDict):
     """The type of websocket message to be sent.
 
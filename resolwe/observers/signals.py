@@ -10,9 +10,11 @@ from resolwe.flow.models import Collection, Data, Entity
 from resolwe.flow.signals import post_duplicate
 from resolwe.permissions.models import Permission
 
+from .index import observer_index
 from .models import Observable, Observer
 from .protocol import (
     ChangeType,
+    deletion_notification_suppressed,
     post_container_changed,
     post_permission_changed,
     pre_container_changed,
@@ -91,6 +93,9 @@ def handle_container_change(instance, **kwargs):
 @skip_in_migrations
 def handle_permission_change(instance, **kwargs):
     """Compare permissions for an object whose permissions changed."""
+    observe_containers = kwargs.get("observe_containers", True)
+    if not observer_index.is_instance_observed(instance, observe_containers):
+        return
     new = set(instance.users_with_permission(Permission.VIEW, with_superusers=True))
     # The "_old_viewers" property may not exist. For instance if data object is
     # created in the collection and collection permissions are assigned to it
@@ -98,7 +103,6 @@ def handle_permission_change(instance, **kwargs):
     old = set(getattr(instance, "_old_viewers", []))
     gains = new - old
     losses = old - new
-    observe_containers = kwargs.get("observe_containers", True)
     Observer.observe_permission_changes(instance, gains, losses, observe_containers)
 
 
@@ -114,8 +118,12 @@ def observe_model_modification(
     2. The object was changed: send UPDATE notifications to users with VIEW permission.
 
     Do not send notifications to the containers when object is moving between them.
+
+    Nothing is done when neither the object nor its containers are observed.
     """
-    if isinstance(instance, Observable):
+    if isinstance(instance, Observable) and observer_index.is_instance_observed(
+        instance
+    ):
         if created:
             handle_permission_change(instance)
         elif not getattr(instance, suppress_notifications_attribute, False):
@@ -127,11 +135,22 @@ def observe_model_modification(
 @skip_in_migrations
 def observe_model_deletion(sender: type, instance: Model, **kwargs):
     """Receive model deletions."""
-    if isinstance(instance, Observable):
+    if (
+        isinstance(instance, Observable)
+        and not deletion_notification_suppressed(instance)
+        and observer_index.is_instance_observed(instance)
+    ):
         Observer.observe_instance_changes(instance, ChangeType.DELETE)
         Observer.observe_instance_container(instance, ChangeType.DELETE)
 
 
+@dispatch.receiver(model_signals.post_save, sender=Observer)
+def observer_created(sender: type, instance: Observer, created: bool, **kwargs):
+    """Invalidate the index of the observed objects when an observer is created."""
+    if created:
+        observer_index.invalidate()
+
+
 @dispatch.receiver(post_duplicate)
 def post_duplicate_models(
     sender, instances: list[Duplicate], old_instances: list[Duplicate], **kwargs
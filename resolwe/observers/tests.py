@@ -2,15 +2,21 @@
 
 import asyncio
 import json
+import threading
 import uuid
+from datetime import timedelta
+from unittest.mock import patch
 
 from channels.db import database_sync_to_async
 from channels.routing import URLRouter
 from channels.testing import WebsocketCommunicator
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.db import connection
 from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import path
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIRequestFactory, force_authenticate
 
@@ -20,7 +26,9 @@ from resolwe.permissions.models import Permission
 from resolwe.permissions.utils import get_anonymous_user
 from resolwe.test import TransactionResolweAPITestCase
 
+from .cleanup import DELETE_OLDER_THAN, ObserverCleaner
 from .consumers import ClientConsumer
+from .index import observer_index, redis_server
 from .models import BackgroundTask, Observer, Subscription
 from .protocol import ChangeType
 from .views import BackgroundTaksViewSet, BackgroundTaskSerializer
@@ -1447,6 +1455,107 @@ class ObserverTestCase(TransactionTestCase):
         # Assert subscription didn't delete.
         await self.await_subscription_observer_count(3)
 
+    def test_observer_index(self):
+        def observer_queries(instance):
+            with CaptureQueriesContext(connection) as captured:
+                instance.save()
+            return [
+                query["sql"]
+                for query in captured.captured_queries
+                if "observers_" in query["sql"]
+            ]
+
+        collection = Collection.objects.create(contributor=self.user_alice)
+        data = Data.objects.create(
+            contributor=self.user_alice, process=self.process, collection=collection
+        )
+        # The version is read from Redis once for the object and its containers.
+        with patch.object(redis_server, "get", wraps=redis_server.get) as get_mock:
+            self.assertFalse(observer_index.is_instance_observed(data))
+            self.assertEqual(get_mock.call_count, 1)
+        self.assertEqual(observer_queries(data), [])
+
+        # Observe the container of the data object.
+        Subscription.objects.create(
+            user=self.user_alice, session_id="test_session"
+        ).subscribe(
+            content_type=ContentType.objects.get_for_model(Collection),
+            object_ids=[collection.pk],
+            change_types=[ChangeType.UPDATE],
+        )
+        self.assertTrue(observer_index.is_instance_observed(data))
+        self.assertFalse(
+            observer_index.is_instance_observed(data, observe_containers=False)
+        )
+        self.assertNotEqual(observer_queries(data), [])
+
+        # Observe all data objects.
+        Subscription.objects.create(
+            user=self.user_alice, session_id="test_session_2"
+        ).subscribe(
+            content_type=ContentType.objects.get_for_model(Data),
+            object_ids=[Observer.ALL_IDS],
+            change_types=[ChangeType.UPDATE],
+        )
+        self.assertTrue(observer_index.is_observed(Data, [data.pk + 1]))
+
+        Subscription.delete_subscriptions(Subscription.objects.all())
+        self.assertFalse(observer_index.is_instance_observed(data))
+        self.assertEqual(observer_queries(data), [])
+
+
+class ObserverCleanerTestCase(TransactionTestCase):
+    def test_process(self):
+        user = get_user_model().objects.create(username="alice")
+        content_type = ContentType.objects.get_for_model(Data)
+        for index in range(5):
+            Subscription.objects.create(
+                user=user, session_id=f"session_{index}"
+            ).subscribe(
+                content_type=content_type,
+                object_ids=[index, Observer.ALL_IDS],
+                change_types=[ChangeType.UPDATE],
+            )
+        # Observer without subscriptions.
+        Observer.objects.create(
+            content_type=content_type, object_id=42, change_type=ChangeType.CREATE
+        )
+        # The first three subscriptions are stale.
+        Subscription.objects.filter(session_id__in=["session_0", "session_1"]).update(
+            created=timezone.now() - timedelta(hours=DELETE_OLDER_THAN + 1)
+        )
+        Subscription.objects.filter(session_id="session_2").update(
+            created=timezone.now() - timedelta(hours=2)
+        )
+
+        cleaner = ObserverCleaner(older_than=1, batch_size=2)
+        report = cleaner.process(max_batches=1)
+        self.assertEqual(
+            report,
+            {
+                "deleted_subscriptions": 2,
+                "deleted_observers": 1,
+                "subscriptions": 3,
+                "observers": 4,
+                "subscription_observers": 6,
+            },
+        )
+        self.assertCountEqual(
+            Observer.objects.values_list("object_id", flat=True),
+            [Observer.ALL_IDS, 2, 3, 4],
+        )
+
+        report = cleaner.process()
+        self.assertEqual(report["deleted_subscriptions"], 1)
+        self.assertEqual(report["subscriptions"], 2)
+        self.assertEqual(report["observers"], 3)
+        self.assertEqual(report["subscription_observers"], 4)
+
+        # Disconnected sessions are removed immediately.
+        Subscription.delete_subscriptions(Subscription.objects.all())
+        self.assertFalse(Subscription.objects.exists())
+        self.assertFalse(Observer.objects.exists())
+
 
 class BackgroundTaskTestCase(TransactionResolweAPITestCase):
     def setUp(self):
@@ -1568,6 +1677,29 @@ class BackgroundTaskTestCase(TransactionResolweAPITestCase):
         self.assertEqual(result.status_code, status.HTTP_200_OK)
         self.assertCountEqual(result.data, expected)
 
+    def test_wait_published(self):
+        def finish_task():
+            task = BackgroundTask.objects.get(pk=self.task_running.pk)
+            task.status = BackgroundTask.STATUS_DONE
+            task.output = "Task completed."
+            task.finished = timezone.now()
+            task.save()
+            task.publish()
+            connection.close()
+
+        timer = threading.Timer(0.5, finish_task)
+        timer.start()
+        self.addCleanup(timer.join)
+        # Only the initial refresh after the subscription queries the database.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.task_running.result(timeout=5), "Task completed.")
+        self.assertEqual(self.task_running.status, BackgroundTask.STATUS_DONE)
+        self.assertIsNotNone(self.task_running.finished)
+
+        # Waiting times out when the final status is not published.
+        with self.assertRaises(RuntimeError):
+            self.task_preparing.wait(timeout=0.1)
+
 
 class ObserverAPITestCase(TransactionResolweAPITestCase):
     def setUp(self):
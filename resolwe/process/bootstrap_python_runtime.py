@@ -7,24 +7,95 @@ import sys
 import tempfile
 import types
 from base64 import b64decode
-from typing import Dict, Type
+from typing import Dict, Optional, Type
 
 from communicator import communicator
 
 # Id of the Data object we are processing.
 DATA_ID = int(os.getenv("DATA_ID", "-1"))
+# Optional directory (shared between processes on the node) where the runtime
+# is cached. It is set by the executor when FLOW_PYTHON_RUNTIME_CACHE_DIR
+# setting is configured.
+PYTHON_RUNTIME_CACHE_DIR = os.getenv("PYTHON_RUNTIME_CACHE_DIR")
+PYTHON_RUNTIME_DIGEST_FILENAME = "python_runtime.digest"
 logger = logging.getLogger(__name__)
 
 
+def _cached_runtime_filename(cache_dir: str, digest: str) -> str:
+    """Get the name of the cached runtime archive with the given digest."""
+    return os.path.join(cache_dir, "python_runtime_{}.zip".format(digest))
+
+
+def _read_cached_digest(cache_dir: Optional[str]) -> Optional[str]:
+    """Get the digest of the runtime in the cache.
+
+    When cache is not configured or the cached archive is missing None is
+    returned.
+    """
+    if cache_dir is None:
+        return None
+    try:
+        with open(os.path.join(cache_dir, PYTHON_RUNTIME_DIGEST_FILENAME)) as handle:
+            digest = handle.read().strip()
+    except OSError:
+        return None
+    if not os.path.isfile(_cached_runtime_filename(cache_dir, digest)):
+        return None
+    return digest
+
+
+def _write_atomic(filename: str, content: bytes):
+    """Write the content to the file atomically."""
+    temporary_filename = "{}.{}.tmp".format(filename, os.getpid())
+    with open(temporary_filename, "wb") as handle:
+        handle.write(content)
+    os.replace(temporary_filename, filename)
+
+
+def get_python_runtime(tmpdir: str) -> str:
+    """Get the Python process runtime and return the path to the archive.
+
+    When runtime cache directory is configured the digest of the cached
+    runtime is sent to the listener and the runtime is only transfered when
+    it has changed.
+    """
+    cached_digest = _read_cached_digest(PYTHON_RUNTIME_CACHE_DIR)
+    digest, python_runtime = communicator.get_python_runtime(cached_digest)
+    if python_runtime is None:
+        if PYTHON_RUNTIME_CACHE_DIR is not None and cached_digest == digest:
+            cached_filename = _cached_runtime_filename(PYTHON_RUNTIME_CACHE_DIR, digest)
+            if os.path.isfile(cached_filename):
+                return cached_filename
+        # The cached runtime is gone or outdated, request the entire runtime.
+        digest, python_runtime = communicator.get_python_runtime(None)
+
+    runtime = b64decode(python_runtime)
+    if PYTHON_RUNTIME_CACHE_DIR is not None:
+        try:
+            python_runtime_filename = _cached_runtime_filename(
+                PYTHON_RUNTIME_CACHE_DIR, digest
+            )
+            _write_atomic(python_runtime_filename, runtime)
+            _write_atomic(
+                os.path.join(PYTHON_RUNTIME_CACHE_DIR, PYTHON_RUNTIME_DIGEST_FILENAME),
+                digest.encode(),
+            )
+            return python_runtime_filename
+        except OSError:
+            logger.exception("Unable to cache the Python process runtime.")
+
+    python_runtime_filename = os.path.join(tmpdir, "python_runtime.zip")
+    with open(python_runtime_filename, "wb") as python_runtime_handle:
+        python_runtime_handle.write(runtime)
+    return python_runtime_filename
+
+
 if __name__ == "__main__":
     assert communicator is not None
 
     # Get the python runtime.
-    python_runtime = communicator.get_python_runtime()
     tmpdir = tempfile.TemporaryDirectory()
-    python_runtime_filename = os.path.join(tmpdir.name, "python_runtime.zip")
-    with open(python_runtime_filename, "wb") as python_runtime_handle:
-        python_runtime_handle.write(b64decode(python_runtime))
+    python_runtime_filename = get_python_runtime(tmpdir.name)
 
     sys.path.insert(0, python_runtime_filename)
     # From this line on the Python process runtime is available.
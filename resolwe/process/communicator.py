@@ -2,6 +2,7 @@
 
 import os
 import socket
+import threading
 from pathlib import Path
 from typing import Any, Optional, Type
 
@@ -41,6 +42,9 @@ class PythonProcessCommunicator:
         """Initialize."""
         self._socket = _socket
         self.encoder = None
+        # The commands may be sent from multiple threads, for instance the
+        # throttled process reports are sent from a timer thread.
+        self._lock = threading.Lock()
 
     def send_command(
         self,
@@ -52,8 +56,9 @@ class PythonProcessCommunicator:
         :raises AssertionError: on error.
         """
         command = Message.command(command_name, data)
-        send_data(self._socket, command.to_dict(), encoder=self.encoder)
-        received = receive_data(self._socket)
+        with self._lock:
+            send_data(self._socket, command.to_dict(), encoder=self.encoder)
+            received = receive_data(self._socket)
         assert received is not None
         return Response.from_dict(received)
 
@@ -2,8 +2,10 @@
 
 import json
 import os
+from collections import defaultdict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List, MutableMapping, Optional, Type
+from typing import Any, Dict, Iterable, List, MutableMapping, Optional, Tuple, Type
 
 from .communicator import communicator
 from .fields import (
@@ -90,6 +92,89 @@ FIELDS_MAP = {
 _hydrate_cache: Dict[int, str] = dict()
 
 
+class FieldUpdateBuffer:
+    """Buffer the updates of model fields.
+
+    When buffering is active (inside the ``batch_updates`` block) the updates
+    are not sent to the listener immediately. Instead they are merged per
+    object and sent in a single command when the buffer is flushed.
+
+    The buffer is flushed when the outermost ``batch_updates`` block is left
+    and before any data is read from or created on the server, so the
+    process always sees its own writes.
+    """
+
+    def __init__(self):
+        """Initialize."""
+        self._depth = 0
+        self._updates: Dict[Tuple[str, str, int], Dict[str, Any]] = dict()
+
+    @property
+    def active(self) -> bool:
+        """Return True when updates are buffered."""
+        return self._depth > 0
+
+    def update_model_fields(
+        self, app_name: str, model_name: str, pk: int, mapping: Dict[str, Any]
+    ):
+        """Update the given fields on the model.
+
+        When buffering is not active the update is sent immediately.
+        """
+        if not self.active:
+            communicator.update_model_fields(app_name, model_name, pk, mapping)
+            return
+
+        key = (app_name, model_name, pk)
+        for field_name, value in mapping.items():
+            pending = self._updates.setdefault(key, dict())
+            current = pending.get(field_name)
+            # Dictionaries are partial updates of JSON fields and can be merged
+            # unless they follow the replacement of the entire field.
+            if (
+                field_name in pending
+                and isinstance(value, dict)
+                and not isinstance(current, dict)
+            ):
+                self.flush()
+                pending = self._updates.setdefault(key, dict())
+            if isinstance(value, dict) and field_name in pending:
+                # The keys are applied in the order of their last update, so a
+                # key updated again is moved to the end. This way replacing a
+                # key overrides the earlier updates of the keys nested under
+                # it and not the other way around.
+                for sub_key, sub_value in value.items():
+                    pending[field_name].pop(sub_key, None)
+                    pending[field_name][sub_key] = sub_value
+            else:
+                pending[field_name] = value.copy() if isinstance(value, dict) else value
+
+    def flush(self):
+        """Send all the buffered updates to the listener in one command."""
+        if self._updates:
+            updates = [
+                (app_name, model_name, pk, mapping)
+                for (app_name, model_name, pk), mapping in self._updates.items()
+            ]
+            self._updates = dict()
+            communicator.bulk_update_model_fields(updates)
+
+    @contextmanager
+    def batch(self):
+        """Buffer the updates inside the block."""
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self.flush()
+
+
+update_buffer = FieldUpdateBuffer()
+batch_updates = update_buffer.batch
+
+
 def hydrate_if_needed(value, model_instance, field_name, field):
     """Hydrate path if needed."""
     # Only hidrate paths on outputs of data objects that we are not processing.
@@ -153,6 +238,8 @@ class JSONDescriptor(MutableMapping[str, Any]):
 
         TODO: read only required parts when Django supports it.
         """
+        if json_data is None:
+            update_buffer.flush()
         json_data = (
             json_data
             or communicator.get_model_fields(
@@ -219,7 +306,7 @@ class JSONDescriptor(MutableMapping[str, Any]):
             to_output = field.to_output(value)
 
         if to_output is not None:
-            communicator.update_model_fields(
+            update_buffer.update_model_fields(
                 self._app_name,
                 self._model_name,
                 self._pk,
@@ -304,6 +391,8 @@ class Model(metaclass=ModelMetaclass):
         """Initialize."""
         self._pk = pk
         self._cache: Dict[str, Any] = {"id": pk}
+        # Raw values retrieved by prefetch, they are cleaned on first access.
+        self._prefetched: Dict[str, Any] = dict()
 
     @property
     def full_model_name(self):
@@ -320,6 +409,7 @@ class Model(metaclass=ModelMetaclass):
             attribute for attribute in attributes if attribute != "id"
         ]
 
+        update_buffer.flush()
         objects = communicator.filter_objects(
             cls._app_name, cls._model_name, filters, attributes
         )
@@ -344,6 +434,7 @@ class Model(metaclass=ModelMetaclass):
             attribute for attribute in attributes if attribute != "id"
         ]
         sort = sort or ["id"]
+        update_buffer.flush()
         offset = 0
         final_iteration = False
         while not final_iteration:
@@ -371,6 +462,7 @@ class Model(metaclass=ModelMetaclass):
         If no such object exists empty list is returned.
         Else list of ids that fit the criteria is returned.
         """
+        update_buffer.flush()
         return [
             e[0]
             for e in communicator.filter_objects(
@@ -385,6 +477,7 @@ class Model(metaclass=ModelMetaclass):
         :raises RuntimeError: when different than one objects match the given
             criteria.
         """
+        update_buffer.flush()
         pks = communicator.filter_objects(
             cls._app_name, cls._model_name, filters, ["id"]
         )
@@ -414,11 +507,44 @@ class Model(metaclass=ModelMetaclass):
         for old_name, new_name, new_value in mappings:
             del object_data[old_name]
             object_data[new_name] = new_value
+        update_buffer.flush()
         communicator.encoder = JSONModelEncoder
         return cls(
             communicator.create_object(cls._app_name, cls._model_name, object_data)
         )
 
+    @classmethod
+    def prefetch(cls, instances: Iterable["Model"], field_names: List[str]):
+        """Retrieve the values of the given fields for all the instances.
+
+        The values are retrieved with a single request and stored so that
+        accessing the fields on the instances does not require additional
+        requests. Many-to-many fields are not supported.
+
+        :raises RuntimeError: when the data for some instance is not received.
+        """
+        instances_by_pk: Dict[int, List[Model]] = defaultdict(list)
+        for instance in instances:
+            if any(field_name not in instance._cache for field_name in field_names):
+                instances_by_pk[instance._pk].append(instance)
+        if not instances_by_pk:
+            return
+
+        update_buffer.flush()
+        results = communicator.get_model_fields(
+            cls._app_name, cls._model_name, list(instances_by_pk), field_names
+        )
+        for result in results:
+            for instance in instances_by_pk.pop(result["id"], []):
+                for field_name in field_names:
+                    if field_name not in instance._cache:
+                        instance._prefetched[field_name] = result[field_name]
+        if instances_by_pk:
+            raise RuntimeError(
+                f"No data received for {cls._model_name} objects with ids "
+                f"{sorted(instances_by_pk)}. Check permissions."
+            )
+
     def __str__(self):
         """Return a string representation."""
         return f"{self._model_name}(pk={self._pk})"
@@ -426,7 +552,8 @@ class Model(metaclass=ModelMetaclass):
     def _set_field_data(self, field: Field, value: Any):
         """Set the value of the field."""
         self._cache[field.name] = value
-        communicator.update_model_fields(
+        self._prefetched.pop(field.name, None)
+        update_buffer.update_model_fields(
             self._app_name,
             self._model_name,
             self._pk,
@@ -441,7 +568,10 @@ class Model(metaclass=ModelMetaclass):
 
         :raises RuntimeError: when no data is received.
         """
+        if field.name in self._prefetched and field.name not in self._cache:
+            self._cache[field.name] = field.clean(self._prefetched.pop(field.name))
         if field.name not in self._cache:
+            update_buffer.flush()
             result = communicator.get_model_fields(
                 self._app_name, self._model_name, self._pk, [field.name]
             )
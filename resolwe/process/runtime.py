@@ -1,9 +1,12 @@
 """Process runtime."""
 
 import logging
+import os
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, List, Optional, Union
 
 from .communicator import communicator
 from .descriptor import ProcessDescriptor
@@ -14,6 +17,8 @@ from .models import Data, JSONDescriptor
 PROCESS_INPUTS_NAME = "Input"
 # Outputs class name.
 PROCESS_OUTPUTS_NAME = "Output"
+# Minimal interval (in seconds) between two progress and log reports.
+PROCESS_REPORT_INTERVAL = float(os.getenv("PROCESS_REPORT_INTERVAL", "1"))
 logger = logging.getLogger(__name__)
 
 
@@ -49,6 +54,79 @@ sys.stdout = FlushOnWrite(sys.stdout)  # type: ignore
 sys.stderr = FlushOnWrite(sys.stderr)  # type: ignore
 
 
+class ProcessReporter:
+    """Throttle and batch progress and log reports.
+
+    Only the latest progress is kept and log entries are buffered. They are
+    sent to the listener in a single command at most once per interval: a
+    throttled report is sent by a timer when the interval elapses, or when the
+    reporter is flushed. Errors and warnings are sent immediately, so the
+    status of the data object is updated without delay.
+    """
+
+    # Log entries of these types are not throttled.
+    URGENT_LOG_TYPES = ("error", "warning")
+
+    def __init__(self, interval: float = PROCESS_REPORT_INTERVAL):
+        """Initialize."""
+        self._interval = interval
+        self._last_sent: Optional[float] = None
+        self._progress: Optional[int] = None
+        self._log: Dict[str, List[str]] = dict()
+        self._timer: Optional[threading.Timer] = None
+        # Guard the pending report, it is also flushed from the timer thread.
+        self._lock = threading.RLock()
+
+    def progress(self, progress: int):
+        """Report the progress."""
+        with self._lock:
+            self._progress = progress
+            self._flush_if_due()
+
+    def log(self, log: Dict[str, List[str]]):
+        """Report the log entries."""
+        with self._lock:
+            for key, values in log.items():
+                self._log.setdefault(key, []).extend(values)
+            if any(log.get(log_type) for log_type in self.URGENT_LOG_TYPES):
+                self.flush()
+            else:
+                self._flush_if_due()
+
+    def _flush_if_due(self):
+        """Flush the report when the interval has elapsed.
+
+        Otherwise schedule the flush for the time the interval elapses.
+        """
+        if self._last_sent is None:
+            self.flush()
+            return
+        remaining = self._last_sent + self._interval - time.monotonic()
+        if remaining <= 0:
+            self.flush()
+        elif self._timer is None:
+            self._timer = threading.Timer(remaining, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Send the pending report to the listener."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            report = dict()
+            if self._progress is not None:
+                report["progress"] = self._progress
+            if self._log:
+                report["log"] = self._log
+            if report:
+                self._progress = None
+                self._log = dict()
+                self._last_sent = time.monotonic()
+                communicator.process_report(report)
+
+
 class ProcessMeta(type):
     """Metaclass for process.
 
@@ -111,6 +189,7 @@ class Process(metaclass=ProcessMeta):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.data = data
         self.process = self.data.process
+        self._reporter = ProcessReporter()
 
     def run(self, inputs: JSONDescriptor, outputs: JSONDescriptor):
         """Process entry point."""
@@ -147,21 +226,25 @@ class Process(metaclass=ProcessMeta):
     def progress(self, progress: float):
         """Report process progress.
 
+        The progress reports are throttled, only the latest one is sent.
+
         :raises AssertionError: when float is not between 0 and 1.
         """
         assert 0 <= progress <= 1, "Progress must be a float between 0 and 1."
-        communicator.progress(round(progress * 100))
+        self._reporter.progress(round(progress * 100))
 
     def _process_log(self, log: Dict[str, List[str]]):
         """Send process log.
 
         The log may contain multiple info, warning and error messages.
 
+        The messages are buffered and sent in batches.
+
         :param log: dictionary with keys 'info', 'warning' and 'error'. The
             corresponding values are lists of strings. Some keys may be
             missing.
         """
-        communicator.process_log(log)
+        self._reporter.log(log)
 
     def info(self, *args):
         """Log informational message."""
@@ -229,4 +312,5 @@ class Process(metaclass=ProcessMeta):
             self.error("Exception while running process")
             raise
         finally:
+            self._reporter.flush()
             self.logger.info("Process has finished")
@@ -20,6 +20,7 @@ from resolwe.process import (
 )
 from resolwe.process.models import Collection, Data, Entity
 from resolwe.process.models import Process as ProcessM
+from resolwe.process.models import batch_updates
 
 
 class EntityProcess(Process):
@@ -689,3 +690,29 @@ class NestedDirectories(Process):
         out2.touch()
         outputs.out1 = str(out1)
         outputs.out2 = str(out2)
+
+
+class BatchUpdatesProcess(Process):
+    slug = "test-python-process-batch-updates"
+    name = "Test batched field updates"
+    version = "0.0.1"
+    process_type = "data:python:batch"
+
+    class Input:
+        """Input fields."""
+
+        data = ListField(DataField(data_type=""), label="Data list")
+
+    class Output:
+        """Output fields."""
+
+        names = ListField(StringField(label="Name"), label="Input names")
+        count = IntegerField(label="Number of inputs")
+
+    def run(self, inputs, outputs):
+        data_list = inputs.data
+        Data.prefetch(data_list, ["name"])
+        with batch_updates():
+            outputs.names = [data.name for data in data_list]
+            outputs.count = len(data_list)
+            self.data.name = "Batched"
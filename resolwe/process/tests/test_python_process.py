@@ -1,6 +1,7 @@
 # pylint: disable=missing-docstring
 import os
 import sys
+import threading
 import unittest
 import unittest.mock
 from unittest.mock import patch
@@ -29,8 +30,11 @@ from resolwe.flow.models.annotations import (
     AnnotationValue,
 )
 from resolwe.permissions.models import Permission, get_anonymous_user
+from resolwe.process import models as process_models
+from resolwe.process import runtime as process_runtime
 from resolwe.test import (
     ProcessTestCase,
+    TestCase,
     tag_process,
     with_docker_executor,
     with_resolwe_host,
@@ -691,6 +695,99 @@ class PythonProcessRequirementsTest(ProcessTestCase):
             process_slugs = Process.objects.all().values_list("slug", flat=True)
             self.assertCountEqual(process_slugs, data.output["process_slugs"])
 
+    @with_docker_executor
+    @tag_process("test-python-process-batch-updates", "test-python-process-2")
+    def test_batch_updates(self):
+        with self.preparation_stage():
+            inputs = [self.run_process("test-python-process-2") for _ in range(3)]
+        for index, data in enumerate(inputs):
+            data.name = f"Input {index}"
+            data.save()
+
+        with patch.object(
+            ListenerPlugins,
+            "get_handler",
+            wraps=listener_plugin_manager.get_handler,
+        ) as plugin_mock:
+            data = self.run_process(
+                "test-python-process-batch-updates",
+                {"data": [data.pk for data in inputs]},
+            )
+            commands = [call.args[0] for call in plugin_mock.call_args_list]
+
+        data.refresh_from_db()
+        self.assertEqual(data.name, "Batched")
+        self.assertEqual(data.output["count"], 3)
+        self.assertEqual(data.output["names"], ["Input 0", "Input 1", "Input 2"])
+        self.assertEqual(commands.count("bulk_update_model_fields"), 1)
+        self.assertEqual(commands.count("update_model_fields"), 0)
+
+
+class FieldUpdateBufferTest(TestCase):
+    @patch.object(process_models, "communicator")
+    def test_update_order(self, communicator_mock):
+        buffer = process_models.FieldUpdateBuffer()
+        with buffer.batch():
+            buffer.update_model_fields("flow", "Data", 1, {"output": {"a": 1}})
+            buffer.update_model_fields("flow", "Data", 1, {"output": {"a.b": 2}})
+            buffer.update_model_fields("flow", "Data", 1, {"output": {"a": 3}})
+            buffer.update_model_fields("flow", "Data", 1, {"name": "Name"})
+        communicator_mock.bulk_update_model_fields.assert_called_once()
+        (updates,) = communicator_mock.bulk_update_model_fields.call_args.args
+        self.assertEqual(
+            updates,
+            [("flow", "Data", 1, {"output": {"a.b": 2, "a": 3}, "name": "Name"})],
+        )
+        self.assertEqual(list(updates[0][3]["output"]), ["a.b", "a"])
+
+    @patch.object(process_models, "communicator")
+    def test_merge_and_update_other_field(self, communicator_mock):
+        buffer = process_models.FieldUpdateBuffer()
+        with buffer.batch():
+            buffer.update_model_fields("flow", "Data", 1, {"output": {"a": 1}})
+            buffer.update_model_fields(
+                "flow", "Data", 1, {"output": {"b": 1}, "name": "Name"}
+            )
+        communicator_mock.bulk_update_model_fields.assert_called_once_with(
+            [("flow", "Data", 1, {"output": {"a": 1, "b": 1}, "name": "Name"})]
+        )
+
+
+class ProcessReporterTest(TestCase):
+    @patch.object(process_runtime, "communicator")
+    def test_urgent_log(self, communicator_mock):
+        reporter = process_runtime.ProcessReporter(interval=3600)
+        reporter.progress(10)
+        reporter.log({"info": ["Started."]})
+        reporter.progress(20)
+        self.assertEqual(communicator_mock.process_report.call_count, 1)
+
+        reporter.log({"error": ["Failed."]})
+        self.assertEqual(communicator_mock.process_report.call_count, 2)
+        communicator_mock.process_report.assert_called_with(
+            {"progress": 20, "log": {"info": ["Started."], "error": ["Failed."]}}
+        )
+        reporter.log({"warning": ["Careful."]})
+        self.assertEqual(communicator_mock.process_report.call_count, 3)
+
+    @patch.object(process_runtime, "communicator")
+    def test_deadline_flush(self, communicator_mock):
+        sent = threading.Event()
+        communicator_mock.process_report.side_effect = lambda report: sent.set()
+        reporter = process_runtime.ProcessReporter(interval=0.1)
+        reporter.progress(10)
+        sent.clear()
+        reporter.progress(20)
+        reporter.log({"info": ["Running."]})
+        self.assertEqual(communicator_mock.process_report.call_count, 1)
+
+        # The throttled report is sent without waiting for the next one.
+        self.assertTrue(sent.wait(5))
+        self.assertEqual(communicator_mock.process_report.call_count, 2)
+        communicator_mock.process_report.assert_called_with(
+            {"progress": 20, "log": {"info": ["Running."]}}
+        )
+
 
 class PythonProcessDataBySlugTest(ProcessTestCase, LiveServerTestCase):
     def setUp(self):
@@ -1,23 +1,63 @@
 """Storage cleanup."""
 
 import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import batched
 from typing import Optional
 
+from django.conf import settings
 from django.db import transaction
 
-from resolwe.storage.models import FileStorage, StorageLocation
+from resolwe.storage.connectors import connectors
+from resolwe.storage.models import FileStorage, ReferencedPath, StorageLocation
 from resolwe.utils import BraceMessage as __
 
 logger = logging.getLogger(__name__)
 
+# The number of FileStorage objects processed in a single transaction in the
+# bulk mode.
+BATCH_SIZE = 1000
+
+# The number of connectors deleting the data in parallel in the bulk mode.
+WORKERS = 4
+
 
 class Cleaner:
     """Remove unreferenced data.
 
     Remove data from StorageLocation objects that are no longer referenced
     by any Data object.
+
+    In the bulk mode the FileStorage objects are processed in batches. The
+    data of all the locations in the batch is deleted with a single
+    :meth:`~resolwe.storage.connectors.baseconnector.BaseStorageConnector.bulk_delete`
+    call per connector, the connectors run in parallel, and the database
+    objects are deleted with a constant number of queries per batch. The bulk
+    mode is enabled by the ``FLOW_STORAGE_CLEANUP_BULK`` setting.
     """
 
+    def __init__(
+        self,
+        bulk: Optional[bool] = None,
+        batch_size: int = BATCH_SIZE,
+        workers: int = WORKERS,
+    ):
+        """Initialize.
+
+        :param bulk: use the bulk mode, defaults to the value of the
+            ``FLOW_STORAGE_CLEANUP_BULK`` setting.
+        :param batch_size: the number of FileStorage objects processed at once
+            in the bulk mode.
+        :param workers: the number of connectors deleting data in parallel in
+            the bulk mode.
+        """
+        if bulk is None:
+            bulk = getattr(settings, "FLOW_STORAGE_CLEANUP_BULK", False)
+        self.bulk = bulk
+        self.batch_size = batch_size
+        self.workers = workers
+
     def _cleanup(self, storage_location: StorageLocation):
         """Delete data from StorageLocation object."""
         # Make sure this will get writen to the database.
@@ -58,6 +98,104 @@ class Cleaner:
             logger.info(__("Deleting FileStorage {}.", file_storage.pk))
             file_storage.delete()
 
+    def _delete_data(
+        self, connector_name: str, urls: dict[str, list[str]]
+    ) -> Optional[str]:
+        """Delete the data of the locations using the same connector.
+
+        :return: the name of the connector when the data was deleted.
+        """
+        try:
+            connectors[connector_name].bulk_delete(urls)
+        except Exception:
+            logger.exception(
+                __(
+                    "Exception deleting data of {} locations with connector {}.",
+                    len(urls),
+                    connector_name,
+                )
+            )
+            return None
+        return connector_name
+
+    def _process_batch(self, file_storage_ids: list[int]):
+        """Delete all data from the batch of FileStorage objects in bulk."""
+        with transaction.atomic():
+            # Skip the locked FileStorage objects.
+            file_storage_ids = list(
+                FileStorage.objects.filter(id__in=file_storage_ids)
+                .select_for_update(skip_locked=True)
+                .values_list("id", flat=True)
+            )
+            locations = StorageLocation.all_objects.filter(
+                file_storage_id__in=file_storage_ids,
+                status=StorageLocation.STATUS_DELETING,
+            )
+            location_connectors: dict[int, str] = {}
+            urls: dict[str, dict[str, list[str]]] = defaultdict(dict)
+            for location_id, connector_name, url in locations.values_list(
+                "id", "connector_name", "url"
+            ):
+                if connector_name not in connectors:
+                    logger.error(
+                        __(
+                            "Unable to cleanup StorageLocation {}: connector not found.",
+                            location_id,
+                        )
+                    )
+                    continue
+                location_connectors[location_id] = connector_name
+                urls[connector_name][url] = []
+
+            location_files = ReferencedPath.storage_locations.through.objects.filter(
+                storagelocation_id__in=location_connectors
+            )
+            paths = location_files.values_list(
+                "storagelocation_id",
+                "storagelocation__url",
+                "referencedpath_id",
+                "referencedpath__path",
+            )
+            path_ids = set()
+            for location_id, url, path_id, path in paths.iterator():
+                urls[location_connectors[location_id]][url].append(path)
+                path_ids.add(path_id)
+
+            logger.info(
+                __(
+                    "Deleting {} StorageLocations from {} FileStorages.",
+                    len(location_connectors),
+                    len(file_storage_ids),
+                )
+            )
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                deleted_connectors = set(
+                    executor.map(self._delete_data, urls.keys(), urls.values())
+                )
+            StorageLocation.all_objects.filter(
+                id__in=[
+                    location_id
+                    for location_id, connector_name in location_connectors.items()
+                    if connector_name in deleted_connectors
+                ]
+            ).delete()
+            # Remove the paths that are no longer referenced by any location.
+            ReferencedPath.objects.filter(
+                id__in=path_ids, storage_locations__isnull=True
+            ).delete()
+            FileStorage.objects.filter(
+                id__in=file_storage_ids, storage_locations__isnull=True
+            ).delete()
+
+    def _process_bulk(self, queryset):
+        """Delete all data from the FileStorage objects in bulk."""
+        file_storage_ids = queryset.values_list("id", flat=True).iterator()
+        for batch in batched(file_storage_ids, self.batch_size):
+            StorageLocation.all_objects.unreferenced_locations().filter(
+                file_storage_id__in=batch
+            ).update(status=StorageLocation.STATUS_DELETING)
+            self._process_batch(list(batch))
+
     def process(self, file_storage_id: Optional[int] = None):
         """Process objects to clean.
 
@@ -70,6 +208,10 @@ class Cleaner:
             qset = qset.filter(pk=file_storage_id)
         else:
             logger.info("Starting processing")
+        if self.bulk:
+            self._process_bulk(qset.filter(data__isnull=True))
+            logger.info("Finished processing")
+            return
         for file_storage in qset.filter(data__isnull=True).iterator():
             # Set applicable storage locations to deleting.
             StorageLocation.all_objects.unreferenced_locations().filter(
@@ -269,6 +269,36 @@ class BaseStorageConnector(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError
 
+    def bulk_delete(self, urls: Dict[str, List[str]]):
+        """Remove objects stored under many base URLs.
+
+        The default implementation calls :meth:`delete` for every base URL.
+        Connectors supporting batch deletion override it to remove the objects
+        of many base URLs in the same request.
+
+        :param urls: the mapping of base URLs to the lists of URLs of the
+            objects to delete, relative with respect to the base URL.
+
+        :raises ValueError: when any of the URLs is not relative.
+        """
+        for url, relative_urls in urls.items():
+            self.delete(url, relative_urls)
+
+    def _bulk_delete_keys(self, urls: Dict[str, List[str]]) -> List[str]:
+        """Get the full paths of the objects to delete in bulk.
+
+        :raises ValueError: when any of the URLs is not relative.
+        """
+        keys = []
+        for url, relative_urls in urls.items():
+            if any(PurePath(path).is_absolute() for path in [url, *relative_urls]):
+                raise ValueError("Paths must be relative.")
+            keys.extend(
+                str(self.base_path / url / relative_url)
+                for relative_url in relative_urls
+            )
+        return keys
+
     def multipart_push(
         self,
         upload_id: str,
@@ -2,13 +2,21 @@
 
 import base64
 import datetime
+import logging
 import mimetypes
 import os
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
+from itertools import batched
 from pathlib import Path
 
+import crcmod
 from google.api_core.exceptions import NotFound
 from google.cloud import storage
+from requests.adapters import HTTPAdapter
 
 from .baseconnector import (
     BaseStorageConnector,
@@ -16,6 +24,40 @@ from .baseconnector import (
     validate_url,
     validate_urls,
 )
+from .exceptions import DataTransferError
+
+logger = logging.getLogger(__name__)
+
+# At most 32 objects can be composed into a single object in one request.
+MAX_COMPOSE_COMPONENTS = 32
+
+# The clients shared between the connectors, keyed by the process id and the
+# credentials file. The clients must not be shared with forked processes.
+_clients: dict[tuple[int, str], storage.Client] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(credentials: str, max_pool_connections: int) -> storage.Client:
+    """Get the client using the given credentials.
+
+    The client and its HTTP session are created once per process and shared
+    by all the connectors using the same credentials, so the connections to
+    the storage are reused.
+    """
+    key = (os.getpid(), credentials)
+    with _clients_lock:
+        if key not in _clients:
+            logger.debug("Creating Google storage client for %s.", credentials)
+            client = storage.Client.from_service_account_json(credentials)
+            # The default connection pool of the session holds only 10
+            # connections, which is not enough for the parallel transfers.
+            adapter = HTTPAdapter(
+                pool_connections=max_pool_connections,
+                pool_maxsize=max_pool_connections,
+            )
+            client._http.mount("https://", adapter)
+            _clients[key] = client
+        return _clients[key]
 
 
 class GoogleConnector(BaseStorageConnector):
@@ -30,6 +72,18 @@ class GoogleConnector(BaseStorageConnector):
         self.bucket_name = config["bucket"]
         self.supported_hash = ["crc32c", "md5"]
         self.hash_propery = {"md5": "md5_hash", "crc32c": "crc32c"}
+        # Objects larger than the threshold are uploaded as parts in parallel
+        # and composed into a single object, and downloaded in slices.
+        self.composite_threshold = self.config.get(
+            "composite_threshold", 150 * 1024 * 1024
+        )
+        self.composite_chunksize = self.config.get(
+            "composite_chunksize", 4 * self.CHUNK_SIZE
+        )
+        self.max_concurrency = self.config.get("max_concurrency", 8)
+        self.max_pool_connections = self.config.get("max_pool_connections", 50)
+        # The prefix of the temporary objects holding the uploaded parts.
+        self.composite_prefix = self.config.get("composite_prefix", "_composite")
 
     @validate_url
     def get_object_list(self, url):
@@ -40,10 +94,21 @@ class GoogleConnector(BaseStorageConnector):
             for e in self.bucket.list_blobs(prefix=url)
         ]
 
+    def duplicate(self):
+        """Duplicate existing connector.
+
+        The duplicate shares the client, and with it the connection pool,
+        with this connector.
+        """
+        duplicate = super().duplicate()
+        for name in ("client", "bucket"):
+            if name in self.__dict__:
+                setattr(duplicate, name, self.__dict__[name])
+        return duplicate
+
     def _initialize(self):
         """Perform initialization."""
-        credentials = self.config["credentials"]
-        self.client = storage.Client.from_service_account_json(credentials)
+        self.client = get_client(self.config["credentials"], self.max_pool_connections)
         self.bucket = self.client.get_bucket(self.bucket_name)
 
     def __getattr__(self, name):
@@ -71,21 +136,172 @@ class GoogleConnector(BaseStorageConnector):
                         )
                         blob.delete()
 
+    def bulk_delete(self, urls):
+        """Remove objects stored under many base URLs.
+
+        The objects of all base URLs are deleted in batch requests of at most
+        1000 objects.
+        """
+        for keys in batched(self._bulk_delete_keys(urls), 1000):
+            with suppress(NotFound):
+                with self.client.batch():
+                    for key in keys:
+                        self.bucket.blob(key).delete()
+
     @validate_url
     def push(self, stream, url, chunk_size=BaseStorageConnector.CHUNK_SIZE, hashes={}):
         """Push data from the stream to the given URL."""
         url = os.fspath(url)
         mime_type = mimetypes.guess_type(url)[0]
-        blob = self.bucket.blob(url)
-        blob.upload_from_file(stream, content_type=mime_type)
+        size = self._stream_size(stream)
+        if size is None:
+            # The size of the stream is not known in advance: read a single
+            # part to decide how to upload it.
+            head = stream.read(self.composite_chunksize)
+            if len(head) < self.composite_chunksize:
+                blob = self.bucket.blob(url)
+                blob.upload_from_string(head, content_type=mime_type)
+            else:
+                self._composite_push(head, stream, url, mime_type)
+        elif size < self.composite_threshold:
+            blob = self.bucket.blob(url, chunk_size=self.CHUNK_SIZE)
+            blob.upload_from_file(stream, content_type=mime_type, size=size)
+        else:
+            self._composite_push(b"", stream, url, mime_type)
         if hashes:
             self.set_hashes(url, hashes)
 
+    def _stream_size(self, stream):
+        """Get the number of bytes left in the stream.
+
+        :return: the size or None when the stream is not seekable.
+        """
+        seekable = getattr(stream, "seekable", None)
+        if seekable is None or not seekable():
+            return None
+        position = stream.tell()
+        size = stream.seek(0, os.SEEK_END) - position
+        stream.seek(position)
+        return size
+
+    def _composite_push(self, head, stream, url, mime_type):
+        """Upload the parts of the stream in parallel and compose them.
+
+        The parts are uploaded as temporary objects, which are removed when
+        the upload is finished.
+        """
+        part_prefix = f"{self.composite_prefix}/{uuid.uuid4()}"
+        crc = crcmod.predefined.PredefinedCrc("crc32c")
+        # The temporary objects: the uploaded parts and the intermediate
+        # composed objects.
+        parts, temporary, pending = [], [], deque()
+
+        def upload_part(blob, data):
+            blob.upload_from_string(data, checksum="crc32c")
+
+        def chunks():
+            if head:
+                yield head
+            while chunk := stream.read(self.composite_chunksize):
+                yield chunk
+
+        try:
+            with ThreadPoolExecutor(self.max_concurrency) as executor:
+                for chunk in chunks():
+                    # Limit the number of the parts held in memory.
+                    if len(pending) >= self.max_concurrency:
+                        pending.popleft().result()
+                    crc.update(chunk)
+                    parts.append(self.bucket.blob(f"{part_prefix}/{len(parts)}"))
+                    temporary.append(parts[-1])
+                    pending.append(executor.submit(upload_part, parts[-1], chunk))
+                for future in pending:
+                    future.result()
+
+            blob = self.bucket.blob(url)
+            blob.content_type = mime_type
+            self._compose(blob, parts, part_prefix, temporary)
+            blob.reload()
+            if base64.b64decode(blob.crc32c) != crc.digest():
+                raise DataTransferError(
+                    f"Composed object {url} crc32c hash does not match the "
+                    "uploaded data."
+                )
+        finally:
+            # The requests in the batch are deferred, so the temporary objects
+            # must be known before it is entered.
+            for blobs in batched(temporary, 1000):
+                with suppress(NotFound):
+                    with self.client.batch():
+                        for temporary_blob in blobs:
+                            temporary_blob.delete()
+
+    def _compose(self, blob, parts, part_prefix, temporary):
+        """Compose the parts into the given blob.
+
+        The parts are composed into intermediate objects until there are few
+        enough of them to be composed in a single request. The intermediate
+        objects are appended to the temporary list.
+        """
+        level = 0
+        while len(parts) > MAX_COMPOSE_COMPONENTS:
+            composed = []
+            for group in batched(parts, MAX_COMPOSE_COMPONENTS):
+                composed.append(
+                    self.bucket.blob(f"{part_prefix}/{level}-{len(composed)}")
+                )
+                temporary.append(composed[-1])
+                composed[-1].compose(list(group))
+            parts = composed
+            level += 1
+        blob.compose(parts)
+
     @validate_url
     def get(self, url, stream, chunk_size=BaseStorageConnector.CHUNK_SIZE):
         """Get data from the given URL and write it into the given stream."""
-        blob = self.bucket.blob(os.fspath(url))
-        blob.download_to_file(stream)
+        blob = self.bucket.get_blob(os.fspath(url))
+        if blob is None:
+            raise NotFound(f"Object {url} does not exist.")
+        if blob.size < self.composite_threshold:
+            blob.download_to_file(stream)
+        else:
+            self._sliced_get(blob, stream)
+
+    def _sliced_get(self, blob, stream):
+        """Download the slices of the blob in parallel.
+
+        The slices are written into the stream in order and the crc32c hash
+        of the written data is compared to the hash of the object.
+        """
+        crc = crcmod.predefined.PredefinedCrc("crc32c")
+        pending = deque()
+
+        def download_slice(start):
+            # Pin the generation so all slices belong to the same object.
+            return blob.download_as_bytes(
+                start=start,
+                end=min(start + self.composite_chunksize, blob.size) - 1,
+                if_generation_match=blob.generation,
+                checksum=None,
+            )
+
+        def write(data):
+            crc.update(data)
+            stream.write(data)
+
+        with ThreadPoolExecutor(self.max_concurrency) as executor:
+            for start in range(0, blob.size, self.composite_chunksize):
+                # Limit the number of the slices held in memory.
+                if len(pending) >= self.max_concurrency:
+                    write(pending.popleft().result())
+                pending.append(executor.submit(download_slice, start))
+            while pending:
+                write(pending.popleft().result())
+
+        if base64.b64decode(blob.crc32c) != crc.digest():
+            raise DataTransferError(
+                f"Downloaded object {blob.name} crc32c hash does not match."
+            )
 
     @validate_url
     def get_hash(self, url, hash_type):
@@ -94,11 +310,7 @@ class GoogleConnector(BaseStorageConnector):
         if blob is None:
             return None
         blob.update()
-        if hash_type in self.hash_propery:
-            prop = self.hash_propery[hash_type]
-            return base64.b64decode(getattr(blob, prop)).hex()
-        else:
-            return blob.metadata[hash_type]
+        return self._blob_hash(blob, hash_type)
 
     @validate_url
     def get_hashes(self, url, hash_types):
@@ -110,20 +322,31 @@ class GoogleConnector(BaseStorageConnector):
         blob.update()
 
         for hash_type in hash_types:
-            if hash_type in self.hash_propery:
-                prop = self.hash_propery[hash_type]
-                hashes[hash_type] = base64.b64decode(getattr(blob, prop)).hex()
-            else:
-                hashes[hash_type] = blob.metadata[hash_type]
+            hashes[hash_type] = self._blob_hash(blob, hash_type)
         return hashes
 
+    def _blob_hash(self, blob, hash_type):
+        """Get the hash of the given type for the given blob.
+
+        Composed objects have no md5 hash, it is read from the metadata
+        instead.
+        """
+        value = getattr(blob, self.hash_propery.get(hash_type, ""), None)
+        if value is not None:
+            return base64.b64decode(value).hex()
+        return blob.metadata[hash_type]
+
     @validate_url
     def set_hashes(self, url, hashes):
         """Set the  hashes for the given object."""
         blob = self.bucket.get_blob(os.fspath(url))
         blob.update()
         meta = blob.metadata or dict()
-        hashes = {k: v for (k, v) in hashes.items() if k not in self.hash_propery}
+        hashes = {
+            k: v
+            for (k, v) in hashes.items()
+            if getattr(blob, self.hash_propery.get(k, ""), None) is None
+        }
         meta.update(hashes)
         blob.metadata = meta
         blob.update()
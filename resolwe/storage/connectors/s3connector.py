@@ -6,6 +6,7 @@ import mimetypes
 import os
 import threading
 import uuid
+from itertools import batched
 from pathlib import Path
 from typing import Dict, Optional
 
@@ -222,6 +223,17 @@ class AwsS3Connector(BaseStorageConnector):
                 Bucket=self.bucket_name, Delete={"Objects": objects, "Quiet": True}
             )
 
+    def bulk_delete(self, urls):
+        """Remove objects stored under many base URLs.
+
+        The objects of all base URLs are deleted in requests of 1000 keys.
+        """
+        for keys in batched(self._bulk_delete_keys(urls), 1000):
+            self.client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+            )
+
     @validate_url
     def get(self, url, stream, chunk_size=BaseStorageConnector.CHUNK_SIZE):
         """Get data from the given URL and write it into the given stream."""
@@ -25,13 +25,13 @@ class StorageManagerConsumer(SyncConsumer):
 class StorageCleanupConsumer(SyncConsumer):
     """Start Storage Cleanup when triggered.
 
-    Optionally id of the FileStorage object to clean can be sent with the
-    event.
+    Optionally id of the FileStorage object to clean and the flag enabling
+    the bulk mode can be sent with the event.
     """
 
     def storagecleanup_run(self, event):
         """Start the cleanup run."""
-        cleaner = Cleaner()
+        cleaner = Cleaner(bulk=event.get("bulk"))
         try:
             file_storage_id = event.get("file_storage_id")
             cleaner.process(file_storage_id)
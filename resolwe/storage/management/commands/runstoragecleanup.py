@@ -25,16 +25,23 @@ class Command(BaseCommand):
 
     help = "Start cleanup manager run via signal by django channels."
 
+    def add_arguments(self, parser):
+        """Command arguments."""
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            default=None,
+            help="Delete the data of many storage locations at once",
+        )
+
     def handle(self, *args, **options):
         """Command handle."""
         channel_layer = get_channel_layer()
+        message = {"type": TYPE_STORAGE_CLEANUP_RUN}
+        if options["bulk"]:
+            message["bulk"] = True
         try:
-            async_to_sync(channel_layer.send)(
-                CHANNEL_STORAGE_CLEANUP_WORKER,
-                {
-                    "type": TYPE_STORAGE_CLEANUP_RUN,
-                },
-            )
+            async_to_sync(channel_layer.send)(CHANNEL_STORAGE_CLEANUP_WORKER, message)
         except ChannelFull:
             logger.warning(
                 "Cannot trigger storage manager run because channel is full.",
@@ -237,6 +237,31 @@ class GoogleConnectorTest(BaseTestCase, TestMixin):
                     computed_hashes = hashes(self.path(file_))
                     self.gcs.set_hashes(file_, computed_hashes)
 
+    def test_composite_push(self):
+        connector = self.gcs.duplicate()
+        self.assertIs(connector.client, self.gcs.client)
+        connector.composite_threshold = 256 * 1024
+        connector.composite_chunksize = 100 * 1024
+        source = self.path(self.prefix_created_files[0])
+        transfer_file = self.prefix_name("transfer")
+        computed_hashes = hashes(source)
+        with open(source, "rb") as f:
+            connector.push(f, transfer_file, hashes=computed_hashes)
+        self.assertEqual(
+            connector.get_hashes(transfer_file, ["md5", "crc32c"]),
+            {type_: computed_hashes[type_] for type_ in ["md5", "crc32c"]},
+        )
+        self.assertEqual(
+            list(connector.bucket.list_blobs(prefix=connector.composite_prefix)), []
+        )
+
+        stream = io.BytesIO()
+        connector.get(transfer_file, stream)
+        with open(source, "rb") as f:
+            self.assertEqual(stream.getvalue(), f.read())
+
+        self.connector.delete(self.url_prefix, ["transfer"])
+
 
 class S3ConnectorTest(BaseTestCase, TestMixin):
     def setUp(self):
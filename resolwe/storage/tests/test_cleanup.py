@@ -6,7 +6,8 @@ from unittest.mock import MagicMock, call, patch
 from django.db import connection, transaction
 
 from resolwe.storage.cleanup import Cleaner
-from resolwe.storage.models import FileStorage, StorageLocation
+from resolwe.storage.connectors import connectors
+from resolwe.storage.models import FileStorage, ReferencedPath, StorageLocation
 from resolwe.test import TransactionTestCase
 
 
@@ -116,3 +117,49 @@ class CleanupTest(TransactionTestCase):
         storage_location = MagicMock(connector=connector_mock, delete=delete_mock)
         self.cleaner._cleanup(storage_location)
         delete_mock.assert_called_once_with()
+
+    def test_process_bulk(self):
+        deleted = StorageLocation.objects.create(
+            file_storage=self.file_storage1,
+            url="1",
+            connector_name="local",
+            status=StorageLocation.STATUS_DONE,
+        )
+        # The location with unknown connector is not deleted.
+        kept = StorageLocation.objects.create(
+            file_storage=self.file_storage2,
+            url="2",
+            connector_name="missing",
+            status=StorageLocation.STATUS_DONE,
+        )
+        own_path = ReferencedPath.objects.create(path="own.txt")
+        own_path.storage_locations.add(deleted)
+        shared_path = ReferencedPath.objects.create(path="shared.txt")
+        shared_path.storage_locations.add(deleted, kept)
+
+        connector = MagicMock()
+        with patch("resolwe.storage.cleanup.connectors", {"local": connector}):
+            Cleaner(bulk=True, batch_size=1).process()
+
+        connector.bulk_delete.assert_called_once()
+        (urls,) = connector.bulk_delete.call_args.args
+        self.assertEqual(list(urls), ["1"])
+        self.assertCountEqual(urls["1"], ["own.txt", "shared.txt"])
+        self.assertFalse(StorageLocation.all_objects.filter(pk=deleted.pk).exists())
+        self.assertFalse(FileStorage.objects.filter(pk=self.file_storage1.pk).exists())
+        self.assertFalse(ReferencedPath.objects.filter(pk=own_path.pk).exists())
+        self.assertTrue(ReferencedPath.objects.filter(pk=shared_path.pk).exists())
+        kept.refresh_from_db()
+        self.assertEqual(kept.status, StorageLocation.STATUS_DELETING)
+
+    def test_bulk_delete_keys(self):
+        connector = connectors["local"]
+        self.assertEqual(
+            connector._bulk_delete_keys({"1": ["a.txt", "b/c.txt"]}),
+            [
+                str(connector.base_path / "1" / "a.txt"),
+                str(connector.base_path / "1/b/c.txt"),
+            ],
+        )
+        with self.assertRaises(ValueError):
+            connector._bulk_delete_keys({"1": ["/a.txt"]})
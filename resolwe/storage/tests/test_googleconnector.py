@@ -0,0 +1,133 @@
+# pylint: disable=missing-docstring
+import base64
+import io
+import unittest
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from resolwe.storage.connectors import GoogleConnector
+from resolwe.test import TestCase
+
+try:
+    import crcmod
+except ImportError:
+    crcmod = None
+
+
+class FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.content_type = None
+        self.crc32c = None
+
+    def _store(self, data):
+        self.bucket.objects[self.name] = data
+
+    def upload_from_string(self, data, content_type=None, checksum=None):
+        self.bucket.uploads.append(("string", self.name))
+        self._store(data)
+
+    def upload_from_file(self, stream, content_type=None, size=None):
+        self.bucket.uploads.append(("file", self.name))
+        self._store(stream.read(size))
+
+    def compose(self, sources):
+        self._store(b"".join(self.bucket.objects[blob.name] for blob in sources))
+
+    def reload(self):
+        crc = crcmod.predefined.PredefinedCrc("crc32c")
+        crc.update(self.bucket.objects[self.name])
+        self.crc32c = base64.b64encode(crc.digest()).decode()
+
+    def delete(self):
+        if self.bucket.client.in_batch:
+            self.bucket.client.deferred.append(self.name)
+        else:
+            del self.bucket.objects[self.name]
+
+
+class FakeBucket:
+    def __init__(self, client):
+        self.client = client
+        self.objects = {}
+        self.uploads = []
+
+    def blob(self, name, chunk_size=None):
+        return FakeBlob(self, name)
+
+    def list_blobs(self, prefix):
+        # The requests in a batch are deferred, the listing is not available.
+        if self.client.in_batch:
+            raise KeyError(prefix)
+        return [
+            FakeBlob(self, name) for name in self.objects if name.startswith(prefix)
+        ]
+
+
+class FakeClient:
+    def __init__(self):
+        self.in_batch = False
+        self.deferred = []
+
+    @contextmanager
+    def batch(self):
+        self.in_batch = True
+        try:
+            yield
+        finally:
+            self.in_batch = False
+        for name in self.deferred:
+            del self.bucket.objects[name]
+        self.deferred = []
+
+
+class NonSeekableStream(io.BytesIO):
+    def seekable(self):
+        return False
+
+
+@unittest.skipIf(
+    GoogleConnector is None or crcmod is None, "google-cloud-storage is not installed"
+)
+class GoogleConnectorPushTest(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.connector = GoogleConnector(
+            {"bucket": "bucket", "credentials": "credentials.json"}, "GCS"
+        )
+        self.connector.composite_threshold = 1024
+        self.connector.composite_chunksize = 100
+        self.connector.client = FakeClient()
+        self.connector.bucket = FakeBucket(self.connector.client)
+        self.connector.client.bucket = self.connector.bucket
+
+    def assertStored(self, url, data):
+        self.assertEqual(self.connector.bucket.objects, {url: data})
+
+    def test_push_small(self):
+        data = b"a" * 500
+        self.connector.push(io.BytesIO(data), "small")
+        self.assertStored("small", data)
+        self.assertEqual(self.connector.bucket.uploads, [("file", "small")])
+
+        self.connector.bucket.objects.clear()
+        self.connector.push(NonSeekableStream(data[:50]), "small")
+        self.assertStored("small", data[:50])
+
+    def test_push_composite(self):
+        # More parts than can be composed in a single request.
+        data = bytes(range(256)) * 20
+        self.connector.push(io.BytesIO(data), "large")
+        self.assertStored("large", data)
+
+        self.connector.bucket.objects.clear()
+        self.connector.push(NonSeekableStream(data), "large")
+        self.assertStored("large", data)
+
+    def test_push_composite_failed(self):
+        data = b"a" * 2000
+        with patch.object(self.connector, "_compose", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.connector.push(io.BytesIO(data), "large")
+        self.assertEqual(self.connector.bucket.objects, {})
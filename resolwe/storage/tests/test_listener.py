@@ -2,12 +2,16 @@
 from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.forms.models import model_to_dict
 
 from resolwe.flow.executors import constants
 from resolwe.flow.executors.socket_utils import Message, Response, ResponseStatus
 from resolwe.flow.managers.listener.authenticator import ZMQAuthenticator
 from resolwe.flow.managers.listener.basic_commands_plugin import BasicCommands
+from resolwe.flow.managers.listener.bootstrap_plugin import BootstrapCommands
 from resolwe.flow.managers.listener.listener import Processor
+from resolwe.flow.managers.listener.python_process_plugin import PythonProcess
 from resolwe.flow.managers.protocol import ExecutorProtocol
 from resolwe.flow.models import Data, DataDependency, Entity, Worker
 from resolwe.flow.models.annotations import (
@@ -536,3 +540,91 @@ class ListenerTest(TestCase):
         self.assertEqual(response.response_status, ResponseStatus.ERROR)
         self.assertEqual(response.message_data, "Validation error")
         self.assertEqual(entity.annotations.all().count(), 0)
+
+    def test_handle_process_report(self):
+        """Test batched progress and log report is saved at once."""
+        process = Process.objects.create(contributor=self.contributor)
+        data = Data.objects.create(
+            name="Test min", process=process, contributor=self.contributor
+        )
+        message = Message.command(
+            "process_report",
+            {"progress": 42, "log": {"info": ["first", "second"], "warning": ["w"]}},
+        )
+        with patch.object(
+            self.manager, "_save_data", wraps=self.manager._save_data
+        ) as save_mock:
+            response = self.processor.handle_process_report(
+                data.pk, message, self.manager
+            )
+        self.assertEqual(response.response_status, ResponseStatus.OK)
+        save_mock.assert_called_once()
+        data.refresh_from_db()
+        self.assertEqual(data.process_progress, 42)
+        self.assertEqual(data.process_info, ["first", "second"])
+        self.assertEqual(data.process_warning, ["w"])
+        self.assertNotEqual(data.status, Data.STATUS_ERROR)
+
+        message = Message.command("process_report", {"log": {"error": ["failed"]}})
+        self.processor.handle_process_report(data.pk, message, self.manager)
+        data.refresh_from_db()
+        self.assertEqual(data.process_progress, 42)
+        self.assertEqual(data.process_error, ["failed"])
+        self.assertEqual(data.status, Data.STATUS_ERROR)
+
+    def test_bootstrap_process_cache(self):
+        """Test the process bootstrap payload is shared and versioned."""
+
+        def get_data(pk):
+            return Data.objects.annotate(process_modified=F("process__modified")).get(
+                pk=pk
+            )
+
+        process = Process.objects.create(
+            contributor=self.contributor, requirements={"resources": {"cores": 2}}
+        )
+        data = Data.objects.create(
+            name="Test min", process=process, contributor=self.contributor
+        )
+        first, second = BootstrapCommands(), BootstrapCommands()
+        first._bootstrap_prepare_static_cache()
+        second._bootstrap_prepare_static_cache()
+
+        with patch(
+            "resolwe.flow.managers.listener.bootstrap_plugin.model_to_dict",
+            wraps=model_to_dict,
+        ) as serialize_mock:
+            payload = first.bootstrap_prepare_process_cache(get_data(data.pk))
+            self.assertEqual(payload["resource_limits"]["cores"], 2)
+            # The payload is shared between listener replicas.
+            self.assertEqual(
+                second.bootstrap_prepare_process_cache(get_data(data.pk)), payload
+            )
+            serialize_mock.assert_called_once()
+
+            # The change of the process invalidates the cached payload.
+            process.requirements = {"resources": {"cores": 3}}
+            process.save()
+            payload = second.bootstrap_prepare_process_cache(get_data(data.pk))
+            self.assertEqual(payload["resource_limits"]["cores"], 3)
+            self.assertEqual(serialize_mock.call_count, 2)
+
+    def test_handle_get_python_runtime(self):
+        """Test the Python runtime is cached and not resent when unchanged."""
+        plugin = PythonProcess()
+        with patch.object(
+            plugin, "_build_python_runtime", wraps=plugin._build_python_runtime
+        ) as build_mock:
+            message = Message.command("get_python_runtime", None)
+            response = plugin.handle_get_python_runtime(1, message, self.manager)
+            digest, runtime = response.message_data
+            self.assertIsNotNone(runtime)
+
+            message = Message.command("get_python_runtime", "outdated")
+            response = plugin.handle_get_python_runtime(1, message, self.manager)
+            self.assertEqual(response.message_data, (digest, runtime))
+
+            message = Message.command("get_python_runtime", digest)
+            response = plugin.handle_get_python_runtime(1, message, self.manager)
+            self.assertEqual(response.message_data, (digest, None))
+            build_mock.assert_called_once()
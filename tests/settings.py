@@ -119,6 +119,10 @@ LISTENER_CONNECTION = {
     "max_concurrent_commands": config(
         "RESOLWE_LISTENER_MAX_CONCURRENT_COMMANDS", cast=int, default=10
     ),
+    # The commands waiting for processing are admitted by the weighted
+    # round-robin over the command classes. Override the classes of the
+    # commands with 'command_classes' and the weights of the classes with
+    # 'command_class_weights'.
 }
 
 # The number of data points to send in one request.